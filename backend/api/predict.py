@@ -5,6 +5,10 @@ from ml.preprocess import DataPreprocessor
 from ml.yield_predictor import YieldPredictor
 from services.weather_service import WeatherService
 from services.prediction_storage_service import PredictionStorageService
+from services.prediction_writer import writer
+from services.recommendation_cache import RecommendationCache
+from utils.helpers import select_fields
+from utils.metrics import metrics
 from datetime import datetime
 
 predict_bp = Blueprint('predict', __name__)
@@ -16,6 +20,7 @@ yield_predictor = YieldPredictor()
 preprocessor = DataPreprocessor()
 weather_service = WeatherService()
 storage_service = PredictionStorageService()
+recommendation_cache = RecommendationCache()
 
 @predict_bp.route('/recommend', methods=['POST'])
 def recommend():
@@ -24,7 +29,13 @@ def recommend():
     1. Predict top N crops using sensor data
     2. For EACH crop, predict Fertilizer and Yield
     3. Return consolidated recommendations
+    ?fields=status,recommendations.crop trims the response to those paths.
     """
+    with metrics.stages('recommend') as timer:
+        return _recommend(timer)
+
+
+def _recommend(timer):
     try:
         data = request.json
         if not data:
@@ -33,7 +44,8 @@ def recommend():
         # Auto-fill weather data if missing
         if 'humidity' not in data or 'rainfall' not in data or 'temperature' not in data:
             location = data.get('location', 'Hyderabad')
-            weather = weather_service.get_current_weather(location)
+            with timer('weather'):
+                weather = weather_service.get_current_weather(location, lat=data.get('latitude'), lon=data.get('longitude'))
             
             # Only fill missing fields
             if 'temperature' not in data: data['temperature'] = weather['temperature']
@@ -46,37 +58,79 @@ def recommend():
 
         # Preprocess features
         try:
-            features = preprocessor.preprocess(data)
+            with timer('preprocess'):
+                features = preprocessor.preprocess(data)
         except ValueError as e:
             return jsonify({'error': str(e)}), 400
 
-        # Get crop predictions
-        crop_type_input = data.get('crop_type')
-        lang = data.get('lang', 'en')
+        # Near-identical inputs (e.g. repeated sensor averages) reuse a previous cascade result
+        with timer('cache'):
+            cache_key = recommendation_cache.key(data)
+            final_recommendations = recommendation_cache.get(cache_key)
+        if final_recommendations is None:
+            final_recommendations = _run_cascade(data, features, timer)
+            if final_recommendations is None:
+                return jsonify({'error': 'Crop prediction failed'}), 500
+            recommendation_cache.put(cache_key, final_recommendations)
+
+        # Store the top recommendation; queued for the background writer, not awaited
+        if final_recommendations:
+            top = final_recommendations[0]
+            with timer('storage'):
+                storage_service.store_crop_prediction(
+                    sensor_data=data, # Simple pass through
+                    predicted_crop=top['crop']['crop'],
+                    confidence=top['crop']['confidence'],
+                    device_id=data.get('device_id', 'web_client'),
+                    location=data.get('location', None)
+                )
+
+        with timer('serialize'):
+            return jsonify(select_fields({
+                'status': 'success',
+                'recommendations': final_recommendations,
+                'used_params': data
+            }, request.args.get('fields')))
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'Internal Server Error', 'details': str(e)}), 500
+
+
+def _run_cascade(data, features, timer):
+    """
+    Crop -> fertilizer -> yield for the top 5 crops.
+    Returns None when crop prediction fails.
+    """
+    # Get crop predictions
+    crop_type_input = data.get('crop_type')
+    lang = data.get('lang', 'en')
+    with timer('crop_model'):
         crop_predictions = predictor.predict(features, top_n=5, lang=lang, crop_type=crop_type_input)
 
+    if not crop_predictions:
+        return None
+
+    # Determine season (User input > Auto-detect)
+    season = data.get('season')
+    if not season:
+        month = datetime.now().month
+        if 6 <= month <= 9: session = 'Kharif'
+        elif 10 <= month <= 2: session = 'Rabi'
+        else: session = 'Zaid'
         
-        if not crop_predictions:
-            return jsonify({'error': 'Crop prediction failed'}), 500
-        
-        # Determine season (User input > Auto-detect)
-        season = data.get('season')
-        if not season:
-            month = datetime.now().month
-            if 6 <= month <= 9: session = 'Kharif'
-            elif 10 <= month <= 2: session = 'Rabi'
-            else: session = 'Zaid'
-            
-        dist_avg_fert = 120.0 # kg/ha
-        dist_avg_pest = 0.5   # kg/ha
-        
-        # Combined results
-        final_recommendations = []
+    dist_avg_fert = 120.0 # kg/ha
+    dist_avg_pest = 0.5   # kg/ha
+    
+    # Combined results
+    final_recommendations = []
+    
+    for crop_info in crop_predictions:
+        crop_name = crop_info['crop']
         
-        for crop_info in crop_predictions:
-            crop_name = crop_info['crop']
-            
-            # 1. Fertilizer Recommendation
+        # 1. Fertilizer Recommendation
+        with timer('fertilizer'):
             fertilizer_result = fertilizer_recommender.recommend(
                 temperature=float(data.get('temperature', 25)),
                 humidity=float(data.get('humidity', 60)),
@@ -88,8 +142,9 @@ def recommend():
                 phosphorous=float(data.get('P', 0)),
                 lang=lang
             )
-            
-            # 2. Yield Prediction
+        
+        # 2. Yield Prediction
+        with timer('yield'):
             predicted_yield_val = yield_predictor.predict(
                 state=data.get('state', 'Telangana'), 
                 district=data.get('district', 'Warangal'),
@@ -100,53 +155,51 @@ def recommend():
                 pesticide=float(data.get('pesticide_usage', dist_avg_pest)),
                 soil_type=data.get('soil_type', 'Loamy')
             )
-            
-            # Store primary prediction only (top crop) if needed, 
-            # but usually we want to store what the user finally selects.
-            # For now, let's keep it simple and return all.
-            
-            final_recommendations.append({
-                'crop': crop_info,
-                'fertilizer': {
-                    'name': fertilizer_result['fertilizer'],
-                    'translated_name': fertilizer_result.get('translated_fertilizer'),
-                    'confidence': fertilizer_result['confidence'],
-                    'reasoning': fertilizer_result['reasoning'],
-                    'application_tips': fertilizer_result.get('application_tips', [])
-                },
-                'yield': {
-                    'predicted_yield': predicted_yield_val,
-                    'unit': 'tons/ha',
-                    'season': season
-                }
-            })
-
-        # Storage logic (optional: store top recommendation)
-        if final_recommendations:
-            top = final_recommendations[0]
-            storage_service.store_crop_prediction(
-                sensor_data=data, # Simple pass through
-                predicted_crop=top['crop']['crop'],
-                confidence=top['crop']['confidence'],
-                device_id=data.get('device_id', 'web_client'),
-                location=data.get('location', None)
-            )
-
-        return jsonify({
-            'status': 'success',
-            'recommendations': final_recommendations,
-            'used_params': data
+        
+        # Store primary prediction only (top crop) if needed, 
+        # but usually we want to store what the user finally selects.
+        # For now, let's keep it simple and return all.
+        
+        final_recommendations.append({
+            'crop': crop_info,
+            'fertilizer': {
+                'name': fertilizer_result['fertilizer'],
+                'translated_name': fertilizer_result.get('translated_fertilizer'),
+                'confidence': fertilizer_result['confidence'],
+                'reasoning': fertilizer_result['reasoning'],
+                'application_tips': fertilizer_result.get('application_tips', [])
+            },
+            'yield': {
+                'predicted_yield': predicted_yield_val,
+                'unit': 'tons/ha',
+                'season': season
+            }
         })
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': 'Internal Server Error', 'details': str(e)}), 500
+    return final_recommendations
 
+@predict_bp.route('/weather/cache-stats', methods=['GET'])
+def weather_cache_stats():
+    """
+    Hit rates of the weather caches and the most requested locations.
+    """
+    return jsonify(weather_service.stats())
+
+@predict_bp.route('/cache-stats', methods=['GET'])
+def recommendation_cache_stats():
+    """
+    Hit rate of the recommendation memo cache and the model set version it holds.
+    """
+    return jsonify(recommendation_cache.stats())
+
+@predict_bp.route('/storage-stats', methods=['GET'])
+def prediction_storage_stats():
+    """
+    Queue depth, batch flush latency and spill/drop counts of the background prediction writer.
+    """
+    return jsonify(writer.stats())
 
-    except Exception as e:
-        print(f"Prediction API Error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': 'Internal Server Error', 'details': str(e)}), 500
 
+# Cache counters on /metrics
+metrics.expose_stats('weather_cache', weather_service.stats, "Weather cache counters")
+metrics.expose_stats('recommendation_cache', recommendation_cache.stats, "Recommendation memo cache counters")
@@ -22,3 +22,32 @@ def predict_recovery():
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@recovery_bp.route('/schemes', methods=['POST'])
+def eligible_schemes():
+    """
+    Scheme eligibility for many farmers at once, e.g. a district after a flood:
+    {"farmers": [{"damage_percentage", "damage_type", "N", "soil_health"?}, ...]}.
+    Each farmer gets a list of scheme names; the schemes themselves are
+    returned once under "schemes".
+    """
+    try:
+        farmers = (request.json or {}).get('farmers')
+        if not isinstance(farmers, list):
+            return jsonify({"error": "Missing farmers"}), 400
+        if not all(isinstance(f, dict) for f in farmers):
+            return jsonify({"error": "Each farmer must be an object"}), 400
+
+        results = recovery_manager.scheme_service.get_eligible_schemes_batch(farmers)
+        catalog = {}
+        for schemes in results:
+            for scheme in schemes:
+                catalog.setdefault(str(scheme.get('scheme_name')), scheme)
+        return jsonify({
+            "results": [[s.get('scheme_name') for s in schemes] for schemes in results],
+            "schemes": catalog
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,86 +1,141 @@
 from flask import Blueprint, jsonify, request, send_file
 from datetime import datetime
 from services.aggregation_service import AggregationService
-import subprocess
-import json
+from services.pdf_renderer import renderer_pool, PdfRenderError, TEMPLATE_VERSION
+from services.report_store import report_store, artifact_key
+from utils.cache import TTLCache
+from utils.metrics import metrics
+import io
 import os
-import tempfile
 
 report_bp = Blueprint('report', __name__)
 agg_service = AggregationService()
 
+# One aggregation per device and window every TTL seconds, shared by all callers
+summary_cache = TTLCache(
+    ttl=float(os.getenv('REPORT_SUMMARY_TTL', '300')),
+    stale_ttl=float(os.getenv('REPORT_SUMMARY_STALE', '600')),
+    name='report_summary_cache',
+    max_entries=1024
+)
+metrics.expose_stats('report_summary_cache', summary_cache.stats, "Soil health summary cache counters")
+
+
+def _build_summary(device_id, days):
+    stats = agg_service.get_30_day_average(device_id, days=days)
+    return {
+        'report_id': f"RPT-{int(datetime.now().timestamp())}",
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'device_id': device_id,
+        'period': f'Last {days} Days',
+        'soil_health_summary': stats,
+        'overall_status': 'Good' # Logic to determine status could be added
+    }
+
+
 @report_bp.route('/summary', methods=['GET'])
 def get_summary_report():
     """
     Returns a unified soil health report based on aggregated data.
+    ?device_id=...&days=N (default 30) select the device and window; each
+    combination is cached (summary_cache) and served with an ETag.
     """
     try:
-        # Fetch 30-day aggregation
-        stats = agg_service.get_30_day_average()
-        
-        report = {
-            'report_id': f"RPT-{int(datetime.now().timestamp())}",
-            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'period': 'Last 30 Days',
-            'soil_health_summary': stats,
-            'overall_status': 'Good' # Logic to determine status could be added
-        }
-        
-        return jsonify(report)
+        device_id = request.args.get('device_id', 'pi_01')
+        days = min(max(request.args.get('days', 30, type=int), 1), 365)
+
+        report = summary_cache.get_or_load((device_id, days), lambda: _build_summary(device_id, days))
+        if report is None:
+            return jsonify({'error': 'Could not build the soil health summary'}), 500
+
+        response = jsonify(report)
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+def _pdf_response(pdf, key, cache_status):
+    response = send_file(
+        io.BytesIO(pdf),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'mitti-mitra-report-{datetime.now().strftime("%Y%m%d")}.pdf',
+        etag=False,
+        conditional=False
+    )
+    response.set_etag(key)
+    response.headers['X-Report-Key'] = key
+    response.headers['X-Report-Cache'] = cache_status
+    response.headers['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
 @report_bp.route('/download-pdf', methods=['POST'])
 def download_pdf():
     """
     Generate and download PDF report with crop and fertilizer recommendations.
     Expects JSON body with: crops, fertilizer_recommendation, used_params
+    Rendered by the long-lived Node renderer pool and streamed from memory.
+    Reports are content-addressed (hash of the payload and template version):
+    repeats are served from report_store, the key is the ETag, and a client
+    sending it in If-None-Match gets 304 without a render.
+    The key is also returned in X-Report-Key for GET /api/report/pdf/<key>.
     """
     try:
         data = request.json
         if not data:
             return jsonify({'error': 'No data provided'}), 400
-        
-        # Call Node.js PDF service
-        # Create temporary file for data
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(data, f)
-            temp_file = f.name
-        
+
+        key = artifact_key(data, TEMPLATE_VERSION)
+        if key in request.if_none_match:
+            return '', 304, {'ETag': f'"{key}"', 'X-Report-Key': key}
+
+        pdf = report_store.get(key) if report_store else None
+        if pdf is not None:
+            return _pdf_response(pdf, key, 'hit')
+
         try:
-            # Call Node.js script to generate PDF
-            result = subprocess.run(
-                ['node', 'generate_pdf.js', temp_file],
-                cwd=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'services'),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode != 0:
-                print(f"PDF generation error: {result.stderr}")
-                return jsonify({'error': 'PDF generation failed', 'details': result.stderr}), 500
-            
-            # Get the PDF file path from stdout
-            pdf_path = result.stdout.strip()
-            
-            if os.path.exists(pdf_path):
-                return send_file(
-                    pdf_path,
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=f'mitti-mitra-report-{datetime.now().strftime("%Y%m%d")}.pdf'
-                )
-            else:
-                return jsonify({'error': 'PDF file not found'}), 500
-                
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
-            
+            pdf = renderer_pool.render(data)
+        except PdfRenderError as e:
+            print(f"PDF generation error: {e}")
+            return jsonify({'error': 'PDF generation failed', 'details': str(e)}), 500
+
+        if report_store:
+            report_store.put(key, pdf)
+        return _pdf_response(pdf, key, 'miss')
+
     except Exception as e:
         print(f"PDF download error: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': 'Internal Server Error', 'details': str(e)}), 500
+
+
+@report_bp.route('/pdf/<key>', methods=['GET'])
+def get_cached_pdf(key):
+    """
+    A previously rendered report by its key, e.g. for a link shared by SMS.
+    404 once it has been evicted; POST the payload to /download-pdf again.
+    """
+    if not report_store or len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+        return jsonify({'error': 'not_found'}), 404
+    if key in request.if_none_match:
+        return '', 304, {'ETag': f'"{key}"'}
+
+    pdf = report_store.get(key)
+    if pdf is None:
+        return jsonify({'error': 'not_found', 'message': 'Report expired from the cache.'}), 404
+    return _pdf_response(pdf, key, 'hit')
+
+
+@report_bp.route('/cache-stats', methods=['GET'])
+def get_report_cache_stats():
+    """
+    Counters for the summary cache and the rendered report store.
+    """
+    return jsonify({
+        'summary': summary_cache.stats(),
+        'artifacts': report_store.stats() if report_store else None,
+        'template_version': TEMPLATE_VERSION,
+    })
@@ -1,9 +1,17 @@
 from flask import Blueprint, request, jsonify
-from config.supabase_client import supabase
-from datetime import datetime
+from storage import store
+from services.aggregation_service import AggregationService
+from utils.helpers import select_fields
+from datetime import datetime, timedelta
+import math
+import os
 import random
 
 sensor_bp = Blueprint('sensor', __name__)
+agg_service = AggregationService()
+
+# Longest /history window; daily rollups are kept forever (database/schema_rollups.sql)
+HISTORY_MAX_DAYS = float(os.getenv('HISTORY_MAX_DAYS', '3650'))
 
 def map_single_record(r):
     """
@@ -52,7 +60,7 @@ def receive_data():
         
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] TELEMETRY INGESTED: {data}")
 
-    if supabase:
+    if store:
         try:
             ph_val = data.get('soil_ph') or data.get('ph') or data.get('pH') or data.get('ph_level')
             n_val = data.get('nitrogen') or data.get('N')
@@ -71,7 +79,7 @@ def receive_data():
                 'created_at': datetime.now().isoformat()
             }
             
-            supabase.table('sensor_readings').insert(record).execute()
+            store.insert_reading(record)
             return jsonify({'status': 'stored'}), 201
         except Exception as e:
             print(f"Insert Error: {e}")
@@ -84,22 +92,17 @@ def get_latest():
     """
     Get the latest sensor reading.
     """
-    if supabase:
+    if store:
         try:
-            response = supabase.table('sensor_readings')\
-                .select('*')\
-                .order('created_at', desc=True)\
-                .limit(1)\
-                .execute()
-            
-            if response.data:
-                return jsonify(map_single_record(response.data[0]))
+            latest = store.latest_reading()
+            if latest:
+                return jsonify(map_single_record(latest))
         except Exception as e:
             print(f"Fetch Error: {e}")
             
     return jsonify({'error': 'no_data', 'message': 'No sensor readings found.'}), 404
 
-from services.aggregator import get_aggregated_data
+from services.aggregator import get_aggregated_data, aggregate_cache
 
 @sensor_bp.route('/aggregate', methods=['GET'])
 def get_aggregate():
@@ -111,21 +114,50 @@ def get_aggregate():
         return jsonify({'error': 'failed_to_fetch', 'message': 'Could not fetch data from ThingSpeak'}), 500
     return jsonify(stats)
 
+@sensor_bp.route('/aggregate/cache-stats', methods=['GET'])
+def get_aggregate_cache_stats():
+    """
+    Hit/miss/coalescing counters for the aggregate cache.
+    """
+    return jsonify(aggregate_cache.stats())
+
 @sensor_bp.route('/history', methods=['GET'])
 def get_history():
     """
-    Get the last 30 sensor readings.
+    Get sensor history.
+    Default: the last 30 raw readings.
+    With ?hours=N or ?days=N (optionally &device_id=...) the readings for that
+    window are served from the matching resolution tier (raw, hourly, daily).
+    Windows are capped at HISTORY_MAX_DAYS; non-positive or non-numeric
+    values get 400.
+    ?fields=timestamp,nitrogen limits each reading to those fields.
     """
-    if supabase:
+    device_id = request.args.get('device_id')
+
+    window = None
+    for unit, per_day in (('hours', 24), ('days', 1)):
+        raw = request.args.get(unit)
+        if raw is None:
+            continue
         try:
-            response = supabase.table('sensor_readings')\
-                .select('*')\
-                .order('created_at', desc=True)\
-                .limit(30)\
-                .execute()
-            
-            return jsonify([map_single_record(r) for r in response.data])
+            value = float(raw)
+        except ValueError:
+            value = float('nan')
+        if not math.isfinite(value) or value <= 0:
+            return jsonify({'error': 'invalid_window', 'message': f'{unit} must be a positive number'}), 400
+        window = timedelta(days=min(value / per_day, HISTORY_MAX_DAYS))
+        break
+
+    if store:
+        try:
+            resolution, rows = agg_service.get_history(device_id=device_id, window=window, limit=30)
+            records = select_fields([map_single_record(r) for r in rows], request.args.get('fields'))
+            if window:
+                return jsonify({'resolution': resolution, 'readings': records})
+            return jsonify(records)
         except Exception as e:
             print(f"History Fetch Error: {e}")
-            
+
+    if window:
+        return jsonify({'resolution': None, 'readings': []})
     return jsonify([])
@@ -1,36 +1,102 @@
 from flask import Blueprint, request, jsonify
-import requests
+from services.sms_outbox import outbox, normalize_numbers, SmsSendError
 import os
 
 sms_api = Blueprint('sms', __name__)
 
+# SMS_OUTBOX=off sends inline on the request thread (the old behaviour)
+QUEUED = os.getenv('SMS_OUTBOX', 'on').lower() != 'off'
+
+
+def _provider_missing():
+    return jsonify({"error": "Fast2SMS API Key missing"}), 500
+
+
+def _queue_full():
+    return jsonify({"error": "SMS queue is full, try again shortly"}), 503, {'Retry-After': '5'}
+
+
 @sms_api.route('/send', methods=['POST'])
 def send_sms():
-    data = request.json
-    phone = data.get('phone')
+    """
+    Queues one message for `phone` (a number, comma separated numbers or a
+    list) and returns 202 with the outbox id; delivery status is at
+    /api/sms/status/<id>.
+    """
+    data = request.json or {}
+    numbers = normalize_numbers(data.get('phone'))
     message = data.get('message')
-    api_key = os.getenv("FAST2SMS_API_KEY")
 
-    if not phone or not message:
+    if not numbers or not message:
+        return jsonify({"error": "Missing phone or message"}), 400
+
+    if not outbox.provider:
+        return _provider_missing()
+
+    if not QUEUED:
+        try:
+            return jsonify(outbox.provider.send(numbers, message)), 200
+        except SmsSendError as e:
+            return jsonify({"error": str(e)}), 502
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    outbox_id = outbox.enqueue(numbers, message)
+    if outbox_id is None:
+        return _queue_full()
+    return jsonify({"status": "queued", "id": outbox_id, "numbers": len(numbers)}), 202
+
+
+@sms_api.route('/send-bulk', methods=['POST'])
+def send_bulk():
+    """
+    Queues many messages at once, e.g. advisories for a whole district:
+    {"messages": [{"phone": ..., "message": ...}, ...]}. Recipients of the
+    same text are sent together. Returns one outbox id per message, null
+    where the message was invalid or the queue was full.
+    """
+    items = (request.json or {}).get('messages')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Missing messages"}), 400
+
+    if not outbox.provider:
+        return _provider_missing()
+
+    ids, invalid, full = [], 0, 0
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        numbers = normalize_numbers(item.get('phone'))
+        message = item.get('message')
+        outbox_id = None
+        if not numbers or not message:
+            invalid += 1
+        else:
+            outbox_id = outbox.enqueue(numbers, message)
+            if outbox_id is None:
+                full += 1
+        ids.append(outbox_id)
+
+    if full and full + invalid == len(items):
+        return _queue_full()
+    if invalid == len(items):
         return jsonify({"error": "Missing phone or message"}), 400
+    return jsonify({"status": "queued", "ids": ids, "invalid": invalid, "rejected": full}), 202
+
+
+@sms_api.route('/status/<outbox_id>', methods=['GET'])
+def sms_status(outbox_id):
+    """
+    queued, sending, retrying, then sent, failed or partial, with per-number counts.
+    """
+    status = outbox.status(outbox_id)
+    if status is None:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(status)
+
 
-    if not api_key:
-        return jsonify({"error": "Fast2SMS API Key missing"}), 500
-
-    url = "https://www.fast2sms.com/dev/bulkV2"
-    payload = {
-        "message": message,
-        "language": "english",
-        "route": "q",
-        "numbers": phone,
-    }
-    headers = {
-        "authorization": api_key,
-        "Content-Type": "application/json"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        return jsonify(response.json()), response.status_code
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+@sms_api.route('/outbox-stats', methods=['GET'])
+def outbox_stats():
+    """
+    Queue depth, provider calls, numbers per call, retries and rate-limit waits.
+    """
+    return jsonify(outbox.stats())
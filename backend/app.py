@@ -13,8 +13,17 @@ sys.path.append(os.path.dirname(current_dir))
 load_dotenv(os.path.join(current_dir, '.env'))
 
 def create_app():
+    from utils.json_provider import FastJSONProvider
+    from utils.compression import init_compression
+    from utils.metrics import init_metrics
+    from utils.profiler import init_profiler
+
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)  # orjson when installed
     CORS(app)  # Allow Frontend to communicate
+    init_metrics(app)  # registered first so request timings include compression
+    init_compression(app)
+    init_profiler(app)  # after compression, so profile=return bodies are compressed too
 
     # Import Blueprints (Assumes these files will be created next)
     # We use deferred imports inside create_app to avoid circular dependencies if any
@@ -44,9 +53,18 @@ def create_app():
             "version": "1.0.0"
         })
 
+    @app.route('/api/http-stats')
+    def http_stats():
+        """
+        Per-host latency histograms, retries and circuit state for outbound calls.
+        """
+        from utils.http_client import http
+        return jsonify(http.stats())
+
     return app
 
 if __name__ == '__main__':
+    # Development server. Production: gunicorn -c gunicorn.conf.py wsgi:app (docs/deployment.md)
     from services.thingspeak_worker import run_thingspeak_ingestion
     import threading
     
@@ -0,0 +1,401 @@
+"""
+End-to-end throughput, latency and memory per API blueprint.
+
+Starts the backend in a subprocess (werkzeug threaded server, or gunicorn
+with gunicorn.conf.py) fully offline:
+- storage: SQLite in a temp dir, seeded with synthetic readings
+- weather: the deterministic mock provider
+- LLM: GEMINI_API_KEY removed, so the advisor takes its mock path
+- ThingSpeak: thingspeak_stub.py, and Fast2SMS: sms_stub.py, both
+  served from threads in this process on free ports
+
+Every scenario (predict, sensor, report, disease, recovery, sms) is then
+driven at each concurrency level with one requests.Session per client
+thread. Per scenario and level it records requests/s, p50/p95/p99/max
+latency, error count and the server's RSS (master + workers) afterwards.
+
+Results are machine-readable with --json / --out. --save-baseline writes
+them to a file; --compare reads one back and exits 1 when a scenario's
+throughput dropped, or its p95 latency rose, by more than --threshold.
+Only compare runs made on the same machine with the same options.
+
+Usage:
+    python benchmarks/bench_api.py --concurrency 1,8 --requests 200
+    python benchmarks/bench_api.py --save-baseline benchmarks/baseline_api.json
+    python benchmarks/bench_api.py --compare benchmarks/baseline_api.json --threshold 0.15
+    python benchmarks/bench_api.py --server gunicorn --workers 4 --only predict,sensor
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+SAMPLE = {
+    'N': 52, 'P': 38, 'K': 41, 'ph': 6.4, 'moisture': 40,
+    'temperature': 27.5, 'humidity': 71, 'rainfall': 180, 'location': 'Hyderabad',
+    'state': 'Telangana', 'district': 'Rangareddy', 'season': 'Kharif', 'soil_type': 'Loamy',
+}
+
+RECOVERY = {
+    'N': 45, 'P': 50, 'K': 50, 'ph': 6.5, 'moisture': 85, 'temperature': 25, 'humidity': 80,
+    'rainfall': 200, 'damage_type': 'Pest Attack', 'damage_percentage': 40, 'growth_stage': 3,
+    'days_remaining': 50,
+}
+
+READING = {
+    'device_id': 'MM-POLE-900', 'temperature': 28.1, 'humidity': 64, 'soil_ph': 6.7,
+    'nitrogen': 61, 'phosphorus': 33, 'potassium': 45, 'moisture': 38,
+}
+
+PDF_DATA = {
+    'crops': [{'crop': 'rice', 'confidence': 0.82}],
+    'fertilizer_recommendation': {'name': 'Urea', 'quantity': '120 kg/ha'},
+    'used_params': SAMPLE,
+}
+
+# Not a decodable image: without the trained model the disease predictor
+# takes its mock path and never opens the file
+FAKE_LEAF = b'\xff\xd8\xff\xe0' + bytes(range(256)) * 64
+
+
+def _recommend_unique(i):
+    # Distinct cache keys (N and moisture are quantized to 1.0) for 7200 requests
+    return {'json': dict(SAMPLE, N=20 + i % 120, moisture=20 + (i // 120) % 60)}
+
+
+def _disease(i):
+    return {'files': {'image': (f'leaf_{i}.jpg', FAKE_LEAF, 'image/jpeg')}}
+
+
+# name -> (blueprint, method, path, request kwargs for the i-th call)
+SCENARIOS = {
+    'predict.recommend': ('predict', 'POST', '/api/predict/recommend', _recommend_unique),
+    'predict.recommend_cached': ('predict', 'POST', '/api/predict/recommend', lambda i: {'json': SAMPLE}),
+    'sensor.ingest': ('sensor', 'POST', '/api/sensor/data', lambda i: {'json': READING}),
+    'sensor.latest': ('sensor', 'GET', '/api/sensor/latest', lambda i: {}),
+    'sensor.aggregate': ('sensor', 'GET', '/api/sensor/aggregate', lambda i: {}),
+    'sensor.history_24h': ('sensor', 'GET', '/api/sensor/history?hours=24&device_id=MM-POLE-001', lambda i: {}),
+    'report.summary': ('report', 'GET', '/api/report/summary', lambda i: {}),
+    'report.pdf': ('report', 'POST', '/api/report/download-pdf', lambda i: {'json': PDF_DATA}),
+    'disease.predict': ('disease', 'POST', '/api/disease/predict', _disease),
+    'recovery.predict': ('recovery', 'POST', '/api/recovery/predict', lambda i: {'json': RECOVERY}),
+    'sms.send': ('sms', 'POST', '/api/sms/send',
+                 lambda i: {'json': {'phone': '9999999999', 'message': f'Soil report #{i} is ready'}}),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def pdf_renderer_available():
+    if not shutil.which('node'):
+        return False
+    check = subprocess.run(['node', '-e', "require.resolve('pdfkit')"], cwd=os.path.join(BACKEND_DIR, 'services'),
+                           capture_output=True)
+    return check.returncode == 0
+
+
+# --- offline upstreams ---
+
+def serve(app):
+    """
+    Runs a WSGI app on a free port in a daemon thread; returns its base URL.
+    """
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no access log per stub request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+# --- server under test ---
+
+def server_env(tmp, thingspeak_url, sms_url):
+    env = dict(os.environ, STORAGE_BACKEND='sqlite', SQLITE_PATH=os.path.join(tmp, 'bench.db'),
+               WEATHER_PROVIDER='mock', PREDICTION_SPILL_PATH=os.path.join(tmp, 'spill.jsonl'),
+               ARCHIVE_DIR=os.path.join(tmp, 'archive'), PROFILE_DIR=os.path.join(tmp, 'profiles'),
+               REPORT_CACHE_DIR=os.path.join(tmp, 'report_cache'),
+               THINGSPEAK_BASE_URL=thingspeak_url, THINGSPEAK_CHANNEL_ID='1', THINGSPEAK_READ_KEY='stub',
+               FAST2SMS_URL=sms_url + '/dev/bulkV2', FAST2SMS_API_KEY='bench', INGESTION='off')
+    for key in ('GEMINI_API_KEY', 'OPENWEATHER_API_KEY', 'SUPABASE_URL', 'SUPABASE_KEY', 'PROFILE_TOKEN'):
+        env.pop(key, None)
+    return env
+
+
+def start_server(kind, port, env, workers, threads):
+    if kind == 'gunicorn':
+        env = dict(env, PORT=str(port), WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads))
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    else:
+        cmd = [sys.executable, '-c',
+               f"from app import create_app; create_app().run(host='127.0.0.1', port={port}, threaded=True)"]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(url, proc, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc and proc.poll() is not None:
+            return False
+        try:
+            requests.get(url, timeout=2)
+            return True
+        except requests.RequestException:
+            time.sleep(0.5)
+    return False
+
+
+def process_tree(pid):
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            for child in f.read().split():
+                pids.extend(process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def rss_mb(pid):
+    """
+    VmRSS and VmHWM (peak) summed over the server process and its workers.
+    """
+    rss = peak = 0
+    for p in process_tree(pid):
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        rss += int(line.split()[1])
+                    elif line.startswith('VmHWM:'):
+                        peak += int(line.split()[1])
+        except OSError:
+            continue
+    return round(rss / 1024, 1), round(peak / 1024, 1)
+
+
+# --- load generation ---
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def drive(base, scenario, concurrency, total, warmup):
+    """
+    Sends `total` requests with `concurrency` client threads; returns
+    (latencies in ms, error count, wall seconds).
+    """
+    _, method, path, make = SCENARIOS[scenario]
+    url = base + path
+    counter = iter(range(warmup + total))
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    with requests.Session() as session:
+        for i in range(warmup):
+            session.request(method, url, timeout=120, **make(next(counter)))
+
+    def client():
+        with requests.Session() as session:
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                start = time.perf_counter()
+                try:
+                    ok = session.request(method, url, timeout=120, **make(i)).status_code < 400
+                except requests.RequestException:
+                    ok = False
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if not ok:
+                        errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def run_scenario(base, pid, scenario, concurrency, total, warmup):
+    latencies, errors, wall = drive(base, scenario, concurrency, total, warmup)
+    latencies.sort()
+    rss, peak = rss_mb(pid) if pid else (None, None)
+    return {
+        'scenario': scenario,
+        'blueprint': SCENARIOS[scenario][0],
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / wall, 1) if wall else None,
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+        'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        'max_ms': round(latencies[-1], 2) if latencies else None,
+        'rss_mb': rss,
+        'rss_peak_mb': peak,
+    }
+
+
+# --- baselines ---
+
+def _key(row):
+    return f"{row['scenario']}@{row['concurrency']}"
+
+
+def compare(results, baseline, threshold):
+    """
+    One row per scenario/concurrency present in both runs. A regression is
+    rps below (1 - threshold) x baseline, p95 above (1 + threshold) x
+    baseline, or errors where the baseline had none.
+    """
+    previous = {_key(r): r for r in baseline.get('results', [])}
+    rows = []
+    for r in results:
+        b = previous.get(_key(r))
+        if not b:
+            continue
+        reasons = []
+        if b['rps'] and r['rps'] is not None and r['rps'] < b['rps'] * (1 - threshold):
+            reasons.append(f"rps {b['rps']} -> {r['rps']}")
+        if b['p95_ms'] and r['p95_ms'] is not None and r['p95_ms'] > b['p95_ms'] * (1 + threshold):
+            reasons.append(f"p95 {b['p95_ms']}ms -> {r['p95_ms']}ms")
+        if r['errors'] and not b['errors']:
+            reasons.append(f"errors 0 -> {r['errors']}")
+        rows.append({
+            'key': _key(r),
+            'rps_change': round(r['rps'] / b['rps'] - 1, 3) if b['rps'] and r['rps'] is not None else None,
+            'p95_change': round(r['p95_ms'] / b['p95_ms'] - 1, 3) if b['p95_ms'] and r['p95_ms'] is not None else None,
+            'regressions': reasons,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,8', help="Comma-separated client thread counts")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help="Comma-separated blueprints or scenario names")
+    parser.add_argument('--server', choices=['werkzeug', 'gunicorn'], default='werkzeug')
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers")
+    parser.add_argument('--threads', type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument('--url', help="Benchmark an already running server instead of starting one")
+    parser.add_argument('--pid', type=int, help="With --url: server pid to read RSS from")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    parser.add_argument('--out', help="Also write the JSON results here")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Write the results as a baseline")
+    parser.add_argument('--compare', metavar='PATH', help="Baseline to compare against; exits 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Allowed relative change before flagging")
+    args = parser.parse_args()
+
+    selected = [s.strip() for s in args.only.split(',')] if args.only else None
+    scenarios = [name for name, (blueprint, *_) in SCENARIOS.items()
+                 if not selected or name in selected or blueprint in selected]
+    if 'report.pdf' in scenarios and not pdf_renderer_available():
+        print("Skipping report.pdf: node or pdfkit is not installed.", file=sys.stderr)
+        scenarios.remove('report.pdf')
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    proc, tmp = None, None
+    if args.url:
+        base, pid = args.url.rstrip('/'), args.pid
+    else:
+        import sms_stub
+        import thingspeak_stub
+        tmp = tempfile.mkdtemp(prefix='mm_api_')
+        env = server_env(tmp, serve(thingspeak_stub.app), serve(sms_stub.app))
+        seed = ("from storage.sqlite_store import SQLiteStorage; "
+                f"SQLiteStorage({env['SQLITE_PATH']!r}).seed_readings(devices=2, days=2, interval_minutes=15)")
+        subprocess.run([sys.executable, '-c', seed], cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+        port = free_port()
+        proc = start_server(args.server, port, env, args.workers, args.threads)
+        base, pid = f'http://127.0.0.1:{port}', proc.pid
+
+    try:
+        if not wait_ready(base + '/', proc):
+            raise SystemExit(f"Server at {base} did not start")
+        idle_rss = rss_mb(pid)[0] if pid else None
+        results = [run_scenario(base, pid, name, c, args.requests, args.warmup)
+                   for name in scenarios for c in levels]
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'server': 'external' if args.url else args.server,
+            'workers': args.workers if args.server == 'gunicorn' and not args.url else None,
+            'requests': args.requests,
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'idle_rss_mb': idle_rss,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for field in ('server', 'workers', 'requests', 'cpus'):
+            if baseline.get('meta', {}).get(field) != report['meta'][field]:
+                print(f"Warning: baseline {field}={baseline['meta'].get(field)!r}, this run {report['meta'][field]!r}",
+                      file=sys.stderr)
+        comparison = compare(results, baseline, args.threshold)
+        report['comparison'] = comparison
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'scenario':<26} {'conc':>4} {'req':>5} {'err':>4} {'req/s':>8} {'p50':>8} {'p95':>8} "
+              f"{'p99':>8} {'max':>8} {'RSS MB':>7}")
+        for r in results:
+            print(f"{r['scenario']:<26} {r['concurrency']:>4} {r['requests']:>5} {r['errors']:>4} {r['rps']:>8.1f} "
+                  f"{r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms {r['max_ms']:>6.1f}ms "
+                  f"{r['rss_mb'] if r['rss_mb'] is not None else '-':>7}")
+        if comparison is not None:
+            print(f"\nAgainst {args.compare} (threshold {args.threshold:.0%}):")
+            for row in comparison:
+                status = 'REGRESSION ' + '; '.join(row['regressions']) if row['regressions'] else 'ok'
+                rps, p95 = (f"{row[k]:+.1%}" if row[k] is not None else '-' for k in ('rps_change', 'p95_change'))
+                print(f"{row['key']:<31} rps {rps:>7}  p95 {p95:>7}  {status}")
+
+    if comparison and any(row['regressions'] for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
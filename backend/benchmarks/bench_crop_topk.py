@@ -0,0 +1,123 @@
+"""
+Microbenchmark for CropPredictor top-k selection and crop_type filtering.
+
+Compares, per batch size:
+- selection: the previous per-row path (Python loop over classes_ to zero
+  disallowed crops, full argsort) vs precomputed masks + argpartition on
+  an (N, classes) probability matrix
+- predict: N calls to CropPredictor.predict vs one predict_batch call
+
+When the trained model in backend/models cannot be loaded, a small random
+forest is fitted on synthetic data so the benchmark still runs offline.
+
+Usage:
+    python benchmarks/bench_crop_topk.py --batches 1,16,256,4096 --top-n 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(BACKEND_DIR))
+
+from ml.predictor import CropPredictor
+
+CLASSES = sorted(CropPredictor.AGRI_CROPS + CropPredictor.HORTI_CROPS)
+
+
+def synthetic_model(rng):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    X = rng.uniform([0, 5, 5, 8, 14, 3.5, 20], [140, 145, 205, 44, 100, 9.9, 300], size=(2200, 7))
+    y = rng.choice(CLASSES, size=len(X))
+    encoder = LabelEncoder().fit(CLASSES)
+    model = RandomForestClassifier(n_estimators=50, max_depth=10, random_state=0).fit(X, encoder.transform(y))
+    return model, encoder
+
+
+def legacy_select(probs, classes, top_n, crop_type):
+    """
+    The per-row selection CropPredictor.predict used before masks/argpartition.
+    """
+    out = []
+    for row in probs:
+        row = row.copy()
+        if crop_type:
+            allowed = set(CropPredictor.AGRI_CROPS) if crop_type == 'agriculture' else set(CropPredictor.HORTI_CROPS)
+            for i, crop_name in enumerate(classes):
+                if crop_name.lower() not in allowed:
+                    row[i] = 0.0
+        out.append(row.argsort()[-top_n:][::-1])
+    return out
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batches', default='1,16,256,4096')
+    parser.add_argument('--top-n', type=int, default=5)
+    parser.add_argument('--crop-type', default='agriculture')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    predictor = CropPredictor()
+    if not (predictor.agri_model and predictor.label_encoder):
+        print("Trained crop model unavailable; using a synthetic random forest.")
+        predictor.agri_model, predictor.label_encoder = synthetic_model(rng)
+        predictor.preprocessor.scaler = None
+        predictor.crop_type_masks = predictor._build_crop_type_masks()
+    classes = predictor.label_encoder.classes_
+
+    results = []
+    for n in [int(b) for b in args.batches.split(',')]:
+        features = rng.uniform([0, 5, 5, 8, 14, 3.5, 20], [140, 145, 205, 44, 100, 9.9, 300], size=(n, 7))
+        probs = predictor.agri_model.predict_proba(features)
+        mask = predictor.crop_type_masks[args.crop_type]
+
+        # Same picks as the old path (up to ties)
+        new = CropPredictor.top_k(probs * mask, args.top_n)
+        old = legacy_select(probs, classes, args.top_n, args.crop_type)
+        agree = np.mean([set(a) == set(b) for a, b in zip(new, old)])
+
+        row = {
+            'batch': n,
+            'select_legacy_ms': timed(lambda: legacy_select(probs, classes, args.top_n, args.crop_type), args.repeat),
+            'select_vectorized_ms': timed(lambda: CropPredictor.top_k(probs * mask, args.top_n), args.repeat),
+            'selection_agreement': round(float(agree), 4),
+        }
+        # Per-row predict is slow for large N; cap the loop and extrapolate
+        loop_n = min(n, 256)
+        per_row = timed(lambda: [predictor.predict(f, top_n=args.top_n, crop_type=args.crop_type) for f in features[:loop_n]], 1)
+        row['predict_loop_ms'] = per_row * n / loop_n
+        row['predict_batch_ms'] = timed(lambda: predictor.predict_batch(features, top_n=args.top_n, crop_type=args.crop_type), max(1, args.repeat // 2))
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'batch':>6} {'select old':>11} {'select new':>11} {'agree':>6} {'predict xN':>11} {'predict_batch':>14}")
+    for r in results:
+        print(f"{r['batch']:>6} {r['select_legacy_ms']:>9.3f}ms {r['select_vectorized_ms']:>9.3f}ms "
+              f"{r['selection_agreement']:>6.2f} {r['predict_loop_ms']:>9.1f}ms {r['predict_batch_ms']:>12.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Payload size and JSON serialization time per endpoint.
+
+For each endpoint the response is fetched once through the Flask test
+client, then its payload is re-encoded to compare:
+- bytes: stdlib json (Flask's previous default, ASCII-escaped) vs orjson
+  (UTF-8), each identity / gzip / brotli
+- encode time: json.dumps vs orjson.dumps
+- the same endpoint with a ?fields= projection
+
+Runs offline: an SQLite store in a temp directory seeded with sensor
+history, the deterministic mock weather provider, and the ML mock paths
+when the trained models are not present.
+
+Usage:
+    python benchmarks/bench_payloads.py [--repeat 200] [--json]
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(BACKEND_DIR))
+
+TMP = tempfile.mkdtemp(prefix='mm_bench_')
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+os.environ.setdefault('SQLITE_PATH', os.path.join(TMP, 'bench.db'))
+os.environ.setdefault('WEATHER_PROVIDER', 'mock')
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SAMPLE = {
+    'N': 52, 'P': 38, 'K': 41, 'ph': 6.4, 'moisture': 40,
+    'temperature': 27.5, 'humidity': 71, 'rainfall': 180, 'location': 'Hyderabad',
+    'state': 'Telangana', 'district': 'Rangareddy', 'season': 'Kharif', 'soil_type': 'Loamy',
+}
+
+ENDPOINTS = [
+    ('recommend', 'POST', '/api/predict/recommend', SAMPLE),
+    ('recommend hi', 'POST', '/api/predict/recommend', dict(SAMPLE, lang='hi')),
+    ('recommend fields', 'POST', '/api/predict/recommend?fields=status,recommendations.crop.crop,'
+                                 'recommendations.crop.confidence,recommendations.fertilizer.name,'
+                                 'recommendations.yield', SAMPLE),
+    ('history', 'GET', '/api/sensor/history', None),
+    ('history fields', 'GET', '/api/sensor/history?fields=timestamp,nitrogen,phosphorus,potassium,ph', None),
+]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def seed():
+    from storage import store
+    store.seed_readings(devices=1, days=1, interval_minutes=30)
+
+
+def measure(client, name, method, url, body, repeat):
+    resp = client.open(url, method=method, json=body, headers={'Accept-Encoding': 'identity'})
+    payload = resp.get_json()
+
+    stdlib = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode()
+    row = {'endpoint': name, 'status': resp.status_code, 'json_bytes': len(stdlib),
+           'json_gzip': len(gzip.compress(stdlib, 6)),
+           'json_us': timed(lambda: json.dumps(payload, separators=(',', ':'), sort_keys=True), repeat)}
+    if orjson:
+        fast = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        row.update({'orjson_bytes': len(fast), 'orjson_gzip': len(gzip.compress(fast, 6)),
+                    'orjson_us': timed(lambda: orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), repeat)})
+        if brotli:
+            row['orjson_br'] = len(brotli.compress(fast, quality=5))
+
+    # What the app actually sends for a gzip/br capable client
+    wire = client.open(url, method=method, json=body, headers={'Accept-Encoding': 'br, gzip'})
+    row['wire_bytes'] = len(wire.get_data())
+    row['wire_encoding'] = wire.headers.get('Content-Encoding', 'identity')
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    seed()
+    from app import create_app
+    client = create_app().test_client()
+    results = [measure(client, *endpoint, args.repeat) for endpoint in ENDPOINTS]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'endpoint':<18} {'json B':>8} {'gzip':>7} {'orjson B':>9} {'gzip':>7} {'br':>7} "
+          f"{'wire':>11} {'json us':>8} {'orjson us':>10}")
+    for r in results:
+        print(f"{r['endpoint']:<18} {r['json_bytes']:>8} {r['json_gzip']:>7} {r.get('orjson_bytes', '-'):>9} "
+              f"{r.get('orjson_gzip', '-'):>7} {r.get('orjson_br', '-'):>7} "
+              f"{str(r['wire_bytes']) + ' ' + r['wire_encoding'][:4]:>11} "
+              f"{r['json_us']:>8.1f} {r.get('orjson_us', float('nan')):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Memory per gunicorn worker, with and without preloading the app.
+
+Starts `gunicorn -c gunicorn.conf.py wsgi:app` for each mode, warms every
+worker with /api/predict/recommend requests, then reads
+/proc/<pid>/smaps_rollup for the master and each worker:
+- RSS: resident pages, shared ones counted in full in every process
+- PSS: shared pages divided among the processes sharing them; summing PSS
+  gives the real footprint of the whole server
+- private: pages only this process has (its true marginal cost)
+
+Linux only. Runs offline (SQLite in a temp dir, mock weather, no ingestion).
+
+Usage:
+    python benchmarks/bench_worker_memory.py --workers 4 [--requests 40]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = {
+    'N': 52, 'P': 38, 'K': 41, 'ph': 6.4, 'moisture': 40,
+    'temperature': 27.5, 'humidity': 71, 'rainfall': 180, 'location': 'Hyderabad',
+    'state': 'Telangana', 'district': 'Rangareddy', 'season': 'Kharif', 'soil_type': 'Loamy',
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def smaps(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_mb': fields.get('Rss', 0) / 1024,
+        'pss_mb': fields.get('Pss', 0) / 1024,
+        'private_mb': (fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024,
+    }
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_ready(url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def run(mode, workers, requests):
+    port = free_port()
+    tmp = tempfile.mkdtemp(prefix='mm_mem_')
+    env = dict(os.environ, WEB_PRELOAD=mode, WEB_CONCURRENCY=str(workers), WEB_THREADS='1',
+               PORT=str(port), INGESTION='off', STORAGE_BACKEND='sqlite',
+               SQLITE_PATH=os.path.join(tmp, 'mem.db'), WEATHER_PROVIDER='mock')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f'http://127.0.0.1:{port}'
+        if not wait_ready(base + '/'):
+            raise RuntimeError(f"gunicorn ({mode}) did not start")
+        # Let every worker finish booting, then spread requests across them
+        while len(children(proc.pid)) < workers:
+            time.sleep(0.5)
+        for i in range(requests):
+            body = json.dumps(dict(SAMPLE, N=20 + i % 120, moisture=20 + (i // 120) % 60)).encode()
+            req = urllib.request.Request(base + '/api/predict/recommend', data=body,
+                                         headers={'Content-Type': 'application/json'})
+            urllib.request.urlopen(req, timeout=60).read()
+
+        master = smaps(proc.pid)
+        worker_stats = [smaps(pid) for pid in children(proc.pid)]
+        avg = {k: sum(w[k] for w in worker_stats) / len(worker_stats) for k in master}
+        total_pss = master['pss_mb'] + sum(w['pss_mb'] for w in worker_stats)
+        return {'mode': mode, 'workers': len(worker_stats), 'master': master, 'worker_avg': avg, 'total_pss_mb': total_pss}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [run(mode, args.workers, args.requests) for mode in ('on', 'off')]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'preload':<8} {'workers':>7} {'master RSS':>11} {'worker RSS':>11} {'worker PSS':>11} "
+          f"{'worker private':>15} {'total PSS':>10}")
+    for r in results:
+        w = r['worker_avg']
+        print(f"{r['mode']:<8} {r['workers']:>7} {r['master']['rss_mb']:>9.1f}MB {w['rss_mb']:>9.1f}MB "
+              f"{w['pss_mb']:>9.1f}MB {w['private_mb']:>13.1f}MB {r['total_pss_mb']:>8.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+gunicorn settings for wsgi:app. Every value can be overridden from the
+environment (or on the command line):
+
+    WEB_CONCURRENCY   worker processes (default: CPU count)
+    WEB_THREADS       threads per worker (default: 4)
+    PORT / BIND       listen address (default: 0.0.0.0:$PORT, PORT=5000)
+    WEB_TIMEOUT       worker timeout in seconds (default: 120, PDF/LLM calls are slow)
+    WEB_MAX_REQUESTS  recycle a worker after this many requests (default: 0, off)
+    WEB_PRELOAD       'on' (default) loads the app in the master before forking;
+                      'off' loads it in every worker (for memory comparisons)
+    INGESTION         'on' (default) runs the ThingSpeak ingestion loop in one
+                      child process of the master; 'off' when it runs elsewhere
+                      (python -m services.thingspeak_worker)
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# The app sizes per-worker background work (weather prefetch) from this
+os.environ['WEB_CONCURRENCY'] = str(workers)
+threads = int(os.getenv('WEB_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.getenv('WEB_TIMEOUT', 120))
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+chdir = BACKEND_DIR
+
+# Load the app (and every model) once in the master, then fork workers from it
+preload_app = os.getenv('WEB_PRELOAD', 'on').lower() != 'off'
+
+_ingestion = None
+
+
+def when_ready(server):
+    global _ingestion
+    if os.getenv('INGESTION', 'on').lower() == 'off':
+        return
+    # A fresh interpreter: the ingestion loop needs no models, only storage and HTTP
+    _ingestion = subprocess.Popen([sys.executable, '-m', 'services.thingspeak_worker'], cwd=BACKEND_DIR)
+    server.log.info("ThingSpeak ingestion running in pid %s", _ingestion.pid)
+
+
+def on_exit(server):
+    if _ingestion and _ingestion.poll() is None:
+        _ingestion.terminate()
+        try:
+            _ingestion.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _ingestion.kill()
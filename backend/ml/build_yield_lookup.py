@@ -0,0 +1,127 @@
+"""
+Builds the yield lookup grid (ml/yield_lookup.py) from the trained yield model.
+
+For every categorical context in the training data the model is evaluated
+on a rainfall x fertilizer x pesticide grid whose nodes follow the training
+distribution (quantiles). The grid is then checked against the model at
+random points inside each context's cells; contexts whose worst error
+exceeds --tolerance are stored as NaN so YieldPredictor falls back to the
+exact model for them.
+
+Run after ml/train_yield.py:
+    python ml/build_yield_lookup.py --tolerance 0.25
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from crop_yield_handler import CropYieldHandler
+from yield_lookup import YieldLookup, file_sha256
+from yield_predictor import YieldPredictor
+
+CATEGORICAL = ['State', 'District', 'Crop', 'Season', 'Soil_Type']
+NUMERICAL = ['Annual_Rainfall', 'Fertilizer', 'Pesticide']
+
+
+def build_axis(values, nodes):
+    values = np.asarray(values, dtype=float)
+    return np.unique(np.quantile(values, np.linspace(0.0, 1.0, nodes)))
+
+
+def build_yield_lookup(rain_nodes=12, fert_nodes=8, pest_nodes=6, samples=20, tolerance=0.25, chunk=128, seed=42):
+    os.environ['YIELD_LOOKUP'] = 'off'
+    predictor = YieldPredictor()
+    if not predictor.model:
+        print("Yield model not found. Train it first with ml/train_yield.py")
+        return None
+
+    df = CropYieldHandler().load_data()
+    categorical = [c for c in CATEGORICAL if c in df.columns and (c != 'Soil_Type' or 'Soil_Type' in predictor.encoders)]
+    df = df[categorical + NUMERICAL].dropna()
+
+    axes = [build_axis(df[c], n) for c, n in zip(NUMERICAL, (rain_nodes, fert_nodes, pest_nodes))]
+    grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    shape = tuple(len(a) for a in axes)
+
+    contexts = {}
+    for row in df[categorical].astype(str).drop_duplicates().itertuples(index=False):
+        fields = dict(zip(categorical, row))
+        context = predictor.encode_context(
+            fields['State'], fields['District'], fields['Crop'], fields['Season'], fields.get('Soil_Type')
+        )
+        contexts.setdefault(context, len(contexts))
+
+    print(f"{len(contexts)} contexts x {grid.shape[0]} grid nodes ({' x '.join(map(str, shape))})")
+    values = np.empty((len(contexts),) + shape, dtype=np.float32)
+    index = {}
+    lookup = YieldLookup(values, {'axes': dict(zip(('rainfall', 'fertilizer', 'pesticide'), axes)), 'index': index})
+
+    rng = np.random.default_rng(seed)
+    lows = np.array([a[0] for a in axes])
+    highs = np.array([a[-1] for a in axes])
+    errors, worst, masked = [], [], 0
+
+    start = time.time()
+    items = list(contexts.items())
+    for n in range(0, len(items), chunk):
+        batch = items[n:n + chunk]
+
+        # One model call per chunk: grid nodes plus random check points for each context
+        checks = rng.uniform(lows, highs, size=(len(batch), samples, 3))
+        rows = []
+        for c, (context, _) in enumerate(batch):
+            points = np.vstack([grid, checks[c]])
+            rows.append(np.hstack([np.tile(np.asarray(context, dtype=float), (len(points), 1)), predictor.scaler.transform(points)]))
+        predictions = predictor.model.predict(np.vstack(rows)).reshape(len(batch), grid.shape[0] + samples)
+
+        for c, (context, r) in enumerate(batch):
+            values[r] = predictions[c, :grid.shape[0]].reshape(shape)
+            index[context] = r
+            estimate = np.array([lookup.predict(context, *p) for p in checks[c]])
+            err = np.abs(estimate - predictions[c, grid.shape[0]:])
+            if tolerance is not None and err.max() > tolerance:
+                values[r] = np.nan
+                masked += 1
+                continue
+            errors.append(err)
+            worst.append(err.max())
+
+        print(f"  {min(n + chunk, len(items))}/{len(items)} contexts", end='\r')
+
+    errors = np.concatenate(errors) if errors else np.zeros(1)
+    lookup.error = {
+        'mean_abs': float(errors.mean()),
+        'p95_abs': float(np.quantile(errors, 0.95)),
+        'max_abs': float(max(worst) if worst else 0.0),
+        'samples_per_context': samples,
+        'contexts': len(contexts),
+        'contexts_exact_only': masked,
+    }
+    lookup.tolerance = tolerance
+    lookup.model_sha256 = file_sha256(os.path.join(predictor.model_dir, 'yield_model.pkl'))
+    lookup.save(predictor.model_dir)
+
+    print(f"\nBuilt in {time.time() - start:.1f}s, {values.nbytes / 1e6:.1f} MB")
+    print(f"Error vs model (tons/ha): mean {lookup.error['mean_abs']:.4f}, p95 {lookup.error['p95_abs']:.4f}, "
+          f"max {lookup.error['max_abs']:.4f}; {masked} contexts above tolerance use the exact model")
+    return lookup
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the yield lookup grid.")
+    parser.add_argument('--rain-nodes', type=int, default=12)
+    parser.add_argument('--fert-nodes', type=int, default=8)
+    parser.add_argument('--pest-nodes', type=int, default=6)
+    parser.add_argument('--samples', type=int, default=20, help="Random check points per context")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Max abs error (tons/ha) before a context falls back to the exact model; negative disables")
+    args = parser.parse_args()
+
+    build_yield_lookup(
+        args.rain_nodes, args.fert_nodes, args.pest_nodes, args.samples,
+        tolerance=None if args.tolerance < 0 else args.tolerance
+    )
@@ -2,6 +2,8 @@ import os
 import pickle
 import numpy as np
 
+from backend.utils.metrics import metrics
+
 class FertilizerRecommender:
     """
     ML-based fertilizer recommendation system.
@@ -138,118 +140,122 @@ class FertilizerRecommender:
             # Generate reasoning and tips
             reasoning = self._generate_reasoning(
                 fertilizer_name, crop_type, nitrogen, phosphorous, potassium,
-                temperature, humidity, moisture, soil_type
+                temperature, humidity, moisture, soil_type, lang
             )
             
-            tips = self._generate_application_tips(fertilizer_name, crop_type)
+            tips = self._generate_application_tips(fertilizer_name, crop_type, lang)
             
             # Translate
-            from backend.utils.translator import translate_text
+            from backend.utils.reasoning_templates import translate_cached
             
-            trans_fertilizer = translate_text(fertilizer_name, lang)
-            trans_reasoning = [translate_text(r, lang) for r in reasoning]
-            trans_tips = [translate_text(t, lang) for t in tips]
+            trans_fertilizer = translate_cached(fertilizer_name, lang)
             
             return {
                 'fertilizer': fertilizer_name,
                 'translated_fertilizer': trans_fertilizer,
                 'confidence': round(float(confidence), 2),
-                'reasoning': trans_reasoning,
-                'application_tips': trans_tips
+                'reasoning': reasoning,
+                'application_tips': tips
             }
             
         except Exception as e:
             print(f"Fertilizer prediction error: {e}")
             return self._rule_based_fallback(nitrogen, phosphorous, potassium, crop_type, lang)
     
-    def _generate_reasoning(self, fertilizer, crop, n, p, k, temp, humidity, moisture, soil_type):
+    def _generate_reasoning(self, fertilizer, crop, n, p, k, temp, humidity, moisture, soil_type, lang='en'):
         """
         Generate human-readable reasoning for the fertilizer recommendation.
+        Sentences come from pre-translated templates; values are filled in last.
         """
+        from backend.utils.reasoning_templates import render
+
         reasoning = []
         
         # Crop-specific reasoning
         if crop:
             crop_lower = crop.lower()
             if crop_lower in ['rice', 'paddy']:
-                reasoning.append(f"{crop} requires high nitrogen for vegetative growth and tillering")
+                reasoning.append(render('fert.crop_rice', lang, crop=crop))
             elif crop_lower in ['wheat', 'maize']:
-                reasoning.append(f"{crop} benefits from balanced NPK nutrition for grain development")
+                reasoning.append(render('fert.crop_cereal', lang, crop=crop))
             elif crop_lower == 'cotton':
-                reasoning.append(f"{crop} requires adequate potassium for fiber quality and disease resistance")
+                reasoning.append(render('fert.crop_cotton', lang, crop=crop))
             elif crop_lower in ['pulses', 'legumes']:
-                reasoning.append(f"{crop} requires phosphorus for root development and nitrogen fixation")
+                reasoning.append(render('fert.crop_pulses', lang, crop=crop))
             else:
-                reasoning.append(f"Fertilizer optimized for {crop} nutrient requirements")
+                reasoning.append(render('fert.crop_other', lang, crop=crop))
         
         # Nutrient deficiency analysis
         if n < 30:
-            reasoning.append(f"Low nitrogen level ({n} mg/kg) detected - nitrogen-rich fertilizer recommended")
+            reasoning.append(render('fert.n_low', lang, n=n))
         elif n > 50:
-            reasoning.append(f"Adequate nitrogen level ({n} mg/kg) - balanced fertilizer recommended")
+            reasoning.append(render('fert.n_ok', lang, n=n))
         
         if p < 20:
-            reasoning.append(f"Low phosphorus level ({p} mg/kg) - phosphorus supplementation needed")
+            reasoning.append(render('fert.p_low', lang, p=p))
         elif p > 40:
-            reasoning.append(f"Sufficient phosphorus level ({p} mg/kg)")
+            reasoning.append(render('fert.p_ok', lang, p=p))
         
         if k < 30:
-            reasoning.append(f"Low potassium level ({k} mg/kg) - potassium supplementation recommended")
+            reasoning.append(render('fert.k_low', lang, k=k))
         elif k > 50:
-            reasoning.append(f"Adequate potassium level ({k} mg/kg)")
+            reasoning.append(render('fert.k_ok', lang, k=k))
         
         # Environmental factors
         if moisture < 35:
-            reasoning.append("Low soil moisture - consider water-soluble fertilizers for better uptake")
+            reasoning.append(render('fert.moisture_low', lang))
         elif moisture > 60:
-            reasoning.append("High soil moisture - slow-release fertilizers recommended")
+            reasoning.append(render('fert.moisture_high', lang))
         
         # Soil type consideration
         if soil_type:
             if soil_type.lower() == 'sandy':
-                reasoning.append("Sandy soil - frequent, smaller fertilizer applications recommended")
+                reasoning.append(render('fert.soil_sandy', lang))
             elif soil_type.lower() == 'clayey':
-                reasoning.append("Clayey soil - ensure good drainage for optimal nutrient uptake")
+                reasoning.append(render('fert.soil_clayey', lang))
         
         # If no specific reasoning generated, add general statement
         if not reasoning:
-            reasoning.append("Fertilizer recommendation based on soil nutrient analysis and crop requirements")
+            reasoning.append(render('fert.general', lang))
         
         return reasoning
     
-    def _generate_application_tips(self, fertilizer, crop):
+    def _generate_application_tips(self, fertilizer, crop, lang='en'):
         """Generate specific application tips based on fertilizer and crop."""
+        from backend.utils.reasoning_templates import render
+
         tips = []
         name = fertilizer.lower()
         
         if 'urea' in name:
-            tips.append("Apply urea when soil is moist, preferably just before irrigation.")
-            tips.append("Incorporate into soil within 24 hours to minimize nitrogen loss to atmosphere.")
+            tips.append('tip.urea_moist')
+            tips.append('tip.urea_incorporate')
         elif 'dap' in name:
-            tips.append("Apply DAP at the time of sowing for better root development.")
-            tips.append("Avoid contact between DAP and seeds; keep a 2-3 inch distance.")
+            tips.append('tip.dap_sowing')
+            tips.append('tip.dap_distance')
         elif 'mop' in name:
-            tips.append("MOP (Potash) should be applied in split doses for better efficacy.")
-            tips.append("Effective for improving fruit quality and stress tolerance.")
+            tips.append('tip.mop_split')
+            tips.append('tip.mop_quality')
         elif 'npk' in name:
-            tips.append("NPK fertilizers work best when applied in the root zone.")
-            tips.append("Standard application: half during sowing, remaining after 30-40 days.")
+            tips.append('tip.npk_root_zone')
+            tips.append('tip.npk_split')
             
         # General crop tips
         if crop and crop.lower() in ['rice', 'paddy']:
-            tips.append("For Paddy, apply fertilizers in standing water (shallow depth).")
+            tips.append('tip.paddy_water')
         
         # Default tips if none generated
         if not tips:
-            tips.append("Apply during early morning or late evening.")
-            tips.append("Ensure uniform distribution across the field.")
+            tips.append('tip.timing')
+            tips.append('tip.uniform')
             
-        return tips
+        return [render(key, lang) for key in tips]
 
     def _rule_based_fallback(self, n, p, k, crop_type=None, lang='en'):
         """
         Fallback to simple rule-based recommendation if ML model fails.
         """
+        metrics.fallback('fertilizer_model', 'error' if self.model and self.scaler else 'no_model')
         recommendations = []
         fertilizer = "Balanced NPK"
         
@@ -269,21 +275,19 @@ class FertilizerRecommender:
                 fertilizer = "28-28-0 (Ammonium Phosphate)"
         
         # Generate custom reasoning
-        reasoning = self._generate_reasoning(fertilizer, crop_type, n, p, k, 25, 60, 45, None)
+        reasoning = self._generate_reasoning(fertilizer, crop_type, n, p, k, 25, 60, 45, None, lang)
             
-        tips = self._generate_application_tips(fertilizer, crop_type)
+        tips = self._generate_application_tips(fertilizer, crop_type, lang)
         
         # Translate
-        from backend.utils.translator import translate_text
-        trans_fertilizer = translate_text(fertilizer, lang)
-        trans_reasoning = [translate_text(r, lang) for r in reasoning]
-        trans_tips = [translate_text(t, lang) for t in tips]
+        from backend.utils.reasoning_templates import translate_cached
+        trans_fertilizer = translate_cached(fertilizer, lang)
         
         return {
             'fertilizer': fertilizer,
             'translated_fertilizer': trans_fertilizer,
             'confidence': 0.75,
-            'reasoning': trans_reasoning,
-            'application_tips': trans_tips
+            'reasoning': reasoning,
+            'application_tips': tips
         }
 
@@ -0,0 +1,350 @@
+"""
+Micro-benchmarks for the ML hot paths, in the style of pytest-benchmark.
+
+Each case is a function registered with @case that builds the object
+under test and returns a callable; the harness feeds it fixed, seeded
+input fixtures at every batch size (default 1, 16, 256, 4096) and reports:
+- warm: median/min/stddev over timed rounds after warm-up calls, on an
+  instance shared across rounds (caches populated)
+- cold: the first call on a freshly constructed instance with the module
+  caches cleared (lazy indexes, lru_cache, first sklearn call); construction
+  itself is not timed
+- allocations: bytes allocated per call (tracemalloc peak above the
+  baseline, traced in a separate pass so it does not skew the timings) and
+  bytes still held afterwards
+
+Per-row APIs are called once per input. Runs longer than --max-loop calls
+(or a case's own cap, e.g. the disease mock sleeps 0.5 s per image) time
+the first calls and extrapolate; those rows are marked with '~'.
+
+When the trained models are not present (git-lfs pointers), the mock and
+rule-based fallbacks are what gets measured; the report says which.
+
+Usage (from the repository root):
+    python -m backend.ml.microbench
+    python -m backend.ml.microbench --only CropPredictor --batches 1,256 --json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(BACKEND_DIR))
+
+SEED = 42
+SOIL_TYPES = ['Sandy', 'Loamy', 'Black', 'Red', 'Clayey']
+CROPS = ['rice', 'maize', 'wheat', 'cotton', 'chickpea', 'sugarcane']
+DAMAGE_TYPES = ['Flood', 'Drought', 'Pest Attack', 'Disease', 'Nutrient Deficiency', 'Wind Damage']
+
+CASES = {}
+
+
+def case(name, inputs, per_row=True, max_loop=None):
+    """
+    Registers a benchmark fed by the `inputs` fixture. The decorated
+    factory(fixtures, cold) returns fn(inputs) for batch APIs or
+    fn(one_input) for per-row ones.
+    """
+    def register(factory):
+        CASES[name] = {'factory': factory, 'inputs': inputs, 'per_row': per_row, 'max_loop': max_loop}
+        return factory
+    return register
+
+
+# --- fixtures ---
+
+class Fixtures:
+    """
+    Deterministic inputs per batch size; the same n always gives the same data.
+    """
+
+    def __init__(self, tmp):
+        self.tmp = tmp
+        self._cache = {}
+        self._shared = {}
+
+    def _memo(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def shared(self, name, build):
+        """
+        One instance per name for the warm runs.
+        """
+        if name not in self._shared:
+            self._shared[name] = build()
+        return self._shared[name]
+
+    def soil(self, n):
+        def build():
+            rng = np.random.default_rng(SEED)
+            low = [0, 5, 5, 8, 14, 3.5, 20, 10]
+            high = [140, 145, 205, 44, 100, 9.9, 300, 80]
+            values = rng.uniform(low, high, size=(n, 8)).round(2)
+            return [
+                {'N': v[0], 'P': v[1], 'K': v[2], 'temperature': v[3], 'humidity': v[4], 'ph': v[5],
+                 'rainfall': v[6], 'moisture': v[7], 'soil_type': SOIL_TYPES[i % len(SOIL_TYPES)],
+                 'crop': CROPS[i % len(CROPS)]}
+                for i, v in enumerate(values)
+            ]
+        return self._memo(('soil', n), build)
+
+    def features(self, n):
+        return self._memo(('features', n), lambda: np.array(
+            [[r['N'], r['P'], r['K'], r['temperature'], r['humidity'], r['ph'], r['rainfall']] for r in self.soil(n)]
+        ))
+
+    def recovery(self, n):
+        def build():
+            rng = np.random.default_rng(SEED + 1)
+            return [
+                dict(r, damage_type=DAMAGE_TYPES[i % len(DAMAGE_TYPES)],
+                     damage_percentage=int(rng.integers(0, 100)), growth_stage=int(rng.integers(1, 5)),
+                     days_remaining=int(rng.integers(10, 120)))
+                for i, r in enumerate(self.soil(n))
+            ]
+        return self._memo(('recovery', n), build)
+
+    def texts(self, n):
+        def build():
+            from backend.utils.reasoning_templates import TEMPLATES
+            values = {'crop': 'Rice', 'n': 42, 'p': 18, 'k': 55}
+            sentences = [t.format(**values) for t in TEMPLATES.values()]
+            return [sentences[i % len(sentences)] for i in range(n)]
+        return self._memo(('texts', n), build)
+
+    def images(self, n):
+        def build():
+            # Random bytes, not decodable images: enough for the mock path,
+            # which hashes the file content
+            rng = np.random.default_rng(SEED + 2)
+            paths = []
+            for i in range(n):
+                path = os.path.join(self.tmp, f'leaf_{i}.jpg')
+                with open(path, 'wb') as f:
+                    f.write(rng.bytes(16 * 1024))
+                paths.append(path)
+            return paths
+        return self._memo(('images', n), build)
+
+
+# --- cases ---
+
+@case('DataPreprocessor.preprocess', 'soil')
+def preprocess_case(fixtures, cold):
+    from backend.ml.preprocess import DataPreprocessor
+    pre = DataPreprocessor() if cold else fixtures.shared('preprocessor', DataPreprocessor)
+    return pre.preprocess
+
+
+def _crop_predictor(fixtures, cold):
+    from backend.ml.predictor import CropPredictor
+    return CropPredictor() if cold else fixtures.shared('crop', CropPredictor)
+
+
+@case('CropPredictor.predict', 'features')
+def crop_predict_case(fixtures, cold):
+    predictor = _crop_predictor(fixtures, cold)
+    return lambda row: predictor.predict(row, top_n=3, crop_type='agriculture')
+
+
+@case('CropPredictor.predict_batch', 'features', per_row=False)
+def crop_predict_batch_case(fixtures, cold):
+    predictor = _crop_predictor(fixtures, cold)
+    return lambda rows: predictor.predict_batch(rows, top_n=3, crop_type='agriculture')
+
+
+@case('FertilizerRecommender.recommend', 'soil')
+def fertilizer_case(fixtures, cold):
+    from backend.ml.fertilizer_recommender import FertilizerRecommender
+    recommender = FertilizerRecommender() if cold else fixtures.shared('fertilizer', FertilizerRecommender)
+    return lambda r: recommender.recommend(r['temperature'], r['humidity'], r['moisture'], r['soil_type'],
+                                           r['crop'], r['N'], r['K'], r['P'])
+
+
+@case('YieldPredictor.predict', 'soil')
+def yield_case(fixtures, cold):
+    from backend.ml.yield_predictor import YieldPredictor
+    predictor = YieldPredictor() if cold else fixtures.shared('yield', YieldPredictor)
+    return lambda r: predictor.predict('Telangana', 'RANGAREDDI', r['crop'].capitalize(), 'Kharif',
+                                       r['rainfall'], r['N'] * 1000, r['K'] * 10, soil_type=r['soil_type'])
+
+
+@case('RecoveryDecisionModel.predict', 'recovery', max_loop=32)
+def recovery_case(fixtures, cold):
+    from backend.ml.recovery_model import RecoveryDecisionModel
+    # Trained on first use when missing; keep that file out of the tree
+    path = os.path.join(BACKEND_DIR, 'models', 'recovery_model.pkl')
+    if not os.path.exists(path):
+        path = os.path.join(fixtures.tmp, 'recovery_model.pkl')
+    model = RecoveryDecisionModel(path) if cold else fixtures.shared('recovery', lambda: RecoveryDecisionModel(path))
+    return model.predict
+
+
+@case('translate_text', 'texts')
+def translate_case(fixtures, cold):
+    from backend.utils import translator
+    if cold:
+        translator._translate.cache_clear()
+    return lambda text: translator.translate_text(text, 'hi')
+
+
+@case('translate_batch', 'texts', per_row=False)
+def translate_batch_case(fixtures, cold):
+    from backend.utils import translator
+    if cold:
+        translator._translate.cache_clear()
+    return lambda texts: translator.translate_batch(texts, 'hi')
+
+
+@case('DiseasePredictor.predict', 'images', max_loop=4)
+def disease_case(fixtures, cold):
+    from services.disease.predictor import DiseasePredictor
+    predictor = DiseasePredictor() if cold else fixtures.shared('disease', DiseasePredictor)
+    return predictor.predict
+
+
+
+# --- harness ---
+
+def _runner(fn, inputs, per_row):
+    if per_row:
+        def run():
+            for item in inputs:
+                fn(item)
+        return run
+    return lambda: fn(inputs)
+
+
+def _time(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def allocations(fn, inputs, per_row):
+    """
+    (bytes allocated per call, bytes retained per call). Per-row APIs are
+    traced call by call; batch APIs once, divided by the batch size.
+    """
+    calls = [(lambda item=item: fn(item)) for item in inputs] if per_row else [lambda: fn(inputs)]
+    peaks = []
+    tracemalloc.start()
+    try:
+        start_current, _ = tracemalloc.get_traced_memory()
+        for call in calls:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - start_current
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(inputs), max(retained, 0) / len(inputs)
+
+
+def bench(name, n, fixtures, rounds, warmup, cold_rounds, max_loop):
+    spec = CASES[name]
+    inputs = getattr(fixtures, spec['inputs'])(n)
+    per_row = spec['per_row']
+    loop_n = min(n, spec['max_loop'] or max_loop, max_loop) if per_row else n
+    inputs = inputs[:loop_n]
+    scale = n / loop_n
+
+    cold = []
+    for _ in range(cold_rounds):
+        fn = spec['factory'](fixtures, True)
+        cold.append(_time(_runner(fn, inputs, per_row)) * scale)
+
+    fn = spec['factory'](fixtures, False)
+    run = _runner(fn, inputs, per_row)
+    for _ in range(warmup):
+        run()
+    warm = [_time(run) * scale for _ in range(rounds)]
+    alloc, retained = allocations(fn, inputs, per_row)
+
+    return {
+        'case': name,
+        'batch': n,
+        'calls_timed': loop_n if per_row else 1,
+        'extrapolated': loop_n < n,
+        'warm_median_ms': statistics.median(warm) * 1000,
+        'warm_min_ms': min(warm) * 1000,
+        'warm_stddev_ms': statistics.stdev(warm) * 1000 if len(warm) > 1 else 0.0,
+        'warm_per_item_us': statistics.median(warm) / n * 1e6,
+        'cold_median_ms': statistics.median(cold) * 1000,
+        'alloc_bytes_per_item': round(alloc),
+        'retained_bytes_per_item': round(retained),
+    }
+
+
+def model_status(fixtures):
+    """
+    Which cases run on trained models and which on fallbacks.
+    """
+    from backend.ml.predictor import CropPredictor
+    from backend.ml.fertilizer_recommender import FertilizerRecommender
+    from backend.ml.yield_predictor import YieldPredictor
+    from services.disease.predictor import DiseasePredictor
+    status = {}
+    crop = fixtures.shared('crop', CropPredictor)
+    status['crop'] = 'model' if crop.agri_model and crop.label_encoder else 'mock'
+    fert = fixtures.shared('fertilizer', FertilizerRecommender)
+    status['fertilizer'] = 'model' if fert.model and fert.scaler else 'rule-based'
+    yld = fixtures.shared('yield', YieldPredictor)
+    status['yield'] = ('lookup' if yld.lookup else 'model') if yld.model else 'rule-based'
+    status['disease'] = 'model' if fixtures.shared('disease', DiseasePredictor).model else 'mock'
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batches', default='1,16,256,4096')
+    parser.add_argument('--only', help="Comma-separated substrings of case names")
+    parser.add_argument('--rounds', type=int, default=5, help="Timed warm rounds")
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--cold-rounds', type=int, default=3)
+    parser.add_argument('--max-loop', type=int, default=256,
+                        help="Per-row calls timed per round before extrapolating")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    names = [name for name in CASES
+             if not args.only or any(part in name for part in args.only.split(','))]
+    batches = [int(b) for b in args.batches.split(',')]
+
+    tmp = tempfile.mkdtemp(prefix='mm_microbench_')
+    try:
+        fixtures = Fixtures(tmp)
+        status = model_status(fixtures)
+        results = [bench(name, n, fixtures, args.rounds, args.warmup, args.cold_rounds, args.max_loop)
+                   for name in names for n in batches]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({'models': status, 'results': results}, indent=2))
+        return
+
+    print("Models: " + ', '.join(f"{k}={v}" for k, v in status.items()))
+    print(f"{'case':<32} {'batch':>6} {'warm':>11} {'±':>8} {'per item':>10} {'cold':>11} "
+          f"{'alloc/item':>11} {'retained':>9}")
+    for r in results:
+        mark = '~' if r['extrapolated'] else ' '
+        print(f"{r['case']:<32} {r['batch']:>6} {mark}{r['warm_median_ms']:>8.2f}ms {r['warm_stddev_ms']:>6.2f}ms "
+              f"{r['warm_per_item_us']:>8.1f}us {mark}{r['cold_median_ms']:>8.2f}ms "
+              f"{r['alloc_bytes_per_item']:>10}B {r['retained_bytes_per_item']:>8}B")
+
+
+if __name__ == '__main__':
+    main()
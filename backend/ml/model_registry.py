@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+import time
+
+# Files that make up a deployed model set
+MODEL_EXTENSIONS = ('.pkl', '.npy', '.joblib', '.h5', '.keras')
+
+
+class ModelRegistry:
+    """
+    Fingerprints the model files in backend/models.
+    version() changes whenever a model file is added, removed or rewritten,
+    so caches of model outputs can be invalidated on redeploy/retrain.
+    Files are only re-hashed when their size or mtime changes.
+    """
+
+    def __init__(self, model_dir=None, check_interval=5.0):
+        if model_dir is None:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            model_dir = os.path.join(os.path.dirname(current_dir), 'models')
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._hashes = {}  # name -> (size, mtime_ns, sha256)
+        self._version = None
+        self._checked_at = 0.0
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _scan(self):
+        hashes = {}
+        try:
+            names = sorted(os.listdir(self.model_dir))
+        except FileNotFoundError:
+            names = []
+
+        for name in names:
+            if not name.endswith(MODEL_EXTENSIONS):
+                continue
+            path = os.path.join(self.model_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            previous = self._hashes.get(name)
+            if previous and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+                hashes[name] = previous
+            else:
+                hashes[name] = (st.st_size, st.st_mtime_ns, self._hash_file(path))
+
+        self._hashes = hashes
+        combined = hashlib.sha256()
+        for name, (_, _, sha) in hashes.items():
+            combined.update(f"{name}:{sha}\n".encode())
+        self._version = combined.hexdigest()[:16]
+
+    def version(self):
+        """
+        Short fingerprint of the current model set. Re-checked at most every
+        `check_interval` seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._version is None or now - self._checked_at >= self.check_interval:
+                self._scan()
+                self._checked_at = now
+            return self._version
+
+    def files(self):
+        """
+        {filename: sha256} of the fingerprinted files.
+        """
+        self.version()
+        with self._lock:
+            return {name: sha for name, (_, _, sha) in self._hashes.items()}
+
+
+# Create a global instance
+registry = ModelRegistry()
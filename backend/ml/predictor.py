@@ -3,6 +3,8 @@ import pickle
 import numpy as np
 import random
 
+from backend.utils.metrics import metrics
+
 class CropPredictor:
     AGRI_CROPS = [
         'rice', 'maize', 'chickpea', 'kidneybeans', 'pigeonpeas', 
@@ -33,7 +35,36 @@ class CropPredictor:
             from preprocess import DataPreprocessor
         
         self.preprocessor = DataPreprocessor()
+        self.crop_type_masks = self._build_crop_type_masks()
         
+    def _build_crop_type_masks(self):
+        """
+        Boolean mask over label_encoder.classes_ per crop_type, built once at load.
+        """
+        if self.label_encoder is None:
+            return {}
+        classes = np.char.lower(np.asarray(self.label_encoder.classes_).astype(str))
+        return {
+            'agriculture': np.isin(classes, self.AGRI_CROPS),
+            'horticulture': np.isin(classes, self.HORTI_CROPS),
+        }
+
+    @staticmethod
+    def top_k(probs, k):
+        """
+        Indices of the k largest probabilities per row, highest first.
+        argpartition is O(classes) per row instead of a full sort.
+        """
+        k = min(k, probs.shape[1])
+        if k <= 0:
+            return np.empty((probs.shape[0], 0), dtype=int)
+        if k < probs.shape[1]:
+            idx = np.argpartition(probs, -k, axis=1)[:, -k:]
+        else:
+            idx = np.tile(np.arange(probs.shape[1]), (probs.shape[0], 1))
+        order = np.argsort(-np.take_along_axis(probs, idx, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(idx, order, axis=1)
+
     def _load_model(self, filename):
         path = os.path.join(self.model_dir, filename)
         if os.path.exists(path):
@@ -57,65 +88,67 @@ class CropPredictor:
         :param crop_type: 'agriculture', 'horticulture', or None
         :return: List of dicts [{'crop': str, 'confidence': float, 'local_name': str}]
         """
+        if not (self.agri_model and self.label_encoder):
+            # Fallback if no model loaded
+            return self._mock_predict(top_n, features, lang, crop_type)
+        return self.predict_batch(np.array(features).reshape(1, -1), top_n=top_n, lang=lang, crop_type=crop_type)[0]
+
+    def predict_batch(self, features, top_n=3, lang='en', crop_type=None):
+        """
+        Batched predict(): one scaler/model call for an (N, 7) feature matrix.
+        Returns one result list per row.
+        """
+        features_array = np.asarray(features, dtype=float).reshape(-1, 7)
+
         if self.agri_model and self.label_encoder:
             try:
-                # 1. Preprocess (Scale)
-                features_array = np.array(features).reshape(1, -1)
-                
                 # SAFETY CHECK: If inputs are all zeros (Sensor Failure), do not predict.
-                if np.sum(features_array) == 0:
+                valid = features_array.sum(axis=1) != 0
+                if not valid.all():
                     print("Warning: All sensor inputs are zero. Skipping prediction.")
-                    return []
-                
-                # Apply scaling
+                results = [[] for _ in range(len(features_array))]
+                if not valid.any():
+                    return results
+
+                # 1. Preprocess (Scale)
+                rows = features_array[valid]
                 if self.preprocessor.scaler:
-                    features_scaled = self.preprocessor.scaler.transform(features_array)
+                    features_scaled = self.preprocessor.scaler.transform(rows)
                 else:
-                    features_scaled = features_array
+                    features_scaled = rows
 
                 # 2. Predict Probabilities
-                probs = self.agri_model.predict_proba(features_scaled)[0]
+                probs = self.agri_model.predict_proba(features_scaled)
                 classes = self.label_encoder.classes_
-                
-                # FILTERING LOGIC
-                if crop_type:
-                    if crop_type.lower() == 'agriculture':
-                        allowed = set(self.AGRI_CROPS)
-                    elif crop_type.lower() == 'horticulture':
-                        allowed = set(self.HORTI_CROPS)
-                    else:
-                        allowed = None
-                    
-                    if allowed:
-                        for i, crop_name in enumerate(classes):
-                            if crop_name.lower() not in allowed:
-                                probs[i] = 0.0 # Suppress disallowed crops
+
+                # FILTERING LOGIC: suppress disallowed crops
+                mask = self.crop_type_masks.get(crop_type.lower()) if crop_type else None
+                if mask is not None:
+                    probs = probs * mask
 
                 # 3. Get Top N
-                top_indices = probs.argsort()[-top_n:][::-1]
-                
-                results = []
-                classes = self.label_encoder.classes_
-                from backend.utils.translator import translate_text 
-
-                for idx in top_indices:
-                    crop_name = classes[idx]
-                    raw_confidence = probs[idx]
-                    
-                    # Use raw confidence from the calibrated model
-                    confidence = raw_confidence
-
-                    # Filter out very low confidence predictions
-                    if confidence > 0.001: 
-                        local_name = translate_text(crop_name, lang)
-                        reasoning = self._generate_reasoning(crop_name, features, lang)
-                        results.append({
-                            'crop': crop_name, # Keep English key for code usage
-                            'translated_crop': local_name, # Display name
-                            'confidence': round(float(confidence), 2),
-                            'reasoning': reasoning
-                        })
-                
+                top_indices = self.top_k(probs, top_n)
+
+                from backend.utils.reasoning_templates import translate_cached
+
+                for out, row_features, row_probs, row_top in zip(np.flatnonzero(valid), rows, probs, top_indices):
+                    for idx in row_top:
+                        crop_name = classes[idx]
+
+                        # Use raw confidence from the calibrated model
+                        confidence = row_probs[idx]
+
+                        # Filter out very low confidence predictions
+                        if confidence > 0.001:
+                            local_name = translate_cached(crop_name, lang)
+                            reasoning = self._generate_reasoning(crop_name, row_features, lang)
+                            results[out].append({
+                                'crop': crop_name, # Keep English key for code usage
+                                'translated_crop': local_name, # Display name
+                                'confidence': round(float(confidence), 2),
+                                'reasoning': reasoning
+                            })
+
                 return results
 
             except Exception as e:
@@ -123,10 +156,9 @@ class CropPredictor:
                 import traceback
                 traceback.print_exc()
                 # Fallback only on error
-                return self._mock_predict(top_n, features, lang, crop_type)
-            
+
         # Fallback if no model loaded
-        return self._mock_predict(top_n, features, lang, crop_type)
+        return [self._mock_predict(top_n, row.reshape(1, -1), lang, crop_type) for row in features_array]
 
     def _generate_reasoning(self, crop, features, lang='en'):
         """
@@ -134,7 +166,7 @@ class CropPredictor:
         """
         # Features: [N, P, K, Temp, Hum, pH, Rain]
         # Approximate indices: 0:N, 1:P, 2:K, 3:Temp, 4:Hum, 5:pH, 6:Rain
-        from backend.utils.translator import translate_text
+        from backend.utils.reasoning_templates import render
         
         reasoning = []
         
@@ -147,30 +179,31 @@ class CropPredictor:
              ph = f[5]
              
              if rain > 150 and crop.lower() in ['rice', 'jute', 'sugarcane', 'coffee', 'coconut', 'banana', 'papaya']:
-                 reasoning.append("High rainfall is suitable for this crop.")
+                 reasoning.append('crop.high_rain')
              elif rain < 50 and crop.lower() in ['chickpea', 'mothbeans', 'lentil', 'blackgram', 'mungbean']:
-                 reasoning.append("Suitable for low rainfall conditions.")
+                 reasoning.append('crop.low_rain')
              
              if temp > 30 and crop.lower() not in ['wheat', 'pea']:
-                  reasoning.append("Thrives in warm temperatures.")
+                  reasoning.append('crop.warm')
              
              if 5.5 <= ph <= 7.0:
-                 reasoning.append("Soil pH is optimal.")
+                 reasoning.append('crop.ph_optimal')
                  
         except:
             pass # Fail silently on indexing error
             
         if not reasoning:
-            reasoning.append(" Matches your soil nutrient profile best.")
+            reasoning.append('crop.profile_match')
             
-        # Translate each sentence
-        return [translate_text(r.strip(), lang) for r in reasoning]
+        # Pre-translated templates
+        return [render(key, lang) for key in reasoning]
 
     def _mock_predict(self, top_n, features, lang='en', crop_type=None):
         """
         Deterministic mock prediction logic based on features.
         The same features will always yield the same recommendations.
         """
+        metrics.fallback('crop_model', 'error' if self.agri_model and self.label_encoder else 'no_model')
         import hashlib
         from backend.utils.translator import translate_text
         
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import pickle
+import numpy as np
+
+VALUES_FILE = 'yield_lookup.npy'
+META_FILE = 'yield_lookup_meta.pkl'
+
+# Continuous inputs of the yield model, in grid axis order
+AXES = ('rainfall', 'fertilizer', 'pesticide')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class YieldLookup:
+    """
+    Precomputed yield-model outputs on a rainfall x fertilizer x pesticide grid
+    for every categorical context (encoded State, District, Crop, Season[, Soil_Type])
+    seen in training. Answers by trilinear interpolation between grid nodes.
+
+    Built offline by ml/build_yield_lookup.py. Values are memory-mapped, so
+    forked workers share one copy.
+    """
+
+    def __init__(self, values, meta):
+        self.values = values
+        self.axes = [np.asarray(meta['axes'][name], dtype=float) for name in AXES]
+        self.index = meta['index']
+        self.model_sha256 = meta.get('model_sha256')
+        self.error = meta.get('error', {})
+        self.tolerance = meta.get('tolerance')
+
+    @classmethod
+    def load(cls, model_dir):
+        """
+        Returns the lookup stored in model_dir, or None if it has not been built.
+        """
+        values_path = os.path.join(model_dir, VALUES_FILE)
+        meta_path = os.path.join(model_dir, META_FILE)
+        if not (os.path.exists(values_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = pickle.load(f)
+            return cls(np.load(values_path, mmap_mode='r'), meta)
+        except Exception as e:
+            print(f"Error loading yield lookup: {e}")
+            return None
+
+    def save(self, model_dir):
+        np.save(os.path.join(model_dir, VALUES_FILE), np.asarray(self.values, dtype=np.float32))
+        meta = {
+            'axes': {name: list(map(float, axis)) for name, axis in zip(AXES, self.axes)},
+            'index': self.index,
+            'model_sha256': self.model_sha256,
+            'error': self.error,
+            'tolerance': self.tolerance,
+        }
+        with open(os.path.join(model_dir, META_FILE), 'wb') as f:
+            pickle.dump(meta, f)
+
+    def matches_model(self, model_path):
+        return bool(self.model_sha256) and os.path.exists(model_path) and file_sha256(model_path) == self.model_sha256
+
+    def predict(self, context, rainfall, fertilizer, pesticide):
+        """
+        Interpolated yield, or None when the context is not in the grid, an
+        input lies outside the grid, or the context exceeded the error
+        tolerance at build time (its cells are stored as NaN).
+        """
+        row = self.index.get(tuple(context))
+        if row is None:
+            return None
+
+        cell = []
+        for axis, x in zip(self.axes, (rainfall, fertilizer, pesticide)):
+            if x < axis[0] or x > axis[-1]:
+                return None
+            i = min(max(int(np.searchsorted(axis, x, side='right')) - 1, 0), len(axis) - 2)
+            cell.append((i, (x - axis[i]) / (axis[i + 1] - axis[i])))
+
+        (i, ti), (j, tj), (k, tk) = cell
+        c = self.values[row, i:i + 2, j:j + 2, k:k + 2]
+        c = c[0] * (1 - ti) + c[1] * ti
+        c = c[0] * (1 - tj) + c[1] * tj
+        value = float(c[0] * (1 - tk) + c[1] * tk)
+        return None if np.isnan(value) else value
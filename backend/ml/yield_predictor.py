@@ -2,6 +2,11 @@ import os
 import pickle
 import numpy as np
 
+try:
+    from backend.utils.metrics import metrics
+except ImportError:  # run as a script from ml/ (build_yield_lookup.py)
+    metrics = None
+
 class YieldPredictor:
     def __init__(self):
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,7 +15,27 @@ class YieldPredictor:
         self.model = self._load_model('yield_model.pkl')
         self.scaler = self._load_model('yield_scaler.pkl')
         self.encoders = self._load_model('yield_encoders.pkl')
+        self._label_index = None
+        self.lookup = self._load_lookup() if self.model else None
         
+    def _load_lookup(self):
+        """
+        Loads the grid built by ml/build_yield_lookup.py unless disabled with
+        YIELD_LOOKUP=off or built for a different yield_model.pkl.
+        """
+        if os.getenv('YIELD_LOOKUP', 'on').strip().lower() == 'off':
+            return None
+        try:
+            from .yield_lookup import YieldLookup
+        except ImportError:
+            from yield_lookup import YieldLookup
+
+        lookup = YieldLookup.load(self.model_dir)
+        if lookup and not lookup.matches_model(os.path.join(self.model_dir, 'yield_model.pkl')):
+            print("Yield lookup grid was built for a different yield model; ignoring it. Rebuild with ml/build_yield_lookup.py")
+            return None
+        return lookup
+
     def _load_model(self, filename):
         path = os.path.join(self.model_dir, filename)
         if os.path.exists(path):
@@ -22,70 +47,89 @@ class YieldPredictor:
                 return None
         return None
 
-    def predict(self, state, district, crop, season, rainfall, fertilizer, pesticide, soil_type=None):
+    def predict(self, state, district, crop, season, rainfall, fertilizer, pesticide, soil_type=None, exact=False):
         """
         Predicts yield.
+        Served from the precomputed lookup grid when one is loaded and covers
+        the inputs; exact=True (or YIELD_LOOKUP=off) always runs the model.
         """
         if not self.model:
             return self._rule_based_fallback(crop, rainfall, fertilizer)
             
         try:
-            # Prepare input array
-            # Order: State, District, Crop, Season, Soil_Type (if exists), Ann_Rain, Fert, Pest
-            
-            # Helper to encode safely
-            def encode(col_name, value):
-                if col_name in self.encoders:
-                    le = self.encoders[col_name]
-                    # Handle unseen labels
-                    if value in le.classes_:
-                        return le.transform([value])[0]
-                    else:
-                        # Fallback for unseen labels: Use mode or specific defaults
-                        # For now, just using 0 or a known valid index if available
-                        print(f"Warning: Unseen label '{value}' for {col_name}. Using default.")
-                        return 0
-                return 0
-                
-            input_features = []
-            
-            # Smart defaults/mappings for user friendly names
-            # Map standard state names to dataset names if slightly different
-            # (Assuming model was trained on specific casing)
-            
-            # Categorical
-            input_features.append(encode('State', state))
-            input_features.append(encode('District', district))
-            input_features.append(encode('Crop', crop))
-            input_features.append(encode('Season', season))
-            
-            # Handle empty or missing soil type
-            if 'Soil_Type' in self.encoders:
-                st = soil_type if soil_type else 'Clayey' # Default assumption
-                input_features.append(encode('Soil_Type', st))
-                 
-            # Numerical
-            # Must scale
-            raw_nums = np.array([[float(rainfall), float(fertilizer), float(pesticide)]])
-            scaled_nums = self.scaler.transform(raw_nums)[0]
-            
-            input_features.extend(scaled_nums)
-            
-            # Reshape for prediction
-            final_input = np.array([input_features])
-            
-            prediction = self.model.predict(final_input)[0]
+            context = self.encode_context(state, district, crop, season, soil_type)
+
+            if self.lookup and not exact:
+                estimate = self.lookup.predict(context, float(rainfall), float(fertilizer), float(pesticide))
+                if estimate is not None:
+                    return round(estimate, 2)
+
+            prediction = self.predict_encoded(context, [[float(rainfall), float(fertilizer), float(pesticide)]])[0]
             return round(prediction, 2)
             
         except Exception as e:
             print(f"Yield Prediction Error: {e}")
             return self._rule_based_fallback(crop, rainfall, fertilizer)
 
+    def encode_context(self, state, district, crop, season, soil_type=None):
+        """
+        Label-encodes the categorical inputs.
+        Order: State, District, Crop, Season, Soil_Type (if exists)
+        """
+        if self._label_index is None:
+            # label -> code per column; LabelEncoder.transform is slow for single values
+            self._label_index = {
+                col: {label: i for i, label in enumerate(le.classes_)} for col, le in self.encoders.items()
+            }
+
+        # Helper to encode safely
+        def encode(col_name, value):
+            if col_name in self._label_index:
+                codes = self._label_index[col_name]
+                # Handle unseen labels
+                if value in codes:
+                    return codes[value]
+                else:
+                    # Fallback for unseen labels: Use mode or specific defaults
+                    # For now, just using 0 or a known valid index if available
+                    print(f"Warning: Unseen label '{value}' for {col_name}. Using default.")
+                    return 0
+            return 0
+
+        # Categorical
+        context = [
+            encode('State', state),
+            encode('District', district),
+            encode('Crop', crop),
+            encode('Season', season),
+        ]
+
+        # Handle empty or missing soil type
+        if 'Soil_Type' in self.encoders:
+            st = soil_type if soil_type else 'Clayey' # Default assumption
+            context.append(encode('Soil_Type', st))
+        return tuple(context)
+
+    def predict_encoded(self, context, numbers):
+        """
+        Model predictions for one encoded context and an (n, 3) array of
+        [rainfall, fertilizer, pesticide] rows.
+        """
+        # Numerical
+        # Must scale
+        scaled_nums = self.scaler.transform(np.asarray(numbers, dtype=float))
+        categorical = np.tile(np.asarray(context, dtype=float), (len(scaled_nums), 1))
+
+        final_input = np.hstack([categorical, scaled_nums])
+        return self.model.predict(final_input)
+
     def _rule_based_fallback(self, crop, rainfall, fertilizer):
         """
         Fallback yield estimation based on crop averages.
         Returns yield in tons/ha.
         """
+        if metrics:
+            metrics.fallback('yield_model', 'error' if self.model else 'no_model')
         # Base yields in tons/ha
         base_yields = {
             'rice': 4.0, 'paddy': 4.0,
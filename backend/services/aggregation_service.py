@@ -1,28 +1,73 @@
-from config.supabase_client import supabase
+from storage import store, RAW, HOURLY, DAILY
 from datetime import datetime, timedelta
 import pandas as pd
+import os
+from utils.metrics import metrics
+
+# Resolution tiers maintained by database/schema_rollups.sql.
+# Each entry is (largest window served, table); the first tier that covers
+# the requested window wins.
+RESOLUTION_TIERS = [
+    (timedelta(days=1), RAW),
+    (timedelta(days=31), HOURLY),
+    (None, DAILY),
+]
 
 class AggregationService:
-    def get_30_day_average(self, device_id='pi_01'):
+    def resolution_for(self, window):
+        """
+        Picks the storage tier for a time window (timedelta).
+        """
+        for max_window, table in RESOLUTION_TIERS:
+            if max_window is None or window <= max_window:
+                return table
+        return RESOLUTION_TIERS[-1][1]
+
+    def get_history(self, device_id=None, window=None, limit=30):
+        """
+        Returns (resolution, rows) for the requested window, newest first.
+        Without a window this is the last `limit` raw readings.
+        Rollup rows carry raw column names so map_single_record works on them.
         """
-        Fetches last 30 days of data for the device from Supabase and calculates stats.
+        if not store:
+            return RAW, []
+
+        if not window:
+            return RAW, store.recent_readings(device_id=device_id, limit=limit)
+
+        table = self.resolution_for(window)
+        since = (datetime.now() - window).isoformat()
+        return table, store.window_readings(table, device_id=device_id, since=since)
+
+    def get_30_day_average(self, device_id='pi_01', days=30):
+        """
+        Fetches the last `days` (default 30) days of data for the device from storage and calculates stats.
         Returns dictionary with keys mapping to model features: N, P, K, temperature, humidity, ph, rainfall.
+        Order: hourly rollup, server-side window stats, then rows aggregated in pandas.
         """
-        if not supabase:
+        if not store:
             # Fallback for offline/local mode without Supabase connection
             return self._mock_aggregation()
 
         try:
-            thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-            
-            # Fetch data
-            response = supabase.table('sensor_readings')\
-                .select('*')\
-                .eq('device_id', device_id)\
-                .gte('created_at', thirty_days_ago)\
-                .execute()
-            
-            data = response.data
+            agg = self._rollup_average(device_id, timedelta(days=days))
+            if agg:
+                return agg
+        except Exception as e:
+            print(f"Rollup Aggregation Error (falling back to raw rows): {e}")
+
+        thirty_days_ago = (datetime.now() - timedelta(days=days)).isoformat()
+
+        try:
+            summary = store.aggregate_readings(device_id, since=thirty_days_ago)
+            if summary:
+                return self._summary_to_features(summary, rainfall='sum')
+        except Exception as e:
+            print(f"Server-side Aggregation Error (falling back to pandas): {e}")
+
+        try:
+            # Fallback: fetch rows and aggregate locally
+            data = store.readings_since(device_id, thirty_days_ago)
             if not data:
                 print("No data found for aggregation, using mock.")
                 return self._mock_aggregation()
@@ -53,19 +98,22 @@ class AggregationService:
         """
         Calculates average of the LAST N records for the device.
         Standardized for verified column 'soil_ph'.
+        The database computes the means; pandas is only the fallback.
         """
-        if not supabase:
+        if not store:
             return self._mock_aggregation()
 
         try:
-            response = supabase.table('sensor_readings')\
-                .select('*')\
-                .eq('device_id', device_id)\
-                .order('created_at', desc=True)\
-                .limit(n)\
-                .execute()
-            
-            data = response.data
+            summary = store.aggregate_readings(device_id, limit=n)
+            if summary:
+                agg = self._summary_to_features(summary, rainfall='mean')
+                agg['moisture'] = self._mean(summary, 'moisture', default=0.0)
+                return agg
+        except Exception as e:
+            print(f"Server-side Aggregation Error (falling back to pandas): {e}")
+
+        try:
+            data = store.recent_readings(device_id=device_id, limit=n)
             if not data:
                 return self._mock_aggregation()
                 
@@ -87,10 +135,90 @@ class AggregationService:
             print(f"Record Aggregation Error: {e}")
             return self._mock_aggregation()
 
+    @staticmethod
+    def _mean(summary, field, default=None):
+        stats = summary.get(field)
+        return round(stats['mean'], 2) if stats else default
+
+    def _summary_to_features(self, summary, rainfall='mean'):
+        """
+        Maps StorageBackend.aggregate_readings output to model feature names.
+        rainfall='sum' reports the total over the window instead of the mean.
+        """
+        rain = summary.get('rainfall')
+        if rain and rainfall == 'sum':
+            rain_value = round(rain['mean'] * rain['count'], 2)
+        elif rain:
+            rain_value = round(rain['mean'], 2)
+        else:
+            rain_value = 0.0
+
+        return {
+            'temperature': self._mean(summary, 'temperature'),
+            'humidity': self._mean(summary, 'humidity'),
+            'ph': self._mean(summary, 'soil_ph', default=6.5),
+            'N': self._mean(summary, 'nitrogen'),
+            'P': self._mean(summary, 'phosphorus'),
+            'K': self._mean(summary, 'potassium'),
+            'rainfall': rain_value
+        }
+
+    def _rollup_average(self, device_id, window):
+        """
+        Sample-weighted averages over the rollup tier covering `window`.
+        Returns None when the tier has no rows yet.
+        """
+        table, rows = self.get_history(device_id=device_id, window=window)
+        if table == RAW or not rows:
+            return None
+
+        df = pd.DataFrame(rows)
+        weights = df['sample_count'].astype(float)
+
+        def weighted(col):
+            values = pd.to_numeric(df[col], errors='coerce')
+            mask = values.notna()
+            if not mask.any():
+                return None
+            return round(float((values[mask] * weights[mask]).sum() / weights[mask].sum()), 2)
+
+        return {
+            'temperature': weighted('temperature'),
+            'humidity': weighted('humidity'),
+            'ph': weighted('soil_ph') or 6.5,
+            'N': weighted('nitrogen'),
+            'P': weighted('phosphorus'),
+            'K': weighted('potassium'),
+            'rainfall': round(float(pd.to_numeric(df['rainfall'], errors='coerce').sum()), 2)
+        }
+
+    def get_archive_average(self, device_id, start, end=None):
+        """
+        Long-range averages from the Parquet archive (storage/archive.py),
+        e.g. a full year for retraining. Returns None if the archive or
+        pyarrow is unavailable.
+        """
+        try:
+            from storage.archive import ReadingArchive, DEFAULT_ARCHIVE_DIR
+            archive = ReadingArchive(os.getenv('ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR))
+            stats = archive.aggregate(device_ids=[device_id], start=start, end=end).get(device_id)
+        except Exception as e:
+            print(f"Archive Aggregation Error: {e}")
+            return None
+
+        if not stats:
+            return None
+
+        agg = self._summary_to_features(stats, rainfall='sum')
+        agg['moisture'] = self._mean(stats, 'moisture')
+        agg['count'] = stats['count']
+        return agg
+
     def _mock_aggregation(self):
         """
         Provides dummy aggregated data for testing/demo.
         """
+        metrics.fallback('sensor_aggregation', 'no_data' if store else 'no_store')
         return {
             'temperature': 28.5,
             'humidity': 62.0,
@@ -1,33 +1,134 @@
 from dotenv import load_dotenv
+from datetime import datetime, timedelta, timezone
 import os
-import requests
 import pandas as pd
 
 # Try to load if not already loaded (e.g. in test scripts)
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
 load_dotenv(env_path)
 
+from storage import store
+from utils.cache import TTLCache
+from utils.http_client import http
+from utils.metrics import metrics
+
 THING_SPEAK_CHANNEL_ID = os.getenv("THINGSPEAK_CHANNEL_ID")
 THING_SPEAK_READ_KEY = os.getenv("THINGSPEAK_READ_KEY")
+# Override to point at thingspeak_stub.py for offline runs
+THING_SPEAK_BASE_URL = os.getenv("THINGSPEAK_BASE_URL", "https://api.thingspeak.com").rstrip("/")
+
+# Device the ThingSpeak ingestion worker writes to (see thingspeak_service.py)
+DEVICE_ID = os.getenv("DEVICE_ID", "MM-POLE-001")
+
+# Mirrored readings older than this are stale; ThingSpeak is queried instead
+MAX_STALENESS = timedelta(minutes=int(os.getenv("AGGREGATE_MAX_STALENESS_MIN", "15")))
+
+# Shared by all dashboard requests: one upstream fetch per channel every TTL seconds,
+# expired values are served for up to STALE seconds while a refresh runs
+aggregate_cache = TTLCache(
+    ttl=float(os.getenv("AGGREGATE_CACHE_TTL", "30")),
+    stale_ttl=float(os.getenv("AGGREGATE_CACHE_STALE", "300")),
+    name="aggregate_cache"
+)
+metrics.expose_stats('aggregate_cache', aggregate_cache.stats, "Sensor aggregate cache counters")
+
 
 def get_aggregated_data(results=30):
     """
-    Fetches the last N results from ThingSpeak and return averaged values.
+    Returns averaged values over the last N readings.
     Standardizes fields for both crop predictor and recovery model.
+    Cached per channel and window size; see aggregate_cache.
+    """
+    key = (THING_SPEAK_CHANNEL_ID, DEVICE_ID, results)
+    return aggregate_cache.get_or_load(key, lambda: _load_aggregate(results))
+
+
+def _load_aggregate(results):
+    """
+    The database computes the statistics over the readings mirrored by the
+    ingestion worker; ThingSpeak + pandas is the fallback.
+    """
+    agg = _aggregate_from_storage(results)
+    if agg:
+        return agg
+    return _aggregate_from_thingspeak(results)
+
+
+def _with_aliases(agg):
+    # also include original names for compatibility
+    agg['soil_ph'] = agg['ph']
+    agg['nitrogen'] = agg['N']
+    agg['phosphorus'] = agg['P']
+    agg['potassium'] = agg['K']
+    return agg
+
+
+def _is_fresh(latest):
+    if not latest:
+        return False
+    try:
+        ts = datetime.fromisoformat(str(latest).replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if ts.tzinfo is None:
+        ts = ts.astimezone()
+    return datetime.now(timezone.utc) - ts <= MAX_STALENESS
+
+
+def _aggregate_from_storage(results):
+    if not store:
+        return None
+
+    try:
+        summary = store.aggregate_readings(DEVICE_ID, limit=results)
+    except Exception as e:
+        print(f"Aggregator Error (storage): {e}")
+        return None
+
+    if not summary or not _is_fresh(summary.get('latest')):
+        return None
+
+    def mean(field):
+        stats = summary.get(field)
+        return round(stats['mean'], 2) if stats else None
+
+    agg = {
+        'temperature': mean('temperature'),
+        'humidity': mean('humidity'),
+        'moisture': mean('moisture'),
+        'ph': mean('soil_ph'),
+        'N': mean('nitrogen'),
+        'P': mean('phosphorus'),
+        'K': mean('potassium'),
+        'rainfall': mean('rainfall') if summary.get('rainfall') else 100.0,
+        'source': 'database',
+        'count': summary['count'],
+        'stats': {
+            field: {k: (round(v, 2) if v is not None else None) for k, v in stats.items() if k in ('min', 'max', 'stddev')}
+            for field, stats in summary.items()
+            if isinstance(stats, dict)
+        }
+    }
+    return _with_aliases(agg)
+
+
+def _aggregate_from_thingspeak(results):
+    """
+    Fetches the last N results from ThingSpeak and averages them in pandas.
     """
     if not THING_SPEAK_CHANNEL_ID or not THING_SPEAK_READ_KEY:
         print(f"DEBUG: Missing THING_SPEAK_CHANNEL_ID({THING_SPEAK_CHANNEL_ID}) or THING_SPEAK_READ_KEY")
         return None
 
     url = (
-        f"https://api.thingspeak.com/channels/"
+        f"{THING_SPEAK_BASE_URL}/channels/"
         f"{THING_SPEAK_CHANNEL_ID.strip()}/feeds.json"
         f"?api_key={THING_SPEAK_READ_KEY.strip()}&results={results}"
     )
     print(f"DEBUG: Fetching aggregator data from ThingSpeak: {url.replace(THING_SPEAK_READ_KEY.strip(), '***')}")
 
     try:
-        response = requests.get(url, timeout=15)
+        response = http.get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
         feeds = data.get("feeds", [])
@@ -58,16 +159,11 @@ def get_aggregated_data(results=30):
             'N': round(df['field5'].mean(), 2),
             'P': round(df['field6'].mean(), 2),
             'K': round(df['field7'].mean(), 2),
-            'rainfall': 100.0 # Default if not in TS
+            'rainfall': 100.0, # Default if not in TS
+            'source': 'thingspeak'
         }
         
-        # also include original names for compatibility
-        agg['soil_ph'] = agg['ph']
-        agg['nitrogen'] = agg['N']
-        agg['phosphorus'] = agg['P']
-        agg['potassium'] = agg['K']
-        
-        return agg
+        return _with_aliases(agg)
 
     except Exception as e:
         print(f"Aggregator Error (ThingSpeak): {e}")
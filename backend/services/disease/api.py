@@ -3,6 +3,7 @@ import os
 import uuid
 import collections
 from .predictor import DiseasePredictor
+from utils.metrics import metrics
 
 disease_bp = Blueprint('disease', __name__)
 predictor = DiseasePredictor()
@@ -14,6 +15,11 @@ if not os.path.exists(UPLOAD_FOLDER):
 
 @disease_bp.route('/predict', methods=['POST'])
 def predict_disease():
+    with metrics.stages('disease') as timer:
+        return _predict_disease(timer)
+
+
+def _predict_disease(timer):
     try:
         # Support both 'images' (multiple) and 'image' (single)
         files = request.files.getlist('images') or request.files.getlist('image')
@@ -32,11 +38,13 @@ def predict_disease():
                 # Save file temporarily
                 filename = f"{uuid.uuid4()}_{file.filename}"
                 filepath = os.path.join(UPLOAD_FOLDER, filename)
-                file.save(filepath)
+                with timer('upload'):
+                    file.save(filepath)
                 saved_filepaths.append(filepath)
                 
                 # Predict for this specific image
-                result = predictor.predict(filepath)
+                with timer('model'):
+                    result = predictor.predict(filepath)
                 predictions.append({
                     'image_id': filename,
                     'disease_name': result['class'],
@@ -89,7 +97,8 @@ def predict_disease():
             else:
                 # 7. Use predefined expert knowledge base
                 from .expert import get_disease_info
-                info = get_disease_info(final_disease)
+                with timer('knowledge_base'):
+                    info = get_disease_info(final_disease)
                 
                 # 8. Handle healthy/disease distinction for treatments/prevention
                 is_healthy = 'healthy' in final_disease.lower()
@@ -2,6 +2,8 @@ import os
 import random
 import numpy as np
 
+from utils.metrics import metrics
+
 class DiseasePredictor:
     def __init__(self):
         """
@@ -107,6 +109,7 @@ class DiseasePredictor:
         Returns a deterministic pseudo-random disease prediction for demonstration.
         The result is tied to the image content via hashing.
         """
+        metrics.fallback('disease_model', 'error' if self.model else 'no_model')
         # Simulate processing time
         import time
         import hashlib
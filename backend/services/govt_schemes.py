@@ -1,54 +1,185 @@
 import json
 import os
+import threading
+from bisect import bisect_right
+
+DEFAULT_DATA_PATH = os.getenv(
+    'GOVT_SCHEMES_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'govt_schemes.json')
+)
+
+# Below this nitrogen level every scheme with a soil_health_condition applies
+LOW_NITROGEN = 50
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _norm(value):
+    return " ".join(str(value).split()).casefold()
+
+
+def _labels(value):
+    """
+    Normalized labels from a list or a comma separated string.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [_norm(v) for v in value if str(v).strip()]
+
+
+def _number(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class SchemeIndex:
+    """
+    The scheme catalog compiled for lookups. Sets of schemes are int
+    bitmasks (bit i = catalog position i), so a query is a few dict
+    lookups, one bisect and a bitwise AND:
+
+    - damage: an interval index over [min_damage_percentage,
+      max_damage_percentage). The sorted interval boundaries split the
+      axis into segments, each holding the mask of schemes covering it.
+    - damage type: inverted index from each of types_of_damage to a mask.
+    - soil: inverted index from each soil_health_condition to a mask, and
+      the mask of every scheme with a soil criterion.
+
+    A scheme is eligible when it covers the damage percentage and lists
+    the damage type, or when it has a soil criterion and the farmer's soil
+    is low in nitrogen or matches one of its conditions (see query()).
+    """
+
+    def __init__(self, schemes):
+        self.schemes = schemes
+        self.type_index = {}
+        self.soil_index = {}
+        self.soil_any = 0
+        intervals = []
+
+        for i, scheme in enumerate(schemes):
+            bit = 1 << i
+            criteria = scheme.get('eligibility') or {}
+            if 'min_damage_percentage' in criteria and 'types_of_damage' in criteria:
+                low = _number(criteria['min_damage_percentage'], float('inf'))
+                high = _number(criteria.get('max_damage_percentage'), float('inf'))
+                if low < high:
+                    intervals.append((low, high, bit))
+                for damage_type in _labels(criteria['types_of_damage']):
+                    self.type_index[damage_type] = self.type_index.get(damage_type, 0) | bit
+            if 'soil_health_condition' in criteria:
+                self.soil_any |= bit
+                for condition in _labels(criteria['soil_health_condition']):
+                    self.soil_index[condition] = self.soil_index.get(condition, 0) | bit
+
+        # Segment k covers [bounds[k-1], bounds[k]); segment 0 is below every interval
+        self.bounds = sorted({b for low, high, _ in intervals for b in (low, high) if b != float('inf')})
+        self.segments = [0] * (len(self.bounds) + 1)
+        for low, high, bit in intervals:
+            start = bisect_right(self.bounds, low)
+            end = bisect_right(self.bounds, high) if high != float('inf') else len(self.segments)
+            for k in range(start, end):
+                self.segments[k] |= bit
+
+    def _key(self, inputs):
+        """
+        Everything query() depends on: farmers with equal keys get the same schemes.
+        """
+        damage_pct = _number(inputs.get('damage_percentage', 0), 0)
+        soil_conditions = tuple(sorted(set(_labels(inputs.get('soil_health')))))
+        return (
+            bisect_right(self.bounds, damage_pct),
+            _norm(inputs.get('damage_type', '')),
+            _number(inputs.get('N', 100), 100) < LOW_NITROGEN,
+            soil_conditions,
+        )
+
+    def _mask(self, key):
+        segment, damage_type, low_nitrogen, soil_conditions = key
+        mask = self.segments[segment] & self.type_index.get(damage_type, 0)
+        if low_nitrogen:
+            mask |= self.soil_any
+        for condition in soil_conditions:
+            mask |= self.soil_index.get(condition, 0)
+        return mask
+
+    def _schemes(self, mask):
+        # Catalog order, first scheme of each name
+        result, seen = [], set()
+        while mask:
+            low_bit = mask & -mask
+            scheme = self.schemes[low_bit.bit_length() - 1]
+            name = scheme.get('scheme_name')
+            if name not in seen:
+                seen.add(name)
+                result.append(scheme)
+            mask ^= low_bit
+        return result
+
+    def query(self, inputs):
+        """
+        inputs: 'damage_percentage', 'damage_type', 'N' and optionally
+        'soil_health' (a condition or a list of conditions from a soil report).
+        """
+        return self._schemes(self._mask(self._key(inputs)))
+
+    def query_batch(self, inputs_list):
+        """
+        query() for many farmers. Farmers that fall in the same damage
+        segment with the same damage type and soil flags share one lookup.
+        """
+        memo = {}
+        results = []
+        for inputs in inputs_list:
+            key = self._key(inputs)
+            schemes = memo.get(key)
+            if schemes is None:
+                schemes = memo[key] = self._schemes(self._mask(key))
+            results.append(list(schemes))
+        return results
+
+
+def load_scheme_index(data_path=DEFAULT_DATA_PATH):
+    """
+    The compiled catalog for `data_path`, read once per process.
+    """
+    path = os.path.abspath(data_path)
+    index = _catalogs.get(path)
+    if index is not None:
+        return index
+    with _catalogs_lock:
+        index = _catalogs.get(path)
+        if index is None:
+            try:
+                with open(path, 'r') as f:
+                    schemes = json.load(f)
+            except Exception as e:
+                print(f"Error loading schemes: {e}")
+                schemes = []
+            index = _catalogs[path] = SchemeIndex(schemes)
+    return index
+
 
 class GovtSchemeService:
-    def __init__(self, data_path='backend/data/govt_schemes.json'):
+    def __init__(self, data_path=DEFAULT_DATA_PATH):
         self.data_path = data_path
-        self.schemes = self._load_schemes()
-
-    def _load_schemes(self):
-        try:
-            with open(self.data_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading schemes: {e}")
-            return []
+        self.index = load_scheme_index(data_path)
+        self.schemes = self.index.schemes
 
     def get_eligible_schemes(self, inputs):
         """
         Filter schemes based on inputs.
-        inputs: dict containing details like 'damage_percentage', 'damage_type', 'soil_health'
-        """
-        eligible_schemes = []
-        damage_pct = inputs.get('damage_percentage', 0)
-        damage_type = inputs.get('damage_type', '')
-        
-        for scheme in self.schemes:
-            criteria = scheme.get('eligibility', {})
-            
-            # Check Damage Criteria
-            if 'min_damage_percentage' in criteria:
-                if damage_pct >= criteria['min_damage_percentage']:
-                     if 'types_of_damage' in criteria and damage_type in criteria['types_of_damage']:
-                         eligible_schemes.append(scheme)
-                         continue
-            
-            # Check Soil Health Criteria (simplistic check)
-            if 'soil_health_condition' in criteria:
-                # We assume inputs might have a flag or derived status, 
-                # for now, match broadly if 'Low Nitrogen' etc is detected
-                # This logic can be refined
-                if inputs.get('N', 100) < 50: # Example logic
-                     eligible_schemes.append(scheme)
-                     continue
-
-        # Remove duplicates based on scheme name
-        seen_schemes = set()
-        unique_schemes = []
-        for scheme in eligible_schemes:
-            name = scheme.get('scheme_name')
-            if name not in seen_schemes:
-                seen_schemes.add(name)
-                unique_schemes.append(scheme)
-                
-        return unique_schemes
+        inputs: dict containing details like 'damage_percentage', 'damage_type', 'N', 'soil_health'
+        """
+        return self.index.query(inputs)
+
+    def get_eligible_schemes_batch(self, inputs_list):
+        """
+        get_eligible_schemes for many farmers, in the same order.
+        """
+        return self.index.query_batch(inputs_list)
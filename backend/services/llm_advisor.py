@@ -1,6 +1,7 @@
 import os
 import google.generativeai as genai
 from dotenv import load_dotenv
+from utils.metrics import metrics
 
 load_dotenv()
 
@@ -19,6 +20,7 @@ class LLMAdvisor:
         Generates a human-readable explanation of the recovery plan using Google Gemini.
         """
         if not self.model:
+            metrics.fallback('llm', 'no_api_key')
             return "AI explanation unavailable (API Key missing)."
 
         prompt = f"""
@@ -52,6 +54,7 @@ class LLMAdvisor:
         """
         Generates a static but realistic explanation when API is unavailable.
         """
+        metrics.fallback('llm', 'error')
         decision = recovery_data.get('decision', 'Review Required')
         eco_tip = recovery_data.get('eco_advisory', [{'solution': 'Use organic compost'}])[0]['solution']
         
@@ -0,0 +1,66 @@
+// Long-lived PDF renderer, one of the pool started by services/pdf_renderer.py.
+//
+//   node pdf_renderer.js <unix socket path>
+//
+// Frames on the socket:
+//   request:  uint32 BE length + report JSON (UTF-8)
+//   response: uint8 status (0 = ok, 1 = error) + uint32 BE length + PDF bytes or error message
+// Requests on one connection are answered in order. Prints "ready" once listening
+// and exits when its stdin closes, so it never outlives the Python worker.
+
+const fs = require('fs');
+const net = require('net');
+const { renderReport } = require('./pdf_report');
+
+const socketPath = process.argv[2];
+
+if (!socketPath) {
+    console.error('Error: No socket path provided');
+    process.exit(1);
+}
+
+const frame = (status, payload) => {
+    const header = Buffer.alloc(5);
+    header.writeUInt8(status, 0);
+    header.writeUInt32BE(payload.length, 1);
+    return Buffer.concat([header, payload]);
+};
+
+const handleConnection = (socket) => {
+    let buffered = Buffer.alloc(0);
+    let queue = Promise.resolve();
+
+    socket.on('data', (chunk) => {
+        buffered = Buffer.concat([buffered, chunk]);
+        while (buffered.length >= 4) {
+            const length = buffered.readUInt32BE(0);
+            if (buffered.length < 4 + length) break;
+            const body = buffered.subarray(4, 4 + length);
+            buffered = buffered.subarray(4 + length);
+
+            queue = queue
+                .then(() => renderReport(JSON.parse(body.toString('utf8'))))
+                .then(
+                    pdf => socket.write(frame(0, pdf)),
+                    error => socket.write(frame(1, Buffer.from(String(error && error.message || error), 'utf8')))
+                );
+        }
+    });
+
+    socket.on('error', (error) => console.error('Renderer connection error:', error.message));
+};
+
+if (fs.existsSync(socketPath)) fs.unlinkSync(socketPath);
+
+const server = net.createServer(handleConnection);
+server.listen(socketPath, () => console.log('ready'));
+
+const shutdown = () => {
+    server.close();
+    if (fs.existsSync(socketPath)) fs.unlinkSync(socketPath);
+    process.exit(0);
+};
+
+process.stdin.on('end', shutdown);
+process.stdin.resume();
+process.on('SIGTERM', shutdown);
@@ -0,0 +1,233 @@
+import atexit
+import hashlib
+import json
+import os
+import queue
+import select
+import shutil
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+
+from utils.metrics import metrics
+
+POOL_SIZE = int(os.getenv('PDF_RENDERERS', 2))
+RENDER_TIMEOUT = float(os.getenv('PDF_RENDER_TIMEOUT', 10))
+STARTUP_TIMEOUT = float(os.getenv('PDF_RENDERER_STARTUP_TIMEOUT', 10))
+NODE_BINARY = os.getenv('NODE_BINARY', 'node')
+SERVICES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _template_version():
+    """
+    Identifies the report layout: changes with pdf_report.js or the
+    configured fonts. Part of every cached report's key (report_store.py).
+    """
+    override = os.getenv('REPORT_TEMPLATE_VERSION')
+    if override:
+        return override
+    digest = hashlib.sha256()
+    with open(os.path.join(SERVICES_DIR, 'pdf_report.js'), 'rb') as f:
+        digest.update(f.read())
+    for var in ('PDF_FONT', 'PDF_FONT_BOLD'):
+        digest.update(os.getenv(var, '').encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+TEMPLATE_VERSION = _template_version()
+
+
+class PdfRenderError(Exception):
+    pass
+
+
+class _Renderer:
+    """
+    One `node pdf_renderer.js` process and a persistent connection to its
+    Unix socket. Requests and responses are length-prefixed frames (see
+    pdf_renderer.js).
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        try:
+            self.process = subprocess.Popen(
+                [NODE_BINARY, 'pdf_renderer.js', socket_path],
+                cwd=SERVICES_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+        except OSError as e:
+            raise PdfRenderError(f"Could not start {NODE_BINARY}: {e}")
+
+        ready, _, _ = select.select([self.process.stdout], [], [], STARTUP_TIMEOUT)
+        if not ready or self.process.stdout.readline().strip() != b'ready':
+            self.close()
+            raise PdfRenderError("PDF renderer did not start (is pdfkit installed? run npm install in backend/)")
+
+        self.conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.conn.connect(socket_path)
+        except OSError as e:
+            self.close()
+            raise PdfRenderError(f"Could not connect to PDF renderer: {e}")
+
+    def _recv_exact(self, n):
+        chunks, remaining = [], n
+        while remaining:
+            chunk = self.conn.recv(min(remaining, 1 << 20))
+            if not chunk:
+                raise PdfRenderError("PDF renderer closed the connection")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    def render(self, payload, timeout):
+        """
+        (status, body) for one JSON payload; status 0 means body is the PDF.
+        """
+        self.conn.settimeout(timeout)
+        self.conn.sendall(struct.pack('>I', len(payload)) + payload)
+        status, length = struct.unpack('>BI', self._recv_exact(5))
+        return status, self._recv_exact(length)
+
+    def close(self):
+        conn = getattr(self, 'conn', None)
+        if conn:
+            conn.close()
+        try:
+            self.process.stdin.close()  # the renderer exits when its stdin closes
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+
+class PdfRendererPool:
+    """
+    Long-lived Node renderers shared by all requests of this process.
+    Renderers are started on first use, up to `size`; a request takes an
+    idle one or waits for one to come back. A renderer that times out or
+    breaks is killed and replaced by the next request that needs one.
+    PDFs come back over the socket and are served from memory: no temp
+    files, no per-request Node startup.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=RENDER_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._reset()
+        # Renderers belong to the process that started them; forked workers start their own
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._socket_dir = None
+        self._latencies = deque(maxlen=256)
+        self._counters = dict.fromkeys(('renders', 'errors', 'timeouts', 'renderers_started'), 0)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _checkout(self):
+        while True:
+            try:
+                renderer = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if renderer.process.poll() is None:
+                return renderer
+            self._discard(renderer)  # exited while idle
+
+        with self._lock:
+            start_new = self._started < self.size
+            if start_new:
+                self._started += 1
+                if self._socket_dir is None:
+                    self._socket_dir = tempfile.mkdtemp(prefix='mm_pdf_')
+                socket_path = os.path.join(self._socket_dir, f"renderer-{self._counters['renderers_started']}.sock")
+                self._counters['renderers_started'] += 1
+        if start_new:
+            try:
+                return _Renderer(socket_path)
+            except PdfRenderError:
+                with self._lock:
+                    self._started -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            self._count('timeouts')
+            raise PdfRenderError(f"No PDF renderer free within {self.timeout}s")
+
+    def _discard(self, renderer):
+        renderer.close()
+        with self._lock:
+            self._started -= 1
+
+    def render(self, data):
+        """
+        The report PDF for `data` as bytes.
+        """
+        payload = json.dumps(data, default=str).encode('utf-8')
+        start = time.perf_counter()
+        for attempt in (1, 2):
+            renderer = self._checkout()
+            try:
+                status, body = renderer.render(payload, self.timeout)
+                break
+            except socket.timeout:
+                self._discard(renderer)
+                self._count('timeouts')
+                raise PdfRenderError(f"PDF rendering took longer than {self.timeout}s")
+            except (OSError, PdfRenderError) as e:
+                # A renderer that died mid-request; rendering is idempotent, so retry once on a fresh one
+                self._discard(renderer)
+                self._count('errors')
+                if attempt == 2:
+                    raise PdfRenderError(str(e))
+
+        self._idle.put(renderer)
+        if status != 0:
+            self._count('errors')
+            raise PdfRenderError(body.decode('utf-8', 'replace'))
+
+        with self._lock:
+            self._latencies.append((time.perf_counter() - start) * 1000)
+            self._counters['renders'] += 1
+        return body
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+            running = self._started
+        return {
+            **counters,
+            'renderers_running': running,
+            'renderers_idle': self._idle.qsize(),
+            'pool_size': self.size,
+            'render_ms_avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'render_ms_p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+        }
+
+
+# Create a global instance
+renderer_pool = PdfRendererPool()
+metrics.expose_stats('pdf_renderer', renderer_pool.stats, "PDF renderer pool")
+
+atexit.register(renderer_pool.close)
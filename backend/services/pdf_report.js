@@ -0,0 +1,208 @@
+// Crop & fertilizer recommendation report, rendered in memory.
+// Used by the long-lived renderer (pdf_renderer.js) and the one-shot CLI (generate_pdf.js).
+
+const PDFDocument = require('pdfkit');
+const fs = require('fs');
+
+// Optional TrueType fonts (e.g. Noto Sans Devanagari/Telugu for translated crop names).
+// Read once per process; without them the built-in Helvetica is used.
+const loadFont = (envVar, fallback) => {
+    const fontPath = process.env[envVar];
+    if (!fontPath) return fallback;
+    try {
+        return fs.readFileSync(fontPath);
+    } catch (error) {
+        console.error(`Error loading ${envVar} (${fontPath}):`, error.message);
+        return fallback;
+    }
+};
+
+const FONTS = {
+    regular: loadFont('PDF_FONT', 'Helvetica'),
+    bold: loadFont('PDF_FONT_BOLD', 'Helvetica-Bold'),
+};
+
+// Static sections, identical in every report
+const GUIDELINES = [
+    '1. Apply fertilizer during early morning or late evening to minimize nutrient loss.',
+    '2. Ensure soil has adequate moisture before fertilizer application.',
+    '3. Follow recommended dosage based on crop stage and field size.',
+    '4. Monitor crop response and adjust application as needed.',
+    '5. Maintain proper spacing and avoid over-application.',
+];
+
+const FARMING_INSTRUCTIONS = [
+    ['Preparation Phase:', [
+        '• Clear the field of previous crop residues.',
+        '• Deep ploughing is recommended to kill soil-borne pathogens.',
+    ]],
+    ['Sowing Phase:', [
+        '• Use high-quality certified seeds.',
+        '• Treat seeds with fungicides before sowing if necessary.',
+    ]],
+    ['Water Management:', [
+        '• Avoid water logging.',
+        '• Critical stages for irrigation: Germination, Tillering, Flowering.',
+    ]],
+];
+
+const NOTES = [
+    '• This recommendation is based on current soil analysis and AI predictions.',
+    '• Soil conditions may vary across different parts of the field.',
+    '• Consider conducting soil tests periodically for best results.',
+    '• Weather conditions and crop stage should be considered during application.',
+];
+
+const DISCLAIMER =
+    'Disclaimer: This recommendation is advisory and based on available sensor data and AI models. ' +
+    'Please consult with a local agronomist or agricultural expert before making final decisions. ' +
+    'MITTI MITRA is not responsible for any crop or financial losses.';
+
+const drawReport = (doc, data) => {
+    const params = data.used_params || {};
+
+    // Helper for section headers
+    const drawSectionHeader = (title, color = '#1B5E20') => {
+        doc.moveDown(0.8);
+        doc.fontSize(16).fillColor(color).text(title, { underline: true });
+        doc.moveDown(0.4);
+    };
+
+    // 1. Title & Header
+    doc.fontSize(26).fillColor('#2E7D32').text('MITTI MITRA', { align: 'center' });
+    doc.fontSize(18).fillColor('#4caf50').text('Crop & Fertilizer Recommendation Report', { align: 'center' });
+    doc.fontSize(10).fillColor('#666666').text(`Generated: ${new Date().toLocaleString()}`, { align: 'center' });
+    doc.moveDown(2);
+
+    // 2. Soil Analysis Summary
+    drawSectionHeader('Soil Analysis Summary');
+    doc.fontSize(11).fillColor('#000000');
+    doc.text(`Nitrogen (N): ${params.N} mg/kg`);
+    doc.text(`Phosphorus (P): ${params.P} mg/kg`);
+    doc.text(`Potassium (K): ${params.K} mg/kg`);
+    doc.text(`Soil pH: ${params.ph}`);
+    doc.text(`Temperature: ${params.temperature}°C`);
+    doc.text(`Humidity: ${params.humidity}%`);
+    if (params.moisture) doc.text(`Soil Moisture: ${params.moisture}%`);
+    if (params.soil_type) doc.text(`Soil Type: ${params.soil_type}`);
+    doc.moveDown(1);
+
+    // 3. Recommendations
+    if (data.recommendations && data.recommendations.length > 0) {
+        data.recommendations.forEach((rec, index) => {
+            const isFirst = index === 0;
+            const crop = rec.crop;
+            const fert = rec.fertilizer;
+            const yld = rec.yield;
+            const cropName = crop.translated_crop || crop.crop;
+            const fertName = fert.translated_name || fert.name;
+
+            // Differentiate colors between top recommendation and others
+            const accentColor = isFirst ? '#10B981' : '#6366F1'; // Emerald vs Indigo
+
+            doc.fontSize(14).fillColor(accentColor).text(`Recommendation #${index + 1}: ${cropName.toUpperCase()}`, { underline: true });
+            doc.moveDown(0.2);
+
+            // Yield Info
+            doc.fontSize(11).fillColor('#000000').text(`Estimated Yield: ${yld.predicted_yield} ${yld.unit} (${yld.season} season)`);
+            doc.moveDown(0.3);
+
+            // Fertilizer Section - Using Accent Colors
+            doc.fontSize(12).fillColor(accentColor).text('Fertilizer Recommendation: ' + fertName);
+            doc.moveDown(0.2);
+
+            if (fert.reasoning && fert.reasoning.length > 0) {
+                doc.fontSize(10).fillColor('#1F2937').text('Reasoning:');
+                fert.reasoning.forEach(r => {
+                    doc.fontSize(9).fillColor('#4B5563').text(` • ${r}`, { indent: 15 });
+                });
+                doc.moveDown(0.1);
+            }
+
+            if (fert.application_tips && fert.application_tips.length > 0) {
+                doc.fontSize(10).fillColor(accentColor).text('Application Tips:');
+                fert.application_tips.forEach(tip => {
+                    doc.fontSize(9).fillColor('#374151').text(` * ${tip}`, { indent: 15 });
+                });
+                doc.moveDown(0.1);
+            }
+
+            // Crop reasoning
+            if (crop.reasoning && crop.reasoning.length > 0) {
+                doc.fontSize(10).fillColor('#1F2937').text(`Why ${cropName}?`);
+                crop.reasoning.forEach(r => {
+                    doc.fontSize(9).fillColor('#4B5563').text(` - ${r}`, { indent: 15 });
+                });
+            }
+
+            doc.moveDown(0.5);
+            // Horizontal Separator
+            doc.strokeColor('#E5E7EB').lineWidth(0.5).moveTo(50, doc.y).lineTo(550, doc.y).stroke();
+            doc.moveDown(0.5);
+        });
+    } else {
+        drawSectionHeader('Recommendations');
+        doc.fontSize(11).fillColor('#6B7280').text('No recommendations available in the provided data.');
+    }
+
+    // Ensure there's a small break before guidelines if on same page, or move to next
+    if (doc.y > 550) {
+        doc.addPage();
+    } else {
+        doc.moveDown(1);
+    }
+
+    // 6. Application Guidelines
+    drawSectionHeader('Application Guidelines');
+    doc.fontSize(11).fillColor('#555555');
+    GUIDELINES.forEach(line => doc.text(line));
+    doc.moveDown(1);
+
+    // 7. General Farming Instructions
+    drawSectionHeader('General Farming Instructions');
+    FARMING_INSTRUCTIONS.forEach(([title, lines], index) => {
+        doc.font('Bold').fillColor('#000000').text(title);
+        doc.font('Regular').fillColor('#555555');
+        lines.forEach(line => doc.text(line, { indent: 15 }));
+        doc.moveDown(index === FARMING_INSTRUCTIONS.length - 1 ? 1 : 0.5);
+    });
+
+    // 8. Important Notes
+    drawSectionHeader('Important Notes');
+    doc.fontSize(10).fillColor('#555555');
+    NOTES.forEach(line => doc.text(line));
+    doc.moveDown(3);
+
+    // 9. Disclaimer
+    doc.fontSize(10).fillColor('#999999').text(DISCLAIMER, { align: 'center', width: 500 });
+
+    // Footer
+    doc.moveDown(2);
+    doc.fontSize(9).fillColor('#CCCCCC').text(
+        '─────────────────────────────────────────────────────',
+        { align: 'center' }
+    );
+    doc.fontSize(8).fillColor('#999999').text(
+        'Powered by MITTI MITRA - Smart Agriculture System',
+        { align: 'center' }
+    );
+};
+
+// Renders the report for `data` and resolves with the whole PDF as a Buffer
+exports.renderReport = (data) => new Promise((resolve, reject) => {
+    const doc = new PDFDocument({ margin: 50 });
+    const chunks = [];
+    doc.on('data', chunk => chunks.push(chunk));
+    doc.on('end', () => resolve(Buffer.concat(chunks)));
+    doc.on('error', reject);
+
+    try {
+        doc.registerFont('Regular', FONTS.regular);
+        doc.registerFont('Bold', FONTS.bold);
+        doc.font('Regular');
+        drawReport(doc, data);
+        doc.end();
+    } catch (error) {
+        reject(error);
+    }
+});
@@ -1,17 +1,40 @@
-from config.supabase_client import supabase
+import os
+from storage import store
+from services.prediction_writer import writer
 from datetime import datetime
 
+# PREDICTION_WRITER=sync writes inline on the request thread (the old behaviour)
+ASYNC_WRITES = os.getenv('PREDICTION_WRITER', 'async').lower() != 'sync'
+
 class PredictionStorageService:
     """
     Service to store real-world prediction data in the database.
     Standardized to use crop_predictions and created_at.
+    Writes go through the configured storage backend (see storage/),
+    batched by the background PredictionWriter unless PREDICTION_WRITER=sync.
     """
+
+    def _save(self, table, record, label):
+        """
+        Queues the record (returned as-is) or, in sync mode, inserts it and
+        returns the stored row.
+        """
+        if ASYNC_WRITES:
+            writer.submit(table, record)
+            return record
+
+        row = store.insert_prediction(table, record)
+        if row:
+            print(f"✓ {label} stored")
+        else:
+            print(f"✗ Failed to store {label}")
+        return row
     
     def store_crop_prediction(self, sensor_data, predicted_crop, confidence, device_id='web_client', location=None, translated_crop=None):
         """
         Store a crop prediction.
         """
-        if not supabase:
+        if not store:
             return None
         
         try:
@@ -31,14 +54,7 @@ class PredictionStorageService:
                 'translated_crop': translated_crop
             }
             
-            response = supabase.table('crop_predictions').insert(record).execute()
-            
-            if response.data:
-                print(f"✓ Crop prediction stored: {predicted_crop}")
-                return response.data[0]
-            else:
-                print("✗ Failed to store crop prediction")
-                return None
+            return self._save('crop_predictions', record, f"crop prediction ({predicted_crop})")
                 
         except Exception as e:
             print(f"Error storing crop prediction: {e}")
@@ -48,7 +64,7 @@ class PredictionStorageService:
         """
         Store a fertilizer prediction.
         """
-        if not supabase:
+        if not store:
             return None
             
         try:
@@ -68,12 +84,7 @@ class PredictionStorageService:
                 'translated_fertilizer': translated_fertilizer
             }
             
-            response = supabase.table('fertilizer_predictions').insert(record).execute()
-            
-            if response.data:
-                 print(f"✓ Fertilizer prediction stored: {recommendation}")
-                 return response.data[0]
-            return None
+            return self._save('fertilizer_predictions', record, f"fertilizer prediction ({recommendation})")
             
         except Exception as e:
             print(f"Error storing fertilizer prediction: {e}")
@@ -83,18 +94,11 @@ class PredictionStorageService:
         """
         Retrieve recent crop predictions for a device.
         """
-        if not supabase:
+        if not store:
             return []
         
         try:
-            response = supabase.table('crop_predictions')\
-                .select('*')\
-                .eq('device_id', device_id)\
-                .order('created_at', desc=True)\
-                .limit(limit)\
-                .execute()
-            
-            return response.data if response.data else []
+            return store.select_predictions('crop_predictions', device_id=device_id, limit=limit)
             
         except Exception as e:
             print(f"Error retrieving predictions: {e}")
@@ -104,23 +108,20 @@ class PredictionStorageService:
         """
         Get statistics on predicted crops over the last N days.
         """
-        if not supabase:
+        if not store:
             return {}
         
         try:
             from datetime import timedelta
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
             
-            response = supabase.table('crop_predictions')\
-                .select('predicted_crop')\
-                .gte('created_at', cutoff_date)\
-                .execute()
+            rows = store.select_predictions('crop_predictions', columns='predicted_crop', since=cutoff_date)
             
-            if not response.data:
+            if not rows:
                 return {}
             
             crop_counts = {}
-            for record in response.data:
+            for record in rows:
                 crop = record['predicted_crop']
                 crop_counts[crop] = crop_counts.get(crop, 0) + 1
             
@@ -0,0 +1,287 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+from storage import store
+from utils.metrics import metrics
+
+QUEUE_SIZE = int(os.getenv('PREDICTION_QUEUE_SIZE', 1000))
+BATCH_SIZE = int(os.getenv('PREDICTION_BATCH_SIZE', 100))
+FLUSH_INTERVAL = float(os.getenv('PREDICTION_FLUSH_INTERVAL', 1.0))
+# What to do with a record when the queue is full: 'spill' (append to SPILL_PATH) or 'drop'
+OVERFLOW = os.getenv('PREDICTION_OVERFLOW', 'spill').lower()
+SPILL_PATH = os.getenv(
+    'PREDICTION_SPILL_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'prediction_spill.jsonl')
+)
+
+
+class PredictionWriter:
+    """
+    Persists prediction rows off the request path.
+    submit() only enqueues; one background thread drains the bounded queue
+    and writes each table's rows with a single store.insert_predictions call
+    per batch (up to `batch_size` rows, or whatever arrived within
+    `flush_interval`).
+    When the queue is full, or a batch insert fails, rows are appended to a
+    JSONL spill file (or dropped with overflow='drop'); spilled rows are
+    replayed after the next successful flush.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 overflow=OVERFLOW, spill_path=SPILL_PATH):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self._reset()
+        # The writer thread does not survive fork (gunicorn preload); children start their own
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._thread = None
+        self._latencies = deque(maxlen=256)
+        self._counters = dict.fromkeys(
+            ('submitted', 'written', 'dropped', 'spilled', 'replayed', 'flushes', 'flush_errors'), 0
+        )
+        self._max_depth = 0
+        self._last_error = None
+        # Rows this process put in the spill file minus those it replayed
+        # out of it; other workers share the file (see spill_bytes in stats)
+        self._spill_pending = 0
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _ensure_thread(self):
+        if self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True, name="prediction-writer")
+            self._thread.start()
+
+    def submit(self, table, record):
+        """
+        Queues one row for `table`. Never blocks; returns False when the row
+        was spilled or dropped because the queue is full.
+        """
+        self._ensure_thread()
+        self._count('submitted')
+        try:
+            self._queue.put_nowait((table, record))
+        except queue.Full:
+            if self.overflow == 'spill' and self._spill([(table, record)]):
+                self._count('spilled')
+            else:
+                self._count('dropped')
+            return False
+
+        depth = self._queue.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if self._write(batch):
+                self._replay_spill()
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        """
+        One insert per table. Rows of a failed insert are spilled.
+        Returns True when every insert succeeded.
+        """
+        by_table = {}
+        for table, record in batch:
+            by_table.setdefault(table, []).append(record)
+
+        ok = True
+        for table, records in by_table.items():
+            start = time.perf_counter()
+            try:
+                store.insert_predictions(table, records)
+            except Exception as e:
+                print(f"Error storing {len(records)} {table} rows: {e}")
+                self._last_error = str(e)
+                self._count('flush_errors')
+                if self.overflow == 'spill' and self._spill([(table, r) for r in records]):
+                    self._count('spilled', len(records))
+                else:
+                    self._count('dropped', len(records))
+                ok = False
+                continue
+            with self._lock:
+                self._latencies.append((time.perf_counter() - start) * 1000)
+                self._counters['flushes'] += 1
+                self._counters['written'] += len(records)
+        return ok
+
+    def _spill(self, rows):
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    for table, record in rows:
+                        f.write(json.dumps({'table': table, 'record': record}, default=str) + '\n')
+                self._spill_pending += len(rows)
+            return True
+        except OSError as e:
+            print(f"Error spilling predictions: {e}")
+            return False
+
+    def _replay_spill(self):
+        """
+        Re-inserts spilled rows once the database accepts writes again.
+        Rows that fail again are spilled back by _write.
+        The spill file is shared by every worker: each replay moves it to a
+        name of its own, and deletes that only after all of its rows were
+        written or spilled back. Replay files left by a worker that died
+        mid-replay are picked up too (rows it had already inserted are
+        inserted again: replay is at-least-once).
+        """
+        replay_paths = self._orphaned_replays()
+        if os.path.exists(self.spill_path):
+            replay_path = f"{self.spill_path}.{os.getpid()}.{uuid.uuid4().hex}.replay"
+            with self._spill_lock:
+                try:
+                    os.replace(self.spill_path, replay_path)
+                    replay_paths.append(replay_path)
+                except OSError:
+                    pass
+
+        for replay_path in replay_paths:
+            if not self._replay_file(replay_path):
+                return
+
+    def _orphaned_replays(self):
+        """
+        Claims replay files whose worker is gone, by renaming them to a name of our own.
+        """
+        claimed = []
+        for path in glob.glob(glob.escape(self.spill_path) + '.*.replay'):
+            try:
+                pid = int(path[len(self.spill_path) + 1:].split('.')[0])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                claimed.append(path)  # kept by one of our own replays that hit a failure
+                continue
+            try:
+                os.kill(pid, 0)
+                continue  # still running, its replay is in progress
+            except ProcessLookupError:
+                pass
+            except OSError:
+                continue
+            own = f"{self.spill_path}.{os.getpid()}.{uuid.uuid4().hex}.replay"
+            try:
+                os.rename(path, own)
+                claimed.append(own)
+            except OSError:
+                pass  # another worker claimed it first
+        return claimed
+
+    def _replay_file(self, replay_path):
+        """
+        Replays one claimed file. Returns False when the database is still
+        failing; the rows not yet written are then back in the spill file.
+        """
+        rows = []
+        try:
+            with open(replay_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                        rows.append((item['table'], item['record']))
+                    except (ValueError, KeyError):
+                        continue
+        except OSError:
+            return True
+
+        ok = True
+        for i in range(0, len(rows), self.batch_size):
+            chunk = rows[i:i + self.batch_size]
+            if not self._write(chunk):
+                # Still failing: _write spilled the chunk, the rest goes back untouched
+                rest = rows[i + self.batch_size:]
+                if rest and not self._spill(rest):
+                    return False  # keep the replay file, nothing in it is lost
+                ok = False
+                break
+            self._count('replayed', len(chunk))
+        os.remove(replay_path)
+        with self._spill_lock:
+            self._spill_pending = max(0, self._spill_pending - len(rows))
+        return ok
+
+    def flush(self, timeout=10.0):
+        """
+        Waits until everything queued so far has been written (or spilled).
+        Returns False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+        with self._spill_lock:
+            spill_pending = self._spill_pending
+        try:
+            spill_bytes = os.stat(self.spill_path).st_size
+        except FileNotFoundError:
+            spill_bytes = 0  # absent, or moved away by a replay
+        return {
+            **counters,
+            'queue_depth': self._queue.qsize(),
+            'queue_max_depth': self._max_depth,
+            'queue_size': self.queue_size,
+            'spill_pending': spill_pending,
+            'spill_bytes': spill_bytes,
+            'flush_ms_avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'flush_ms_p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+            'flush_ms_max': round(latencies[-1], 2) if latencies else None,
+            'last_error': self._last_error,
+        }
+
+
+# Create a global instance
+writer = PredictionWriter()
+metrics.expose_stats('prediction_writer', writer.stats, "Background prediction writer")
+
+# Write out whatever is still queued on a clean shutdown
+atexit.register(writer.flush, 5.0)
@@ -0,0 +1,78 @@
+import os
+import threading
+
+from utils.cache import LRUCache
+from ml.model_registry import registry
+
+# Quantization step per numeric input, roughly the precision of the field sensors
+# (NPK probe 1 mg/kg, DHT22 0.5 °C / 1 %RH, pH probe 0.1).
+QUANTIZE_STEPS = {
+    'N': 1.0,
+    'P': 1.0,
+    'K': 1.0,
+    'temperature': 0.5,
+    'humidity': 1.0,
+    'ph': 0.1,
+    'rainfall': 1.0,
+    'moisture': 1.0,
+    'fertilizer_usage': 1.0,
+    'pesticide_usage': 0.01,
+}
+
+# Categorical context that changes the cascade output
+CONTEXT_FIELDS = ('soil_type', 'crop_type', 'state', 'district', 'season', 'lang')
+
+
+def quantize(value, step):
+    try:
+        return round(round(float(value) / step) * step, 4)
+    except (TypeError, ValueError):
+        return None
+
+
+class RecommendationCache:
+    """
+    Memoizes /api/predict/recommend results keyed on the quantized input
+    vector plus categorical context. Cleared whenever the model registry
+    version changes.
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        if max_entries is None:
+            max_entries = int(os.getenv("RECOMMEND_CACHE_SIZE", "1024"))
+        if ttl is None:
+            ttl = float(os.getenv("RECOMMEND_CACHE_TTL", "600"))
+        self.enabled = max_entries > 0 and ttl > 0
+        self.cache = LRUCache(max_entries=max(max_entries, 1), ttl=ttl, name="recommend_cache")
+        self._version = None
+        self._lock = threading.Lock()
+
+    def key(self, data):
+        numeric = tuple(quantize(data.get(f), step) for f, step in QUANTIZE_STEPS.items())
+        context = tuple(str(data.get(f) or '').strip().lower() for f in CONTEXT_FIELDS)
+        return numeric + context
+
+    def _check_version(self):
+        version = registry.version()
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    print(f"Model set changed ({self._version} -> {version}); clearing recommendation cache")
+                    self.cache.clear()
+                self._version = version
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        self._check_version()
+        return self.cache.get(key)
+
+    def put(self, key, value):
+        if self.enabled:
+            self.cache.put(key, value)
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats['enabled'] = self.enabled
+        stats['model_version'] = self._version
+        return stats
@@ -3,6 +3,7 @@ from services.rule_engine import RuleEngine
 from services.eco_advisory import EcoAdvisoryService
 from services.govt_schemes import GovtSchemeService
 from services.llm_advisor import LLMAdvisor
+from utils.metrics import metrics
 
 class RecoveryManager:
     def __init__(self):
@@ -17,33 +18,39 @@ class RecoveryManager:
         Orchestrates the recovery decision workflow.
         features: dict containing all input parameters
         """
-        # 1. ML Prediction
-        ml_result = self.ml_model.predict(features)
-        initial_decision = ml_result['prediction']
-        
-        # 2. Rule Engine Override
-        final_decision, reason = self.rule_engine.apply_rules(features, initial_decision)
-        
-        # 3. Eco Advisory
-        eco_tips = self.eco_service.generate_advisory(features)
-        
-        # 4. Government Schemes
-        # We need to pass more comprehensive data for schemes if available, 
-        # for now using features which contains 'damage_percentage' etc.
-        schemes = self.scheme_service.get_eligible_schemes(features)
-        
-        # Construct intermediate result
-        recovery_plan = {
-            "decision": final_decision,
-            "confidence": ml_result['confidence'],
-            "reason": reason,
-            "ml_analysis": ml_result, # detailed ML output
-            "eco_advisory": eco_tips,
-            "schemes": schemes
-        }
-        
-        # 5. LLM Explanation
-        llm_explanation = self.llm_advisor.generate_explanation(recovery_plan)
-        recovery_plan['llm_explanation'] = llm_explanation
-        
+        with metrics.stages('recovery') as timer:
+            # 1. ML Prediction
+            with timer('ml_model'):
+                ml_result = self.ml_model.predict(features)
+            initial_decision = ml_result['prediction']
+
+            # 2. Rule Engine Override
+            with timer('rules'):
+                final_decision, reason = self.rule_engine.apply_rules(features, initial_decision)
+
+            # 3. Eco Advisory
+            with timer('eco_advisory'):
+                eco_tips = self.eco_service.generate_advisory(features)
+
+            # 4. Government Schemes
+            # We need to pass more comprehensive data for schemes if available, 
+            # for now using features which contains 'damage_percentage' etc.
+            with timer('schemes'):
+                schemes = self.scheme_service.get_eligible_schemes(features)
+
+            # Construct intermediate result
+            recovery_plan = {
+                "decision": final_decision,
+                "confidence": ml_result['confidence'],
+                "reason": reason,
+                "ml_analysis": ml_result, # detailed ML output
+                "eco_advisory": eco_tips,
+                "schemes": schemes
+            }
+
+            # 5. LLM Explanation
+            with timer('llm'):
+                llm_explanation = self.llm_advisor.generate_explanation(recovery_plan)
+            recovery_plan['llm_explanation'] = llm_explanation
+
         return recovery_plan
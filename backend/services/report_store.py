@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+from utils.metrics import metrics
+
+ENABLED = os.getenv('REPORT_CACHE', 'on').lower() != 'off'
+CACHE_DIR = os.getenv(
+    'REPORT_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'report_cache')
+)
+MAX_BYTES = int(float(os.getenv('REPORT_CACHE_MAX_MB', 256)) * 1024 * 1024)
+
+
+def artifact_key(payload, template_version):
+    """
+    Content address of a report: sha256 over the template version and the
+    payload as canonical JSON (sorted keys, no whitespace), so the same
+    recommendation always maps to the same artifact whatever the key order.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{template_version}\n{canonical}".encode('utf-8')).hexdigest()
+
+
+class ReportArtifactStore:
+    """
+    Rendered reports on local disk, one file per content key, evicted least
+    recently used first once the directory grows past `max_bytes`.
+    Reads touch the file's mtime, so recency is shared by every worker
+    process using the same directory; eviction rescans it for that reason.
+    Writes go to a temp file and are renamed into place.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES, suffix='.pdf'):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size, least recently used first
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'write_errors': 0}
+        self._scan()
+
+    def _path(self, key):
+        return os.path.join(self.root, key + self.suffix)
+
+    def _scan(self):
+        """
+        Rebuilds the index from the directory, oldest mtime first.
+        """
+        entries = []
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(self.suffix):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, entry.name[:-len(self.suffix)], st.st_size))
+        except FileNotFoundError:
+            pass
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._bytes = sum(self._index.values())
+
+    def get(self, key):
+        """
+        The cached artifact bytes, or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._stats['misses'] += 1
+                if key in self._index:
+                    self._bytes -= self._index.pop(key)  # evicted by another worker
+            return None
+
+        with self._lock:
+            self._stats['hits'] += 1
+            if key not in self._index:
+                self._bytes += len(data)
+            self._index[key] = len(data)
+            self._index.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return False
+        tmp = os.path.join(self.root, f".{key}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"Error caching report {key}: {e}")
+            with self._lock:
+                self._stats['write_errors'] += 1
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+        with self._lock:
+            self._stats['writes'] += 1
+            self._bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def _evict(self):
+        # Other workers add files too: start from what is actually on disk
+        self._scan()
+        while self._bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+                self._stats['evictions'] += 1
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._index)
+            stats['bytes'] = self._bytes
+        served = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / served, 4) if served else 0.0
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+# Create a global instance
+report_store = ReportArtifactStore() if ENABLED else None
+if report_store:
+    metrics.expose_stats('report_artifacts', report_store.stats, "Rendered report artifact cache")
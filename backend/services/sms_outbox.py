@@ -0,0 +1,469 @@
+"""
+SMS delivery off the request path.
+
+- Providers: Fast2SmsProvider (the Fast2SMS bulk API, needs
+  FAST2SMS_API_KEY) and FakeSmsProvider (records messages in memory, for
+  tests and offline runs). SMS_PROVIDER=fast2sms|fake selects one.
+- SmsOutbox: enqueue() returns an id immediately; one background thread
+  groups recipients of identical messages into the provider's comma
+  separated `numbers` field, paces provider calls with a token bucket and
+  retries failed calls with full-jitter exponential backoff.
+
+The outbox lives in process memory: messages still queued when the process
+exits are flushed for a few seconds at shutdown and otherwise lost.
+"""
+import atexit
+import heapq
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+
+import requests
+
+from utils.http_client import http, CircuitOpenError, RETRY_STATUSES, BREAKER_COOLDOWN
+from utils.metrics import metrics
+
+# Override to point at a local fake provider for offline runs (sms_stub.py, benchmarks/bench_api.py)
+FAST2SMS_URL = os.getenv("FAST2SMS_URL", "https://www.fast2sms.com/dev/bulkV2")
+
+QUEUE_SIZE = int(os.getenv('SMS_QUEUE_SIZE', 10000))
+# Numbers per provider call, and how long to wait for more recipients of the same message
+BATCH_SIZE = int(os.getenv('SMS_BATCH_SIZE', 100))
+BATCH_WINDOW = float(os.getenv('SMS_BATCH_WINDOW', 0.5))
+# Provider calls per second and burst, per process
+RATE = float(os.getenv('SMS_RATE', 5))
+BURST = int(os.getenv('SMS_BURST', 10))
+MAX_ATTEMPTS = int(os.getenv('SMS_MAX_ATTEMPTS', 5))
+BACKOFF_BASE = float(os.getenv('SMS_BACKOFF_BASE', 1))
+BACKOFF_MAX = float(os.getenv('SMS_BACKOFF_MAX', 60))
+# Delivery statuses kept for /api/sms/status/<id>
+RETENTION = int(os.getenv('SMS_STATUS_RETENTION', 10000))
+
+
+class SmsSendError(Exception):
+    """
+    A provider call that did not deliver. `retryable` is False for requests
+    the provider rejected (bad number, bad key), which fail the same way
+    when re-sent.
+    """
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class Fast2SmsProvider:
+    name = 'fast2sms'
+
+    def __init__(self, api_key, url=FAST2SMS_URL):
+        self.api_key = api_key
+        self.url = url
+
+    def send(self, numbers, message):
+        """
+        One bulk call for all `numbers`. Returns the provider's response body.
+        """
+        payload = {
+            "message": message,
+            "language": "english",
+            "route": "q",
+            "numbers": ",".join(numbers),
+        }
+        headers = {
+            "authorization": self.api_key,
+            "Content-Type": "application/json"
+        }
+        try:
+            response = http.post(self.url, json=payload, headers=headers, timeout=10)
+        except CircuitOpenError as e:
+            # Retrying sooner only short-circuits again
+            raise SmsSendError(str(e), retry_after=BREAKER_COOLDOWN)
+        except requests.RequestException as e:
+            raise SmsSendError(str(e))
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {'message': response.text[:200]}
+        if response.status_code in RETRY_STATUSES:
+            retry_after = response.headers.get('Retry-After')
+            raise SmsSendError(f"Fast2SMS returned {response.status_code}: {body.get('message')}",
+                               retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if response.status_code >= 400 or body.get('return') is False:
+            raise SmsSendError(f"Fast2SMS rejected the request: {body.get('message')}", retryable=False)
+        return body
+
+
+class FakeSmsProvider:
+    """
+    Records messages instead of sending them. `fail_rate` makes that share
+    of calls fail (retryably) to exercise the outbox's backoff.
+    """
+    name = 'fake'
+
+    def __init__(self, fail_rate=0.0, seed=None):
+        self.fail_rate = fail_rate
+        self.sent = deque(maxlen=1000)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def send(self, numbers, message):
+        with self._lock:
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                raise SmsSendError("Fake provider failure")
+            request_id = f"fake-{next(self._ids)}"
+            self.sent.append({'request_id': request_id, 'numbers': list(numbers), 'message': message})
+        return {'return': True, 'request_id': request_id,
+                'message': [f"SMS sent successfully to {len(numbers)} numbers"]}
+
+
+def get_sms_provider():
+    """
+    Returns the provider selected by SMS_PROVIDER, or None when Fast2SMS is
+    selected without an API key.
+    """
+    name = os.getenv("SMS_PROVIDER", "fast2sms").strip().lower()
+    if name == 'fake':
+        return FakeSmsProvider(fail_rate=float(os.getenv("SMS_FAKE_FAIL_RATE", "0")))
+    api_key = os.getenv("FAST2SMS_API_KEY")
+    if not api_key:
+        return None
+    return Fast2SmsProvider(api_key)
+
+
+def normalize_numbers(numbers):
+    """
+    A list of unique numbers from a comma separated string or a list.
+    """
+    if isinstance(numbers, str):
+        numbers = numbers.split(',')
+    result = []
+    for number in numbers or []:
+        number = str(number).replace(' ', '').strip()
+        if number and number not in result:
+            result.append(number)
+    return result
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, holding at most `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available. Returns the seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class _Batch:
+    """
+    One provider call: a message and up to batch_size numbers, each mapped
+    to the outbox ids that asked for it.
+    """
+
+    def __init__(self, message, owners):
+        self.message = message
+        self.owners = owners  # number -> [outbox ids]
+        self.attempts = 0
+
+
+class SmsOutbox:
+    """
+    Queues SMS and delivers them from one background thread.
+    enqueue() never blocks: it returns an id, or None when the queue is full.
+    The dispatcher collects whatever arrives within `batch_window`, merges
+    the recipients of identical messages (a number asked for twice gets one
+    SMS) and sends them `batch_size` numbers per provider call, no faster
+    than the token bucket allows. Retryable failures are re-sent after
+    full-jitter exponential backoff (or the provider's Retry-After) up to
+    `max_attempts`; then, or on a rejected request, the numbers are failed.
+    """
+
+    def __init__(self, provider, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, batch_window=BATCH_WINDOW,
+                 rate=RATE, burst=BURST, max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, retention=RETENTION):
+        self.provider = provider
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retention = retention
+        self._reset()
+        # The dispatcher thread does not survive fork (gunicorn preload); children start their own
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._bucket = TokenBucket(self.rate, self.burst)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._retries = []  # heap of (due, seq, batch)
+        self._retrying = 0  # popped from the heap, being re-sent
+        self._seq = itertools.count()
+        self._messages = OrderedDict()  # id -> delivery status
+        self._latencies = deque(maxlen=256)
+        self._counters = dict.fromkeys(
+            ('enqueued', 'rejected', 'provider_calls', 'numbers_sent', 'numbers_failed', 'deduplicated',
+             'retries', 'call_errors'), 0
+        )
+        self._throttled_s = 0.0
+        self._last_error = None
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _ensure_thread(self):
+        if self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True, name="sms-outbox")
+            self._thread.start()
+
+    def enqueue(self, numbers, message):
+        """
+        Queues `message` for every number (a list or a comma separated
+        string). Returns the outbox id, or None when the queue is full.
+        """
+        numbers = normalize_numbers(numbers)
+        if not numbers:
+            raise ValueError("No phone numbers given")
+        outbox_id = uuid.uuid4().hex
+        record = {
+            'id': outbox_id,
+            'status': 'queued',
+            'numbers': len(numbers),
+            'pending': len(numbers),
+            'sent': 0,
+            'failed': 0,
+            'attempts': 0,
+            'request_ids': [],
+            'error': None,
+            'queued_at': datetime.now().isoformat(timespec='seconds'),
+            'completed_at': None,
+        }
+        self._ensure_thread()
+        with self._lock:
+            self._messages[outbox_id] = record
+            while len(self._messages) > self.retention:
+                self._messages.popitem(last=False)
+        try:
+            self._queue.put_nowait((outbox_id, numbers, message))
+        except queue.Full:
+            with self._lock:
+                self._messages.pop(outbox_id, None)
+                self._counters['rejected'] += 1
+            return None
+        self._count('enqueued')
+        return outbox_id
+
+    def status(self, outbox_id):
+        with self._lock:
+            record = self._messages.get(outbox_id)
+            return dict(record, request_ids=list(record['request_ids'])) if record else None
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            if items:
+                self._dispatch(items)
+                for _ in items:
+                    self._queue.task_done()
+            self._run_due_retries()
+
+    def _next_retry_in(self):
+        with self._lock:
+            if not self._retries:
+                return None
+            return max(0.0, self._retries[0][0] - time.monotonic())
+
+    def _collect(self):
+        """
+        Everything that arrives within batch_window of the first item, or
+        nothing once a retry falls due.
+        """
+        wait = self._next_retry_in()
+        try:
+            items = [self._queue.get(timeout=self.batch_window if wait is None else max(wait, 0.01))]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _dispatch(self, items):
+        by_message = OrderedDict()
+        for outbox_id, numbers, message in items:
+            owners = by_message.setdefault(message, OrderedDict())
+            for number in numbers:
+                if number in owners:
+                    self._count('deduplicated')
+                owners.setdefault(number, []).append(outbox_id)
+
+        for message, owners in by_message.items():
+            numbers = list(owners)
+            for i in range(0, len(numbers), self.batch_size):
+                chunk = numbers[i:i + self.batch_size]
+                self._deliver(_Batch(message, OrderedDict((n, owners[n]) for n in chunk)))
+
+    def _deliver(self, batch):
+        waited = self._bucket.acquire()
+        batch.attempts += 1
+        start = time.perf_counter()
+        try:
+            response = self.provider.send(list(batch.owners), batch.message)
+        except SmsSendError as e:
+            with self._lock:
+                self._counters['call_errors'] += 1
+                self._throttled_s += waited
+            self._last_error = str(e)
+            if e.retryable and batch.attempts < self.max_attempts:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (batch.attempts - 1))))
+                if e.retry_after:
+                    delay = max(delay, min(self.backoff_max, e.retry_after))
+                with self._lock:
+                    heapq.heappush(self._retries, (time.monotonic() + delay, next(self._seq), batch))
+                    self._counters['retries'] += 1
+                self._settle(batch, None, str(e), final=False)
+                return
+            print(f"Error sending SMS to {len(batch.owners)} numbers: {e}")
+            self._settle(batch, False, str(e))
+            return
+        except Exception as e:
+            print(f"Error sending SMS to {len(batch.owners)} numbers: {e}")
+            self._last_error = str(e)
+            self._count('call_errors')
+            self._settle(batch, False, str(e))
+            return
+
+        with self._lock:
+            self._latencies.append((time.perf_counter() - start) * 1000)
+            self._counters['provider_calls'] += 1
+            self._throttled_s += waited
+        self._settle(batch, True, (response or {}).get('request_id'))
+
+    def _settle(self, batch, ok, detail, final=True):
+        """
+        Updates the status of every outbox id in `batch`. ok=None records an
+        attempt that will be retried.
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            if final:
+                self._counters['numbers_sent' if ok else 'numbers_failed'] += len(batch.owners)
+            touched = {}
+            for ids in batch.owners.values():
+                for outbox_id in ids:
+                    record = self._messages.get(outbox_id)
+                    if record is None:
+                        continue
+                    touched[outbox_id] = record
+                    if final:
+                        record['pending'] -= 1
+                        record['sent' if ok else 'failed'] += 1
+            for record in touched.values():
+                record['attempts'] = max(record['attempts'], batch.attempts)
+                if ok:
+                    if detail and detail not in record['request_ids']:
+                        record['request_ids'].append(detail)
+                else:
+                    record['error'] = detail
+                if record['pending'] == 0:
+                    record['status'] = 'sent' if not record['failed'] else ('failed' if not record['sent'] else 'partial')
+                    record['completed_at'] = now
+                else:
+                    record['status'] = 'retrying' if ok is None else 'sending'
+
+    def _run_due_retries(self):
+        while True:
+            with self._lock:
+                if not self._retries or self._retries[0][0] > time.monotonic():
+                    return
+                _, _, batch = heapq.heappop(self._retries)
+                self._retrying += 1
+            try:
+                self._deliver(batch)
+            finally:
+                with self._lock:
+                    self._retrying -= 1
+
+    def flush(self, timeout=10.0):
+        """
+        Waits until everything queued so far has been delivered or failed,
+        including pending retries. Returns False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks or self._retries or self._retrying:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+            retry_pending = len(self._retries)
+            throttled = self._throttled_s
+        calls = counters['provider_calls']
+        return {
+            **counters,
+            'provider': self.provider.name if self.provider else None,
+            'queue_depth': self._queue.qsize(),
+            'queue_size': self.queue_size,
+            'retry_pending': retry_pending,
+            'numbers_per_call': round(counters['numbers_sent'] / calls, 2) if calls else None,
+            'rate_limit_wait_s': round(throttled, 3),
+            'call_ms_avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'call_ms_p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+            'last_error': self._last_error,
+        }
+
+
+# Create a global instance
+outbox = SmsOutbox(get_sms_provider())
+metrics.expose_stats('sms_outbox', outbox.stats, "SMS outbox")
+
+# Deliver whatever is still queued on a clean shutdown
+atexit.register(outbox.flush, 5.0)
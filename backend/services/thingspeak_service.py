@@ -1,9 +1,10 @@
-import requests
-from config.supabase_client import supabase
+from utils.http_client import http
+from storage import store
 import os
 
 THING_SPEAK_CHANNEL_ID = os.getenv("THINGSPEAK_CHANNEL_ID")
 THING_SPEAK_READ_KEY = os.getenv("THINGSPEAK_READ_KEY")
+THING_SPEAK_BASE_URL = os.getenv("THINGSPEAK_BASE_URL", "https://api.thingspeak.com").rstrip("/")
 
 
 def fetch_latest_thingspeak_data():
@@ -12,13 +13,13 @@ def fetch_latest_thingspeak_data():
         return None
 
     url = (
-        f"https://api.thingspeak.com/channels/"
+        f"{THING_SPEAK_BASE_URL}/channels/"
         f"{THING_SPEAK_CHANNEL_ID}/feeds.json"
         f"?api_key={THING_SPEAK_READ_KEY}&results=1"
     )
 
     try:
-        response = requests.get(url, timeout=10)
+        response = http.get(url, timeout=10)
         response.raise_for_status()
 
         data = response.json()
@@ -34,7 +35,8 @@ def fetch_latest_thingspeak_data():
 
 
 def store_in_supabase(feed):
-    if not supabase:
+    # Name kept for the ingestion worker; writes go to the configured storage backend
+    if not store:
         return
 
     payload = {
@@ -55,27 +57,17 @@ def store_in_supabase(feed):
     }
 
     try:
-        supabase.table("sensor_readings").insert(payload).execute()
+        store.insert_reading(payload)
     except Exception as e:
-        print(f"Error inserting to Supabase: {e}")
+        print(f"Error inserting reading: {e}")
 
 
 def get_last_supabase_timestamp():
-    if not supabase:
+    if not store:
         return None
 
     try:
-        res = (
-            supabase
-            .table("sensor_readings")
-            .select("created_at")
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-
-        if res.data:
-            return res.data[0]["created_at"]
+        return store.last_reading_timestamp()
     except Exception as e:
         print(f"Error fetching last timestamp: {e}")
 
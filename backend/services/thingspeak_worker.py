@@ -51,3 +51,8 @@ def run_thingspeak_ingestion():
 
         # 6️⃣ Poll every 60 seconds
         time.sleep(60)
+
+
+if __name__ == "__main__":
+    # Dedicated ingestion process: python -m services.thingspeak_worker (from backend/)
+    run_thingspeak_ingestion()
@@ -0,0 +1,258 @@
+"""
+Weather sources behind WeatherService.
+
+- OpenWeatherProvider: live OpenWeatherMap (needs OPENWEATHER_API_KEY).
+- MockWeatherProvider: deterministic synthetic weather per location and date.
+- ReplayWeatherProvider: recorded weather per city and date from a local
+  JSON or CSV file, for repeatable offline benchmarks.
+
+WEATHER_PROVIDER=openweather|mock|replay selects one; the default is
+openweather when an API key is set and mock otherwise.
+"""
+import csv
+import json
+import os
+import random
+from datetime import date as date_cls, datetime, timezone
+
+from utils.http_client import http
+
+DEFAULT_REPLAY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'weather_replay.json')
+
+
+def normalize_city(city):
+    return " ".join((city or "Hyderabad").lower().split())
+
+
+def _describe(location):
+    if 'q' in location:
+        return normalize_city(location['q'])
+    return f"{location['lat']:.2f},{location['lon']:.2f}"
+
+
+def _day(day=None):
+    if day is None:
+        pinned = os.getenv("WEATHER_REPLAY_DATE")
+        return date_cls.fromisoformat(pinned) if pinned else date_cls.today()
+    if isinstance(day, str):
+        return date_cls.fromisoformat(day)
+    return day
+
+
+class WeatherProvider:
+    """
+    `location` is {'q': city} or {'lat': .., 'lon': ..}.
+    Methods return None when the provider has no answer.
+    """
+    # Remote providers are cached and prefetched by WeatherService
+    remote = False
+
+    def current(self, location):
+        """
+        {'temperature', 'humidity', 'rainfall'} with rainfall as a daily total in mm.
+        """
+        raise NotImplementedError
+
+    def forecast(self, location):
+        """
+        [{'date', 'temperature', 'humidity', 'rainfall'}] per day.
+        """
+        raise NotImplementedError
+
+
+class OpenWeatherProvider(WeatherProvider):
+    remote = True
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.forecast_url = "http://api.openweathermap.org/data/2.5/forecast"
+
+    def current(self, location):
+        try:
+            params = dict(location, appid=self.api_key, units='metric')
+            response = http.get(self.base_url, params=params, timeout=5)
+
+            if response.status_code == 200:
+                data = response.json()
+                # OpenWeatherMap returns rain in 'rain.1h' or 'rain.3h' mm
+                rainfall = 0
+                if 'rain' in data:
+                    rainfall = data['rain'].get('1h', 0)
+
+                return {
+                    'temperature': data['main']['temp'],
+                    'humidity': data['main']['humidity'],
+                    'rainfall': rainfall * 24 # Crude estimate for daily total if raining
+                }
+            else:
+                return None
+        except Exception as e:
+            print(f"Weather API Error: {e}")
+            return None
+
+    def forecast(self, location):
+        try:
+            params = dict(location, appid=self.api_key, units='metric')
+            response = http.get(self.forecast_url, params=params, timeout=5)
+            if response.status_code != 200:
+                return None
+
+            # 3-hourly entries rolled up per (UTC) day
+            days = {}
+            for entry in response.json().get('list', []):
+                date = datetime.fromtimestamp(entry['dt'], timezone.utc).strftime('%Y-%m-%d')
+                day = days.setdefault(date, {'temps': [], 'humidity': [], 'rainfall': 0.0})
+                day['temps'].append(entry['main']['temp'])
+                day['humidity'].append(entry['main']['humidity'])
+                day['rainfall'] += entry.get('rain', {}).get('3h', 0)
+
+            return [
+                {
+                    'date': date,
+                    'temperature': round(sum(d['temps']) / len(d['temps']), 1),
+                    'humidity': round(sum(d['humidity']) / len(d['humidity']), 1),
+                    'rainfall': round(d['rainfall'], 1)
+                }
+                for date, d in sorted(days.items())
+            ]
+        except Exception as e:
+            print(f"Weather Forecast API Error: {e}")
+            return None
+
+
+class MockWeatherProvider(WeatherProvider):
+    """
+    Realistic but deterministic weather: the same location and date always
+    give the same values.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+
+    def weather_for(self, label, day):
+        rng = random.Random(f"{self.seed}:{label}:{day.isoformat()}")
+        return {
+            'temperature': round(rng.uniform(25.0, 35.0), 1),
+            'humidity': round(rng.uniform(40.0, 80.0), 1),
+            'rainfall': round(rng.choice([0, 0, 0, 10, 50]), 1) # Mostly dry, sometimes rain
+        }
+
+    def current(self, location):
+        return self.weather_for(_describe(location), _day())
+
+    def forecast(self, location, days=5):
+        start = _day().toordinal()
+        label = _describe(location)
+        return [
+            dict(self.weather_for(label, date_cls.fromordinal(start + i)), date=date_cls.fromordinal(start + i).isoformat())
+            for i in range(days)
+        ]
+
+
+class ReplayWeatherProvider(WeatherProvider):
+    """
+    Serves recorded weather from a JSON list or CSV file with the columns
+    city, date (YYYY-MM-DD), temperature, humidity, rainfall.
+
+    The day served is today, or WEATHER_REPLAY_DATE when set. Dates missing
+    from the recording map onto the recorded days for that city by day number,
+    so a short recording can be replayed indefinitely. Unknown cities and
+    coordinate lookups return None.
+    """
+
+    def __init__(self, path=DEFAULT_REPLAY_FILE):
+        self.path = path
+        self.records = {}
+        for row in self._read(path):
+            self.records.setdefault(normalize_city(row['city']), {})[row['date']] = {
+                'temperature': float(row['temperature']),
+                'humidity': float(row['humidity']),
+                'rainfall': float(row.get('rainfall') or 0)
+            }
+        self._dates = {city: sorted(days) for city, days in self.records.items()}
+
+    @staticmethod
+    def _read(path):
+        with open(path, newline='', encoding='utf-8') as f:
+            if path.endswith('.csv'):
+                return list(csv.DictReader(f))
+            return json.load(f)
+
+    def weather_for(self, city, day):
+        days = self.records.get(normalize_city(city))
+        if not days:
+            return None
+        key = day.isoformat()
+        if key not in days:
+            dates = self._dates[normalize_city(city)]
+            key = dates[day.toordinal() % len(dates)]
+        return dict(days[key])
+
+    def current(self, location):
+        if 'q' not in location:
+            return None
+        return self.weather_for(location['q'], _day())
+
+    def forecast(self, location, days=5):
+        if 'q' not in location:
+            return None
+        start = _day().toordinal()
+        result = []
+        for i in range(days):
+            day = date_cls.fromordinal(start + i)
+            weather = self.weather_for(location['q'], day)
+            if weather is None:
+                return None
+            result.append(dict(weather, date=day.isoformat()))
+        return result
+
+
+def get_weather_provider():
+    """
+    Returns the provider selected by WEATHER_PROVIDER.
+    """
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    name = os.getenv("WEATHER_PROVIDER", "openweather" if api_key else "mock").strip().lower()
+
+    if name == 'replay':
+        return ReplayWeatherProvider(os.getenv("WEATHER_REPLAY_FILE", DEFAULT_REPLAY_FILE))
+    if name == 'openweather' and api_key:
+        return OpenWeatherProvider(api_key)
+    if name == 'openweather':
+        print("Weather API Key not found. Using Mock.")
+    return MockWeatherProvider(seed=int(os.getenv("WEATHER_MOCK_SEED", "0")))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record weather into a replay file (WEATHER_PROVIDER selects the source).")
+    parser.add_argument('--cities', default="Hyderabad", help="Comma-separated city names")
+    parser.add_argument('--out', default=os.getenv("WEATHER_REPLAY_FILE", DEFAULT_REPLAY_FILE))
+    parser.add_argument('--days', type=int, default=1, help="Days from today; only the mock provider can produce more than one")
+    args = parser.parse_args()
+
+    provider = get_weather_provider()
+    if args.days > 1 and not isinstance(provider, MockWeatherProvider):
+        raise SystemExit("Live providers only report today's weather; record once per day instead")
+
+    records = ReplayWeatherProvider._read(args.out) if os.path.exists(args.out) else []
+    seen = {(normalize_city(r['city']), r['date']) for r in records}
+    today = _day()
+    for city in [c.strip() for c in args.cities.split(',') if c.strip()]:
+        for i in range(args.days):
+            day = date_cls.fromordinal(today.toordinal() + i)
+            if (normalize_city(city), day.isoformat()) in seen:
+                continue
+            if isinstance(provider, MockWeatherProvider):
+                weather = provider.weather_for(normalize_city(city), day)
+            else:
+                weather = provider.current({'q': city})
+            if weather:
+                records.append(dict(weather, city=city, date=day.isoformat()))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=1)
+    print(f"{len(records)} records in {args.out}")
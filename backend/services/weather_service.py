@@ -1,53 +1,134 @@
-import requests
+from utils.cache import TTLCache
+from utils.metrics import metrics
+from services.weather_providers import get_weather_provider, normalize_city, MockWeatherProvider
+from collections import Counter
 import os
-import random
+import threading
+import time
+
+# Locations are cached per normalized city name, or per lat/lon grid cell of this size (degrees)
+GRID_DEGREES = float(os.getenv("WEATHER_GRID_DEGREES", "0.1"))
+
+CURRENT_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+FORECAST_TTL = float(os.getenv("WEATHER_FORECAST_TTL", "10800"))
+
+# Background refresh of the most requested locations. Every gunicorn worker
+# prefetches into its own cache, so by default the budget of 10 locations is
+# split across WEB_CONCURRENCY workers (at least 3 each)
+PREFETCH_TOP = int(os.getenv("WEATHER_PREFETCH_TOP", str(max(3, 10 // max(1, int(os.getenv("WEB_CONCURRENCY", "1")))))))
+PREFETCH_INTERVAL = float(os.getenv("WEATHER_PREFETCH_INTERVAL", str(CURRENT_TTL * 0.8)))
+PREFETCH_LOCATIONS = [c for c in os.getenv("WEATHER_PREFETCH_LOCATIONS", "Hyderabad").split(",") if c.strip()]
+MAX_TRACKED_LOCATIONS = 2000
+
+
+def location_key(city=None, lat=None, lon=None):
+    """
+    Cache key for a location: a grid cell when coordinates are given,
+    otherwise the city name lower-cased with whitespace collapsed.
+    """
+    if lat is not None and lon is not None:
+        lat = round(round(float(lat) / GRID_DEGREES) * GRID_DEGREES, 4)
+        lon = round(round(float(lon) / GRID_DEGREES) * GRID_DEGREES, 4)
+        return f"grid:{lat},{lon}"
+    return "city:" + normalize_city(city)
+
 
 class WeatherService:
-    def __init__(self):
-        self.api_key = os.getenv("OPENWEATHER_API_KEY")
-        self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+    def __init__(self, provider=None):
+        self.provider = provider or get_weather_provider()
+        # Used when the provider has no answer; deterministic so outputs are reproducible
+        self.fallback = MockWeatherProvider()
+
+        self.current_cache = TTLCache(ttl=CURRENT_TTL, stale_ttl=CURRENT_TTL * 3, name="weather_current", max_entries=1000)
+        self.forecast_cache = TTLCache(ttl=FORECAST_TTL, stale_ttl=FORECAST_TTL, name="weather_forecast", max_entries=1000)
+
+        # key -> request params, and how often each key was asked for
+        self._locations = {}
+        self._popularity = Counter()
+        self._lock = threading.Lock()
+        self._prefetcher = None
+        self._forecast_prefetched = {}
 
-    def get_current_weather(self, city="Hyderabad"):
+    def get_current_weather(self, city="Hyderabad", lat=None, lon=None):
         """
         Fetches current weather for the location.
         Returns dict with temp, humidity, rainfall (estimated).
+        Remote providers are served from the location cache; popular locations
+        are kept warm in the background.
         """
-        if not self.api_key:
-            # print("Weather API Key not found. Using Mock.")
-            return self._mock_weather()
-            
-        try:
-            params = {
-                'q': city, 
-                'appid': self.api_key, 
-                'units': 'metric'
-            }
-            response = requests.get(self.base_url, params=params, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # OpenWeatherMap returns rain in 'rain.1h' or 'rain.3h' mm
-                rainfall = 0
-                if 'rain' in data:
-                    rainfall = data['rain'].get('1h', 0)
-                
-                return {
-                    'temperature': data['main']['temp'],
-                    'humidity': data['main']['humidity'],
-                    'rainfall': rainfall * 24 # Crude estimate for daily total if raining
-                }
-            else:
-                return self._mock_weather()
-        except Exception as e:
-            print(f"Weather API Error: {e}")
-            return self._mock_weather()
-
-    def _mock_weather(self):
+        key, params = self._track(city, lat, lon)
+        if self.provider.remote:
+            self._ensure_prefetcher()
+            weather = self.current_cache.get_or_load(key, lambda: self.provider.current(params))
+        else:
+            weather = self.provider.current(params)
+        if weather:
+            return dict(weather)
+        metrics.fallback('weather', 'provider_error')
+        return self.fallback.current(params)
+
+    def get_daily_forecast(self, city="Hyderabad", lat=None, lon=None):
         """
-        Returns random realistic weather data.
+        Daily forecast for the next days: [{date, temperature, humidity, rainfall}].
+        Rainfall is the forecast daily total in mm. Returns [] when unavailable.
         """
-        return { 
-            'temperature': round(random.uniform(25.0, 35.0), 1),
-            'humidity': round(random.uniform(40.0, 80.0), 1),
-            'rainfall': round(random.choice([0, 0, 0, 10, 50]), 1) # Mostly dry, sometimes rain
+        key, params = self._track(city, lat, lon)
+        if self.provider.remote:
+            self._ensure_prefetcher()
+            forecast = self.forecast_cache.get_or_load(key, lambda: self.provider.forecast(params))
+        else:
+            forecast = self.provider.forecast(params)
+        return [dict(day) for day in forecast] if forecast else []
+
+    def _track(self, city, lat, lon):
+        try:
+            params = {'lat': float(lat), 'lon': float(lon)}
+        except (TypeError, ValueError):
+            lat = lon = None
+            params = {'q': city or "Hyderabad"}
+        key = location_key(city, lat, lon)
+
+        with self._lock:
+            self._locations.setdefault(key, params)
+            self._popularity[key] += 1
+            if len(self._popularity) > MAX_TRACKED_LOCATIONS:
+                # Forget the long tail so arbitrary user input cannot grow this without bound
+                keep = dict(self._popularity.most_common(MAX_TRACKED_LOCATIONS // 2))
+                self._popularity = Counter(keep)
+                self._locations = {k: self._locations[k] for k in keep}
+        return key, params
+
+    def _ensure_prefetcher(self):
+        if self._prefetcher or PREFETCH_INTERVAL <= 0:
+            return
+        with self._lock:
+            if self._prefetcher:
+                return
+            for city in PREFETCH_LOCATIONS:
+                key = location_key(city.strip())
+                self._locations.setdefault(key, {'q': city.strip()})
+                self._popularity[key] += 0
+            self._prefetcher = threading.Thread(target=self._prefetch_loop, daemon=True, name="weather-prefetch")
+            self._prefetcher.start()
+
+    def _prefetch_loop(self):
+        while True:
+            with self._lock:
+                top = [(key, self._locations[key]) for key, _ in self._popularity.most_common(PREFETCH_TOP)]
+            for key, params in top:
+                self.current_cache.refresh(key, lambda p=params: self.provider.current(p))
+                # Forecasts change slowly; refresh them at most once per FORECAST_TTL
+                if time.monotonic() - self._forecast_prefetched.get(key, float('-inf')) >= FORECAST_TTL * 0.8:
+                    if self.forecast_cache.refresh(key, lambda p=params: self.provider.forecast(p)):
+                        self._forecast_prefetched[key] = time.monotonic()
+            time.sleep(PREFETCH_INTERVAL)
+
+    def stats(self):
+        with self._lock:
+            popular = self._popularity.most_common(PREFETCH_TOP)
+        return {
+            'provider': type(self.provider).__name__,
+            'current': self.current_cache.stats(),
+            'forecast': self.forecast_cache.stats(),
+            'popular_locations': [{'location': key, 'requests': n} for key, n in popular]
         }
@@ -0,0 +1,107 @@
+"""
+Offline stand-in for the Fast2SMS bulk API (POST /dev/bulkV2).
+
+Accepts every well-formed request, so the SMS outbox, its batching and
+retries, and load tests can run without network access or credits:
+
+    python sms_stub.py --port 5007 --fail-rate 0.2
+    export FAST2SMS_URL=http://127.0.0.1:5007/dev/bulkV2 FAST2SMS_API_KEY=stub
+
+--fail-rate answers that share of calls with a 500 and --rate-limit caps
+calls per second with 429 + Retry-After, to exercise the outbox's backoff.
+GET /stub/stats returns how many provider calls and numbers were received,
+which is how batching is verified; GET /stub/sent lists the recent calls.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import deque
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+DELAY = 0.0
+FAIL_RATE = 0.0
+RATE_LIMIT = 0.0
+_stats = {'calls': 0, 'numbers': 0, 'failed': 0, 'rate_limited': 0}
+_sent = deque(maxlen=500)
+_window = deque()
+_lock = threading.Lock()
+
+
+def _rate_limited():
+    # Sliding one-second window
+    now = time.monotonic()
+    with _lock:
+        while _window and now - _window[0] >= 1.0:
+            _window.popleft()
+        if len(_window) >= RATE_LIMIT:
+            _stats['rate_limited'] += 1
+            return True
+        _window.append(now)
+    return False
+
+
+@app.route('/dev/bulkV2', methods=['POST'])
+def bulk():
+    if DELAY:
+        time.sleep(DELAY)
+    if not request.headers.get('authorization'):
+        return jsonify({'return': False, 'status_code': 412, 'message': 'Invalid Authentication'}), 401
+    data = request.get_json(silent=True) or {}
+    numbers = [n for n in str(data.get('numbers', '')).split(',') if n.strip()]
+    if not numbers or not data.get('message'):
+        return jsonify({'return': False, 'status_code': 400, 'message': 'Missing numbers or message'}), 400
+
+    if RATE_LIMIT and _rate_limited():
+        return jsonify({'return': False, 'status_code': 429, 'message': 'Too many requests'}), 429, {'Retry-After': '1'}
+    if FAIL_RATE and random.random() < FAIL_RATE:
+        with _lock:
+            _stats['failed'] += 1
+        return jsonify({'return': False, 'status_code': 500, 'message': 'Stub failure'}), 500
+
+    request_id = f"stub-{time.time_ns()}"
+    with _lock:
+        _stats['calls'] += 1
+        _stats['numbers'] += len(numbers)
+        _sent.append({'request_id': request_id, 'numbers': numbers, 'message': data['message']})
+    return jsonify({'return': True, 'request_id': request_id,
+                    'message': [f"SMS sent successfully to {len(numbers)} numbers"]})
+
+
+@app.route('/stub/stats')
+def stats():
+    with _lock:
+        return jsonify(dict(_stats))
+
+
+@app.route('/stub/sent')
+def sent():
+    with _lock:
+        return jsonify(list(_sent))
+
+
+@app.route('/stub/reset', methods=['POST'])
+def reset():
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+        _sent.clear()
+        _window.clear()
+    return jsonify(dict(_stats))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline Fast2SMS stub server.")
+    parser.add_argument('--port', type=int, default=5007)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds of simulated upstream latency")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of calls answered with a 500")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Calls per second before answering 429")
+    args = parser.parse_args()
+
+    DELAY = args.delay
+    FAIL_RATE = args.fail_rate
+    RATE_LIMIT = args.rate_limit
+    app.run(port=args.port, threaded=True)
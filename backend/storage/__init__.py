@@ -0,0 +1,35 @@
+import os
+from dotenv import load_dotenv
+
+from .base import StorageBackend, READING_FIELDS, RAW, HOURLY, DAILY
+
+# Load environment variables
+dotenv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
+load_dotenv(dotenv_path)
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'mitti_mitra.db')
+
+
+def get_storage():
+    """
+    Returns the configured storage backend.
+    STORAGE_BACKEND=supabase (default) uses the Supabase client and returns
+    None when it is not configured, so services keep their mock fallbacks.
+    STORAGE_BACKEND=sqlite uses an embedded database at SQLITE_PATH.
+    """
+    backend = os.getenv('STORAGE_BACKEND', 'supabase').strip().lower()
+
+    if backend == 'sqlite':
+        from .sqlite_store import SQLiteStorage
+        return SQLiteStorage(os.getenv('SQLITE_PATH', DEFAULT_SQLITE_PATH))
+
+    from config.supabase_client import supabase
+    if not supabase:
+        return None
+
+    from .supabase_store import SupabaseStorage
+    return SupabaseStorage(supabase)
+
+
+# Create a global instance
+store = get_storage()
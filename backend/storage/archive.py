@@ -0,0 +1,252 @@
+"""
+Columnar archive of sensor_readings.
+
+Readings are exported to Parquet, partitioned Hive-style by device and month:
+
+    <root>/device_id=MM-POLE-001/month=2026-01/part-<run>-0.parquet
+
+ReadingArchive reads the files through memory-mapped Arrow datasets. Device
+and month filters prune whole directories; time filters are pushed down to
+Parquet row-group statistics, so a year of readings for hundreds of devices
+can be scanned batch by batch without loading it into RAM.
+
+Requires pyarrow (optional dependency).
+"""
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:
+    pa = None
+
+from .base import READING_FIELDS
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'archive')
+
+# Rows per Parquet row group; smaller groups make time pushdown more selective
+ROW_GROUP_SIZE = 64 * 1024
+
+# Rows buffered in memory before a chunk is written during export
+FLUSH_ROWS = 500_000
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the Parquet archive: pip install pyarrow")
+
+
+def _schema():
+    fields = [
+        pa.field('device_id', pa.string()),
+        pa.field('month', pa.string()),
+        pa.field('created_at', pa.timestamp('us', tz='UTC')),
+    ]
+    fields += [pa.field(f, pa.float64()) for f in READING_FIELDS]
+    return pa.schema(fields)
+
+
+def _parse_ts(value):
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if ts.tzinfo is None:
+        ts = ts.astimezone()  # naive timestamps are written in server local time
+    return ts.astimezone(timezone.utc)
+
+
+def _to_float(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rows_to_table(rows):
+    columns = {name: [] for name in _schema().names}
+    for r in rows:
+        ts = _parse_ts(r['created_at'])
+        columns['device_id'].append(r.get('device_id') or 'unknown')
+        columns['month'].append(ts.strftime('%Y-%m'))
+        columns['created_at'].append(ts)
+        for f in READING_FIELDS:
+            value = r.get(f)
+            if value is None and f == 'soil_ph':
+                value = r.get('ph')
+            columns[f].append(_to_float(value))
+    return pa.table(columns, schema=_schema())
+
+
+def _write(table, root, replaced):
+    """
+    Writes one chunk. The first time a partition is touched in this export its
+    previous files are removed, so re-exporting a month replaces it.
+    """
+    pairs = pa.Table.from_arrays(
+        [table['device_id'], table['month']], names=['device_id', 'month']
+    ).group_by(['device_id', 'month']).aggregate([]).to_pylist()
+    for p in pairs:
+        key = (p['device_id'], p['month'])
+        if key not in replaced:
+            replaced.add(key)
+            shutil.rmtree(os.path.join(
+                root, f"device_id={quote(p['device_id'], safe='')}", f"month={quote(p['month'], safe='')}"
+            ), ignore_errors=True)
+
+    ds.write_dataset(
+        table.sort_by([('device_id', 'ascending'), ('created_at', 'ascending')]),
+        root,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('device_id', pa.string()), ('month', pa.string())]), flavor='hive'),
+        basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        min_rows_per_group=min(ROW_GROUP_SIZE, table.num_rows),
+        max_rows_per_group=ROW_GROUP_SIZE,
+    )
+
+
+def export_readings(store, root=DEFAULT_ARCHIVE_DIR, device_id=None, since=None, until=None,
+                    page_size=5000, flush_rows=FLUSH_ROWS):
+    """
+    Exports raw readings with since <= created_at < until into the archive.
+    Partitions touched by the export are replaced, so export whole months to
+    keep re-runs idempotent. Returns the number of rows written.
+    """
+    _require_pyarrow()
+
+    buffered, buffered_rows, total = [], 0, 0
+    replaced = set()
+    for page in store.iter_readings(device_id=device_id, since=since, until=until, page_size=page_size):
+        buffered.append(_rows_to_table(page))
+        buffered_rows += len(page)
+        if buffered_rows >= flush_rows:
+            _write(pa.concat_tables(buffered), root, replaced)
+            total += buffered_rows
+            buffered, buffered_rows = [], 0
+
+    if buffered:
+        _write(pa.concat_tables(buffered), root, replaced)
+        total += buffered_rows
+    return total
+
+
+class ReadingArchive:
+    """
+    Memory-mapped reader over the Parquet archive.
+    The file list is captured at construction; re-open after an export.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        _require_pyarrow()
+        self.root = root
+        self.dataset = ds.dataset(
+            root,
+            format='parquet',
+            partitioning='hive',
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+            schema=_schema(),
+        )
+
+    def _filter(self, device_ids=None, start=None, end=None):
+        expr = None
+
+        def add(e):
+            return e if expr is None else expr & e
+
+        if device_ids:
+            expr = add(ds.field('device_id').isin(list(device_ids)))
+        if start is not None:
+            start = _parse_ts(start)
+            # Partition pruning on month, then row-group pruning on created_at
+            expr = add(ds.field('month') >= start.strftime('%Y-%m'))
+            expr = add(ds.field('created_at') >= pa.scalar(start, pa.timestamp('us', tz='UTC')))
+        if end is not None:
+            end = _parse_ts(end)
+            expr = add(ds.field('month') <= end.strftime('%Y-%m'))
+            expr = add(ds.field('created_at') < pa.scalar(end, pa.timestamp('us', tz='UTC')))
+        return expr
+
+    def iter_batches(self, device_ids=None, start=None, end=None, columns=None, batch_size=ROW_GROUP_SIZE):
+        """
+        Streams RecordBatches matching the filters.
+        """
+        scanner = self.dataset.scanner(
+            columns=columns,
+            filter=self._filter(device_ids, start, end),
+            batch_size=batch_size,
+        )
+        yield from scanner.to_batches()
+
+    def read(self, device_ids=None, start=None, end=None, columns=None):
+        """
+        Materializes the matching rows as a pyarrow Table (use for bounded ranges).
+        """
+        return self.dataset.to_table(columns=columns, filter=self._filter(device_ids, start, end))
+
+    def aggregate(self, device_ids=None, start=None, end=None, fields=READING_FIELDS):
+        """
+        Streaming per-device count/mean/min/max for each field.
+        Returns {device_id: {'count': n, field: {'mean', 'min', 'max', 'count'}}}.
+        """
+        fields = list(fields)
+        partials = []
+        for batch in self.iter_batches(device_ids, start, end, columns=['device_id'] + fields):
+            if batch.num_rows == 0:
+                continue
+            specs = [('device_id', 'count')]
+            for f in fields:
+                specs += [(f, 'sum'), (f, 'count'), (f, 'min'), (f, 'max')]
+            partials.append(pa.Table.from_batches([batch]).group_by('device_id').aggregate(specs))
+
+        if not partials:
+            return {}
+
+        # Combine per-batch partial aggregates
+        combined = pa.concat_tables(partials)
+        specs = [('device_id_count', 'sum')]
+        for f in fields:
+            specs += [(f'{f}_sum', 'sum'), (f'{f}_count', 'sum'), (f'{f}_min', 'min'), (f'{f}_max', 'max')]
+        totals = combined.group_by('device_id').aggregate(specs).to_pylist()
+
+        result = {}
+        for row in totals:
+            entry = {'count': row['device_id_count_sum']}
+            for f in fields:
+                n = row[f'{f}_count_sum']
+                if not n:
+                    entry[f] = None
+                    continue
+                entry[f] = {
+                    'mean': row[f'{f}_sum_sum'] / n,
+                    'min': row[f'{f}_min_min'],
+                    'max': row[f'{f}_max_max'],
+                    'count': n
+                }
+            result[row['device_id']] = entry
+        return result
+
+
+if __name__ == '__main__':
+    import argparse
+    from storage import store
+
+    parser = argparse.ArgumentParser(description="Export sensor_readings to the Parquet archive.")
+    parser.add_argument('--root', default=os.getenv('ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR))
+    parser.add_argument('--device', help="Only export this device")
+    parser.add_argument('--since', help="ISO date/time (inclusive), ideally the first day of a month")
+    parser.add_argument('--until', help="ISO date/time (exclusive), ideally the first day of a month")
+    args = parser.parse_args()
+
+    if not store:
+        raise SystemExit("No storage backend configured (set SUPABASE_URL/KEY or STORAGE_BACKEND=sqlite)")
+
+    count = export_readings(store, args.root, device_id=args.device, since=args.since, until=args.until)
+    print(f"Exported {count} readings to {args.root}")
@@ -0,0 +1,139 @@
+import math
+
+# Reading columns every backend understands (see database/schema.sql)
+READING_FIELDS = [
+    'temperature', 'humidity', 'moisture', 'soil_ph',
+    'nitrogen', 'phosphorus', 'potassium', 'rainfall'
+]
+
+# Resolution tiers (see database/schema_rollups.sql)
+RAW = 'sensor_readings'
+HOURLY = 'sensor_readings_hourly'
+DAILY = 'sensor_readings_daily'
+
+
+class StorageBackend:
+    """
+    Interface for all persistence used by the backend.
+    Implementations: SupabaseStorage (production) and SQLiteStorage (offline/local).
+    Methods raise on failure; callers decide whether to fall back to mocks.
+    """
+
+    # --- Sensor readings ---
+
+    def insert_readings(self, records):
+        """
+        Batched insert into sensor_readings. Returns the inserted rows.
+        """
+        raise NotImplementedError
+
+    def insert_reading(self, record):
+        rows = self.insert_readings([record])
+        return rows[0] if rows else None
+
+    def latest_reading(self, device_id=None):
+        rows = self.recent_readings(device_id=device_id, limit=1)
+        return rows[0] if rows else None
+
+    def recent_readings(self, device_id=None, limit=30):
+        """
+        Last `limit` raw readings, newest first.
+        """
+        raise NotImplementedError
+
+    def readings_since(self, device_id, since):
+        """
+        Raw readings with created_at >= since (ISO string), newest first.
+        """
+        raise NotImplementedError
+
+    def window_readings(self, resolution, device_id=None, since=None):
+        """
+        Readings from a resolution tier (RAW, HOURLY, DAILY) since `since`, newest first.
+        Rollup rows use raw column names plus `sample_count`.
+        """
+        raise NotImplementedError
+
+    def iter_readings(self, device_id=None, since=None, until=None, page_size=1000):
+        """
+        Yields pages (lists) of raw readings in insertion order, since <= created_at < until.
+        Keyset-paged on id so arbitrarily large ranges can be exported.
+        """
+        raise NotImplementedError
+
+    def last_reading_timestamp(self):
+        row = self.latest_reading()
+        return row.get('created_at') if row else None
+
+    def aggregate_readings(self, device_id, limit=None, since=None):
+        """
+        Per-field mean/min/max/stddev over the last `limit` readings or all
+        readings since `since`. Returns {'count': n, 'latest': created_at,
+        field: {...}} or None.
+
+        This default pulls the rows and aggregates client-side; backends that
+        can aggregate in the database override it.
+        """
+        if since is not None:
+            rows = self.readings_since(device_id, since)
+        else:
+            rows = self.recent_readings(device_id=device_id, limit=limit or 30)
+        return summarize_rows(rows)
+
+    # --- Predictions ---
+
+    def insert_predictions(self, table, records):
+        """
+        Batched insert into a prediction table (crop_predictions, fertilizer_predictions).
+        """
+        raise NotImplementedError
+
+    def insert_prediction(self, table, record):
+        rows = self.insert_predictions(table, [record])
+        return rows[0] if rows else None
+
+    def select_predictions(self, table, columns='*', device_id=None, since=None, limit=None):
+        """
+        Rows from a prediction table, newest first.
+        """
+        raise NotImplementedError
+
+
+def summarize_rows(rows):
+    """
+    Client-side mean/min/max/stddev (sample) per reading field.
+    """
+    if not rows:
+        return None
+
+    timestamps = [r.get('created_at') for r in rows if r.get('created_at')]
+    summary = {'count': len(rows), 'latest': max(timestamps) if timestamps else None}
+    for field in READING_FIELDS:
+        values = []
+        for r in rows:
+            v = r.get(field)
+            if v is None and field == 'soil_ph':
+                v = r.get('ph')
+            if v is None:
+                continue
+            try:
+                values.append(float(v))
+            except (TypeError, ValueError):
+                continue
+
+        if not values:
+            summary[field] = None
+            continue
+
+        mean = sum(values) / len(values)
+        stddev = None
+        if len(values) > 1:
+            stddev = math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+        summary[field] = {
+            'mean': mean,
+            'min': min(values),
+            'max': max(values),
+            'stddev': stddev,
+            'count': len(values)
+        }
+    return summary
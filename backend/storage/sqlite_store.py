@@ -0,0 +1,332 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from .base import StorageBackend, READING_FIELDS, RAW, HOURLY, DAILY
+
+# Mirrors database/schema.sql and database/schema_update.sql
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensor_readings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    device_id TEXT NOT NULL DEFAULT 'pi_01',
+    temperature REAL,
+    humidity REAL,
+    rainfall REAL,
+    ph REAL,
+    soil_ph REAL,
+    moisture REAL,
+    nitrogen REAL,
+    phosphorus REAL,
+    potassium REAL,
+    latitude REAL,
+    longitude REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_device_created ON sensor_readings (device_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_created ON sensor_readings (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS crop_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    device_id TEXT DEFAULT 'web_client',
+    nitrogen REAL,
+    phosphorus REAL,
+    potassium REAL,
+    ph REAL,
+    temperature REAL,
+    humidity REAL,
+    rainfall REAL,
+    city TEXT,
+    predicted_crop TEXT,
+    confidence REAL,
+    translated_crop TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_crop_pred_created ON crop_predictions (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS fertilizer_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    nitrogen REAL,
+    phosphorus REAL,
+    potassium REAL,
+    temperature REAL,
+    humidity REAL,
+    moisture REAL,
+    soil_type TEXT,
+    crop_type TEXT,
+    recommended_fertilizer TEXT,
+    translated_fertilizer TEXT,
+    confidence REAL,
+    reasoning TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fert_pred_created ON fertilizer_predictions (created_at DESC);
+"""
+
+# Bucket expressions over ISO-8601 created_at strings
+BUCKETS = {
+    HOURLY: "substr(created_at, 1, 13) || ':00:00'",
+    DAILY: "substr(created_at, 1, 10) || 'T00:00:00'",
+}
+
+# Columns stored as JSON text because SQLite has no array type
+JSON_COLUMNS = {'reasoning'}
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Embedded storage for offline runs, load tests and benchmarks.
+    Rollup tiers and aggregates are computed with SQL, not in Python.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._connect()
+        self._conn.executescript(SCHEMA)
+        if path != ':memory:':
+            # A connection must not be shared across fork (prefork servers, wsgi.py);
+            # children open their own
+            os.register_at_fork(after_in_child=self._connect)
+        self._columns = {
+            table: [r['name'] for r in self._conn.execute(f'PRAGMA table_info({table})')]
+            for table in ('sensor_readings', 'crop_predictions', 'fertilizer_predictions')
+        }
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+
+    # --- helpers ---
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._decode(dict(r)) for r in rows]
+
+    def _decode(self, row):
+        for col in JSON_COLUMNS:
+            if isinstance(row.get(col), str):
+                try:
+                    row[col] = json.loads(row[col])
+                except ValueError:
+                    pass
+        return row
+
+    def _insert_many(self, table, records):
+        """
+        Inserts all records in one transaction. Unknown keys are ignored.
+        """
+        records = list(records)
+        if not records:
+            return []
+
+        known = self._columns[table]
+        now = datetime.now().isoformat()
+        inserted = []
+        with self._lock, self._conn:
+            for record in records:
+                row = {k: v for k, v in record.items() if k in known and k != 'id'}
+                row.setdefault('created_at', now)
+                for col in JSON_COLUMNS & row.keys():
+                    if not isinstance(row[col], str):
+                        row[col] = json.dumps(row[col])
+
+                cols = list(row.keys())
+                cur = self._conn.execute(
+                    f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+                    [row[c] for c in cols]
+                )
+                row['id'] = cur.lastrowid
+                inserted.append(self._decode(row))
+        return inserted
+
+    # --- sensor readings ---
+
+    def insert_readings(self, records):
+        return self._insert_many('sensor_readings', records)
+
+    def recent_readings(self, device_id=None, limit=30):
+        if device_id:
+            return self._query(
+                "SELECT * FROM sensor_readings WHERE device_id = ? ORDER BY created_at DESC LIMIT ?",
+                (device_id, limit)
+            )
+        return self._query("SELECT * FROM sensor_readings ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def readings_since(self, device_id, since):
+        if device_id:
+            return self._query(
+                "SELECT * FROM sensor_readings WHERE device_id = ? AND created_at >= ? ORDER BY created_at DESC",
+                (device_id, since)
+            )
+        return self._query(
+            "SELECT * FROM sensor_readings WHERE created_at >= ? ORDER BY created_at DESC", (since,)
+        )
+
+    def window_readings(self, resolution, device_id=None, since=None):
+        if resolution == RAW:
+            return self.readings_since(device_id, since or '')
+
+        bucket = BUCKETS[resolution]
+        averages = ', '.join(
+            f"AVG({'COALESCE(soil_ph, ph)' if f == 'soil_ph' else f}) AS {f}"
+            for f in READING_FIELDS if f != 'rainfall'
+        )
+        where, params = ['created_at >= ?'], [since or '']
+        if device_id:
+            where.append('device_id = ?')
+            params.append(device_id)
+
+        return self._query(
+            f"SELECT device_id, {bucket} AS created_at, COUNT(*) AS sample_count, {averages}, "
+            f"SUM(rainfall) AS rainfall "
+            f"FROM sensor_readings WHERE {' AND '.join(where)} "
+            f"GROUP BY device_id, {bucket} ORDER BY created_at DESC",
+            params
+        )
+
+    def aggregate_readings(self, device_id, limit=None, since=None):
+        """
+        Mean/min/max/stddev computed by SQLite over the selected window.
+        """
+        if since is not None:
+            source = "SELECT * FROM sensor_readings WHERE device_id = ? AND created_at >= ?"
+            params = [device_id, since]
+        else:
+            source = "SELECT * FROM sensor_readings WHERE device_id = ? ORDER BY created_at DESC LIMIT ?"
+            params = [device_id, limit or 30]
+
+        selects = ['COUNT(*) AS count', 'MAX(created_at) AS latest']
+        for f in READING_FIELDS:
+            col = 'COALESCE(soil_ph, ph)' if f == 'soil_ph' else f
+            selects += [
+                f"AVG({col}) AS {f}_mean", f"MIN({col}) AS {f}_min", f"MAX({col}) AS {f}_max",
+                f"AVG({col} * {col}) AS {f}_sq", f"COUNT({col}) AS {f}_n"
+            ]
+
+        rows = self._query(f"SELECT {', '.join(selects)} FROM ({source})", params)
+        row = rows[0] if rows else None
+        if not row or not row['count']:
+            return None
+
+        summary = {'count': row['count'], 'latest': row['latest']}
+        for f in READING_FIELDS:
+            n = row[f'{f}_n']
+            if not n:
+                summary[f] = None
+                continue
+            mean = row[f'{f}_mean']
+            stddev = None
+            if n > 1:
+                variance = max(row[f'{f}_sq'] - mean * mean, 0.0) * n / (n - 1)
+                stddev = variance ** 0.5
+            summary[f] = {'mean': mean, 'min': row[f'{f}_min'], 'max': row[f'{f}_max'], 'stddev': stddev, 'count': n}
+        return summary
+
+    def iter_readings(self, device_id=None, since=None, until=None, page_size=1000):
+        where, params = ['id > ?'], [0]
+        if device_id:
+            where.append('device_id = ?')
+            params.append(device_id)
+        if since:
+            where.append('created_at >= ?')
+            params.append(since)
+        if until:
+            where.append('created_at < ?')
+            params.append(until)
+        sql = f"SELECT * FROM sensor_readings WHERE {' AND '.join(where)} ORDER BY id LIMIT ?"
+
+        while True:
+            rows = self._query(sql, params + [page_size])
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            params[0] = rows[-1]['id']
+
+    def last_reading_timestamp(self):
+        rows = self._query("SELECT created_at FROM sensor_readings ORDER BY created_at DESC LIMIT 1")
+        return rows[0]['created_at'] if rows else None
+
+    # --- predictions ---
+
+    def insert_predictions(self, table, records):
+        return self._insert_many(table, records)
+
+    def select_predictions(self, table, columns='*', device_id=None, since=None, limit=None):
+        if table not in self._columns:
+            raise ValueError(f"Unknown table: {table}")
+        where, params = [], []
+        if device_id:
+            where.append('device_id = ?')
+            params.append(device_id)
+        if since:
+            where.append('created_at >= ?')
+            params.append(since)
+
+        sql = f"SELECT {columns} FROM {table}"
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY created_at DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self._query(sql, params)
+
+    # --- local data ---
+
+    def seed_readings(self, devices=10, days=30, interval_minutes=10, batch_size=5000):
+        """
+        Fills the database with synthetic readings for offline load tests.
+        Deterministic: the same arguments always produce the same data.
+        """
+        rng = random.Random(42)
+        now = datetime.now().replace(second=0, microsecond=0)
+        steps = int(days * 24 * 60 / interval_minutes)
+
+        batch, total = [], 0
+        for d in range(devices):
+            device_id = f"MM-POLE-{d + 1:03d}"
+            for s in range(steps):
+                batch.append({
+                    'device_id': device_id,
+                    'created_at': (now - timedelta(minutes=s * interval_minutes)).isoformat(),
+                    'temperature': round(rng.uniform(20, 35), 2),
+                    'humidity': round(rng.uniform(40, 80), 2),
+                    'moisture': round(rng.uniform(20, 70), 2),
+                    'soil_ph': round(rng.uniform(5.5, 7.5), 2),
+                    'nitrogen': round(rng.uniform(40, 140), 2),
+                    'phosphorus': round(rng.uniform(20, 80), 2),
+                    'potassium': round(rng.uniform(20, 170), 2),
+                    'rainfall': round(rng.choice([0, 0, 0, 0, rng.uniform(0, 20)]), 2)
+                })
+                if len(batch) >= batch_size:
+                    total += len(self.insert_readings(batch))
+                    batch = []
+        if batch:
+            total += len(self.insert_readings(batch))
+        return total
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Seed the local SQLite store with synthetic readings.")
+    parser.add_argument('--path', default=os.getenv('SQLITE_PATH', 'data/mitti_mitra.db'))
+    parser.add_argument('--devices', type=int, default=10)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--interval', type=int, default=10, help="Minutes between readings")
+    args = parser.parse_args()
+
+    store = SQLiteStorage(args.path)
+    count = store.seed_readings(devices=args.devices, days=args.days, interval_minutes=args.interval)
+    print(f"Inserted {count} readings into {args.path}")
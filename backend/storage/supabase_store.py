@@ -0,0 +1,132 @@
+from .base import StorageBackend, READING_FIELDS, RAW
+
+# Rollup columns aliased back to raw column names (PostgREST `alias:column` syntax)
+ROLLUP_SELECT = (
+    'device_id,created_at:bucket,sample_count,'
+    'temperature:avg_temperature,humidity:avg_humidity,moisture:avg_moisture,'
+    'soil_ph:avg_soil_ph,nitrogen:avg_nitrogen,phosphorus:avg_phosphorus,'
+    'potassium:avg_potassium,rainfall:total_rainfall'
+)
+
+
+class SupabaseStorage(StorageBackend):
+    """
+    Storage backed by the Supabase (PostgREST) client.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def insert_readings(self, records):
+        response = self.client.table('sensor_readings').insert(list(records)).execute()
+        return response.data or []
+
+    def recent_readings(self, device_id=None, limit=30):
+        query = self.client.table('sensor_readings').select('*')
+        if device_id:
+            query = query.eq('device_id', device_id)
+        response = query.order('created_at', desc=True).limit(limit).execute()
+        return response.data or []
+
+    def readings_since(self, device_id, since):
+        query = self.client.table('sensor_readings').select('*')
+        if device_id:
+            query = query.eq('device_id', device_id)
+        response = query.gte('created_at', since).order('created_at', desc=True).execute()
+        return response.data or []
+
+    def window_readings(self, resolution, device_id=None, since=None):
+        if resolution == RAW:
+            columns, time_col = '*', 'created_at'
+        else:
+            columns, time_col = ROLLUP_SELECT, 'bucket'
+
+        query = self.client.table(resolution).select(columns)
+        if device_id:
+            query = query.eq('device_id', device_id)
+        if since:
+            query = query.gte(time_col, since)
+        response = query.order(time_col, desc=True).execute()
+        return response.data or []
+
+    def iter_readings(self, device_id=None, since=None, until=None, page_size=1000):
+        last_id = None
+        while True:
+            query = self.client.table('sensor_readings').select('*')
+            if device_id:
+                query = query.eq('device_id', device_id)
+            if since:
+                query = query.gte('created_at', since)
+            if until:
+                query = query.lt('created_at', until)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.order('id').limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+
+    def last_reading_timestamp(self):
+        response = self.client.table('sensor_readings')\
+            .select('created_at')\
+            .order('created_at', desc=True)\
+            .limit(1)\
+            .execute()
+        if response.data:
+            return response.data[0]['created_at']
+        return None
+
+    def aggregate_readings(self, device_id, limit=None, since=None):
+        """
+        Window statistics computed by the sensor_window_stats() Postgres
+        function (database/schema_aggregates.sql). Falls back to pulling rows
+        if the function is not installed.
+        """
+        try:
+            params = {
+                'p_device_id': device_id,
+                'p_limit': None if since is not None else (limit or 30),
+                'p_since': since
+            }
+            rows = self.client.rpc('sensor_window_stats', params).execute().data or []
+        except Exception as e:
+            print(f"sensor_window_stats RPC unavailable, aggregating client-side: {e}")
+            return super().aggregate_readings(device_id, limit=limit, since=since)
+
+        if not rows:
+            return None
+
+        summary = {'count': rows[0]['total_count'], 'latest': rows[0]['latest_at']}
+        by_field = {r['field']: r for r in rows}
+        for f in READING_FIELDS:
+            r = by_field.get(f)
+            if not r or not r['sample_count']:
+                summary[f] = None
+                continue
+            summary[f] = {
+                'mean': float(r['mean']),
+                'min': float(r['min']),
+                'max': float(r['max']),
+                'stddev': float(r['stddev']) if r['stddev'] is not None else None,
+                'count': r['sample_count']
+            }
+        return summary
+
+    def insert_predictions(self, table, records):
+        response = self.client.table(table).insert(list(records)).execute()
+        return response.data or []
+
+    def select_predictions(self, table, columns='*', device_id=None, since=None, limit=None):
+        query = self.client.table(table).select(columns)
+        if device_id:
+            query = query.eq('device_id', device_id)
+        if since:
+            query = query.gte('created_at', since)
+        query = query.order('created_at', desc=True)
+        if limit:
+            query = query.limit(limit)
+        response = query.execute()
+        return response.data or []
@@ -0,0 +1,98 @@
+"""
+Offline stand-in for the ThingSpeak read API.
+
+Serves deterministic feeds for any channel so the aggregator, the ingestion
+worker and load tests can run without network access:
+
+    python thingspeak_stub.py --port 5006 --delay 0.5
+    export THINGSPEAK_BASE_URL=http://127.0.0.1:5006
+    export THINGSPEAK_CHANNEL_ID=1 THINGSPEAK_READ_KEY=stub
+
+GET /stub/stats returns how many upstream requests were served, which is how
+cache coalescing is verified.
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+DELAY = 0.0
+_requests = {'feeds': 0, 'last': 0}
+_lock = threading.Lock()
+
+
+def _feed(channel_id, entry_id, created_at):
+    rng = random.Random(f"{channel_id}-{entry_id}")
+    return {
+        'created_at': created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'entry_id': entry_id,
+        'field1': f"{rng.uniform(20, 35):.2f}",
+        'field2': f"{rng.uniform(40, 80):.2f}",
+        'field3': f"{rng.uniform(20, 70):.2f}",
+        'field4': f"{rng.uniform(5.5, 7.5):.2f}",
+        'field5': f"{rng.uniform(40, 140):.2f}",
+        'field6': f"{rng.uniform(20, 80):.2f}",
+        'field7': f"{rng.uniform(20, 170):.2f}",
+    }
+
+
+def _feeds(channel_id, results):
+    # One entry per minute, the newest stamped at the current minute
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    latest_id = int(now.timestamp() // 60)
+    return [
+        _feed(channel_id, latest_id - i, now - timedelta(minutes=i))
+        for i in reversed(range(results))
+    ]
+
+
+def _count(kind):
+    with _lock:
+        _requests[kind] += 1
+    if DELAY:
+        time.sleep(DELAY)
+
+
+@app.route('/channels/<channel_id>/feeds.json')
+def feeds(channel_id):
+    _count('feeds')
+    results = min(request.args.get('results', 100, type=int), 8000)
+    return jsonify({
+        'channel': {'id': channel_id, 'name': 'Mitti Mitra stub'},
+        'feeds': _feeds(channel_id, results)
+    })
+
+
+@app.route('/channels/<channel_id>/feeds/last.json')
+def last(channel_id):
+    _count('last')
+    return jsonify(_feeds(channel_id, 1)[0])
+
+
+@app.route('/stub/stats')
+def stats():
+    with _lock:
+        return jsonify(dict(_requests))
+
+
+@app.route('/stub/reset', methods=['POST'])
+def reset():
+    with _lock:
+        for k in _requests:
+            _requests[k] = 0
+    return jsonify(dict(_requests))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline ThingSpeak stub server.")
+    parser.add_argument('--port', type=int, default=5006)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds of simulated upstream latency")
+    args = parser.parse_args()
+
+    DELAY = args.delay
+    app.run(port=args.port, threaded=True)
@@ -0,0 +1,202 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at')
+
+    def __init__(self, value, loaded_at):
+        self.value = value
+        self.loaded_at = loaded_at
+
+
+class TTLCache:
+    """
+    In-process cache for slow upstream reads.
+
+    - Fresh entries (younger than `ttl`) are served directly.
+    - Expired entries younger than `ttl + stale_ttl` are served immediately
+      while one background thread refreshes them (stale-while-revalidate).
+    - On a miss, concurrent callers for the same key share a single load
+      (single-flight); only one request reaches the upstream.
+
+    Loads that return None or raise are not cached. With `max_entries` the
+    oldest entry is evicted when the cache is full.
+    """
+
+    def __init__(self, ttl=30, stale_ttl=300, name='cache', max_entries=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'refreshes': 0,
+            'evictions': 0,
+        }
+        self._load_seconds = 0.0
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for `key`, calling `loader()` when needed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                age = now - entry.loaded_at
+                if age < self.ttl:
+                    self._stats['hits'] += 1
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    self._stats['stale_hits'] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        self._stats['refreshes'] += 1
+                        threading.Thread(
+                            target=self._load, args=(key, loader), daemon=True,
+                            name=f"{self.name}-refresh"
+                        ).start()
+                    return entry.value
+
+            event = self._inflight.get(key)
+            if event:
+                self._stats['coalesced'] += 1
+                owner = False
+            else:
+                self._stats['misses'] += 1
+                event = self._inflight[key] = threading.Event()
+                owner = True
+
+        if owner:
+            return self._load(key, loader)
+
+        event.wait()
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry.value if entry else None
+
+    def refresh(self, key, loader):
+        """
+        Reloads `key` now (used by background prefetchers). Skipped if a load
+        for the key is already running. Returns True if a new value was stored.
+        """
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight[key] = threading.Event()
+            self._stats['refreshes'] += 1
+        return self._load(key, loader) is not None
+
+    def _load(self, key, loader):
+        start = time.monotonic()
+        value = None
+        try:
+            value = loader()
+        except Exception as e:
+            print(f"{self.name}: load failed for {key}: {e}")
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self._stats['loads'] += 1
+                self._load_seconds += elapsed
+                if value is None:
+                    self._stats['load_errors'] += 1
+                else:
+                    self._entries.pop(key, None)
+                    self._entries[key] = _Entry(value, time.monotonic())
+                    if self.max_entries and len(self._entries) > self.max_entries:
+                        # dicts keep insertion order, so the first key is the oldest load
+                        del self._entries[next(iter(self._entries))]
+                        self._stats['evictions'] += 1
+                event = self._inflight.pop(key, None)
+            if event:
+                event.set()
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['inflight'] = len(self._inflight)
+            load_avg = self._load_seconds / stats['loads'] if stats['loads'] else 0.0
+
+        served = stats['hits'] + stats['stale_hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / served, 4) if served else 0.0
+        stats['avg_load_ms'] = round(load_avg * 1000, 2)
+        stats['ttl'] = self.ttl
+        stats['stale_ttl'] = self.stale_ttl
+        return stats
+
+
+class LRUCache:
+    """
+    Bounded memo cache: least recently used entries are evicted first and
+    entries older than `ttl` seconds are treated as misses (ttl=None keeps
+    them until evicted). Cheap enough to sit in front of model inference.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None, name='lru'):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'clears': 0}
+
+    def get(self, key):
+        """
+        Cached value or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if self.ttl is not None and time.monotonic() - entry.loaded_at >= self.ttl:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry.value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats['clears'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        return stats
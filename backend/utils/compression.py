@@ -0,0 +1,94 @@
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 512))
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+
+
+def _accepted_encodings(header):
+    """
+    {encoding: q} from an Accept-Encoding header.
+    """
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    'br', 'gzip' or None for a request's Accept-Encoding. Brotli wins ties
+    when the brotli module is installed.
+    """
+    accepted = _accepted_encodings(header)
+    candidates = (['br'] if brotli else []) + ['gzip']
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def init_compression(app):
+    """
+    Compresses responses with gzip or brotli, negotiated per request from
+    Accept-Encoding. Small bodies, streamed responses, non-text types and
+    already-encoded responses are passed through.
+    Disable with COMPRESSION=off.
+    """
+    if os.getenv('COMPRESSION', 'on').lower() == 'off':
+        return app
+
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        response.vary.add('Accept-Encoding')
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < MIN_BYTES:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        if response.headers.get('ETag'):
+            # Weak ETag: the compressed body differs byte-wise from the identity one
+            response.headers['ETag'] = 'W/' + response.headers['ETag'].removeprefix('W/')
+        return response
+
+    return app
@@ -25,3 +25,30 @@ def validate_sensor_data(data):
         return False, "Humidity out of range (0-100)"
         
     return True, "Valid"
+
+def select_fields(payload, fields):
+    """
+    Projects a JSON-like payload onto a comma-separated list of dotted
+    paths, e.g. "status,recommendations.crop.crop,recommendations.yield".
+    Paths apply to every element of a list; unknown paths are ignored.
+    An empty `fields` returns the payload unchanged.
+    """
+    if not fields:
+        return payload
+
+    tree = {}
+    for path in fields.split(','):
+        node = tree
+        for part in filter(None, path.strip().split('.')):
+            node = node.setdefault(part, {})
+
+    def project(value, node):
+        if not node:
+            return value
+        if isinstance(value, dict):
+            return {k: project(value[k], sub) for k, sub in node.items() if k in value}
+        if isinstance(value, list):
+            return [project(v, node) for v in value]
+        return value
+
+    return project(payload, tree)
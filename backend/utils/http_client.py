@@ -0,0 +1,220 @@
+"""
+Shared outbound HTTP layer for third-party integrations
+(OpenWeatherMap, ThingSpeak, Fast2SMS).
+
+- One pooled requests.Session per host, so connections (and TLS sessions)
+  are reused. The pool blocks when full, which caps concurrency per host.
+- Default connect/read timeouts, overridable per call.
+- Retries with full-jitter exponential backoff for idempotent methods on
+  connection errors, timeouts, 429 and 5xx.
+- A per-host circuit breaker: after repeated failures calls fail fast
+  with CircuitOpenError until the cooldown passes and a trial call succeeds.
+- Per-host latency histograms and status counters via stats().
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import metrics, http_collector
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "4"))
+BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("HTTP_BREAKER_COOLDOWN", "30"))
+
+RETRY_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Latency histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised without a network call while a host's circuit breaker is open.
+    """
+
+
+class _HostState:
+    def __init__(self, host):
+        self.host = host
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.lock = threading.Lock()
+        # Circuit breaker
+        self.failures = 0
+        self.opened_at = None
+        self.trial_inflight = False
+        # Metrics
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum_ms = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.short_circuited = 0
+        self.statuses = {}
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < BREAKER_COOLDOWN or self.trial_inflight:
+                self.short_circuited += 1
+                return False
+            # Half-open: let one trial call through
+            self.trial_inflight = True
+            return True
+
+    def tripped(self):
+        with self.lock:
+            return self.opened_at is not None
+
+    def record(self, elapsed_ms, status=None, ok=True):
+        with self.lock:
+            self.requests += 1
+            self.latency_sum_ms += elapsed_ms
+            i = 0
+            while i < len(LATENCY_BUCKETS_MS) and elapsed_ms > LATENCY_BUCKETS_MS[i]:
+                i += 1
+            self.buckets[i] += 1
+            if status is not None:
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+            if not ok:
+                self.errors += 1
+
+    def result(self, ok):
+        with self.lock:
+            self.trial_inflight = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= BREAKER_THRESHOLD:
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self.lock:
+            if self.opened_at is None:
+                state = 'closed'
+            elif time.monotonic() - self.opened_at < BREAKER_COOLDOWN:
+                state = 'open'
+            else:
+                state = 'half_open'
+            histogram, running = {}, 0
+            for bound, count in zip(LATENCY_BUCKETS_MS + ['+Inf'], self.buckets):
+                running += count
+                histogram[str(bound)] = running
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'errors': self.errors,
+                'short_circuited': self.short_circuited,
+                'statuses': {str(k): v for k, v in self.statuses.items()},
+                'latency_ms_sum': round(self.latency_sum_ms, 2),
+                'latency_ms_avg': round(self.latency_sum_ms / self.requests, 2) if self.requests else 0.0,
+                'latency_ms_buckets': histogram,
+                'circuit': state,
+                'consecutive_failures': self.failures,
+            }
+
+
+class HttpClient:
+    """
+    Pooled, retrying, circuit-broken HTTP client. Use the module-level `http`.
+    """
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is None:
+                state = self._hosts[key] = _HostState(key)
+        return state
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """
+        Same arguments as requests.request. `timeout` may be a number (read
+        timeout) or a (connect, read) tuple. `retries` defaults to MAX_RETRIES
+        for idempotent methods and 0 otherwise, so a POST is never re-sent.
+        Raises requests exceptions like requests does; HTTP error statuses are
+        returned, not raised.
+        """
+        method = method.upper()
+        host = self._host(url)
+        if retries is None:
+            retries = MAX_RETRIES if method in RETRY_METHODS else 0
+        if timeout is None:
+            timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(CONNECT_TIMEOUT, timeout), timeout)
+
+        attempt = 0
+        while True:
+            if not host.allow():
+                raise CircuitOpenError(f"Circuit open for {host.host}")
+
+            start = time.perf_counter()
+            try:
+                response = host.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                host.record((time.perf_counter() - start) * 1000, ok=False)
+                host.result(ok=False)
+                if attempt >= retries or host.tripped():
+                    raise
+                error = e
+            except Exception:
+                # Not an upstream failure (bad URL, bad arguments): release any half-open trial
+                with host.lock:
+                    host.trial_inflight = False
+                raise
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                host.record((time.perf_counter() - start) * 1000, response.status_code, ok=not failed)
+                host.result(ok=not failed)
+                if not failed or attempt >= retries or host.tripped():
+                    return response
+                error = None
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+
+            attempt += 1
+            with host.lock:
+                host.retries += 1
+            delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+            if error is None and retry_after and retry_after.isdigit():
+                delay = min(BACKOFF_MAX, float(retry_after))
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            hosts = list(self._hosts.values())
+        return {h.host: h.stats() for h in hosts}
+
+
+# Create a global instance
+http = HttpClient()
+metrics.register_collector('outbound_http', http_collector(http))
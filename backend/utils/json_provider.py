@@ -0,0 +1,48 @@
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when it is installed.
+    Responses are compact (indented in debug mode, as with Flask's default); numpy scalars/arrays and datetimes are encoded
+    natively, anything else goes through DefaultJSONProvider.default
+    (dates, decimals, UUIDs, dataclasses).
+    Disable with JSON_ENCODER=stdlib.
+    """
+
+    enabled = orjson is not None and os.getenv('JSON_ENCODER', 'orjson').lower() != 'stdlib'
+
+    def _options(self, pretty=False):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if not self.enabled or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if not self.enabled or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.enabled:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._options(pretty)) + b"\n",
+            mimetype=self.mimetype,
+        )
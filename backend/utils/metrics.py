@@ -0,0 +1,283 @@
+import sys
+import threading
+import time
+
+# Seconds; covers cache hits (sub-ms) up to slow model/LLM/PDF calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'mitti_'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_labels(self.labelnames, key)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            running = 0
+            for bound, count in zip(self.buckets, series):
+                running += count
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", _number(bound))])} {running}')
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [("le", "+Inf")])} {series[-1]}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-2])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {series[-1]}')
+        return lines
+
+
+class StageTimer:
+    """
+    Per-request stage timings for one pipeline. Time spent in a stage is
+    summed over the request (a stage can run inside a loop) and observed
+    once per stage, plus a 'total', when the timer exits:
+
+        with metrics.stages('recommend') as timer:
+            with timer('weather'):
+                ...
+    """
+
+    def __init__(self, histogram, pipeline):
+        self.histogram = histogram
+        self.pipeline = pipeline
+        self.durations = {}
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.durations['total'] = time.perf_counter() - self._started
+        for stage, seconds in self.durations.items():
+            self.histogram.observe(seconds, pipeline=self.pipeline, stage=stage)
+        return False
+
+    def __call__(self, stage):
+        return _Stage(self, stage)
+
+
+class _Stage:
+    __slots__ = ('timer', 'stage', 'start')
+
+    def __init__(self, timer, stage):
+        self.timer = timer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        durations = self.timer.durations
+        durations[self.stage] = durations.get(self.stage, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format at /metrics.
+    Counters and histograms are updated directly; collectors are callables
+    that turn existing stats() dicts into lines at scrape time.
+    Values are per process: under gunicorn each worker reports its own,
+    so scrape the workers individually or sum in the query.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+        self.requests = self.histogram('http_request_duration_seconds', "Request latency per route", ('endpoint', 'method', 'status'))
+        self.stage_seconds = self.histogram('stage_duration_seconds', "Time per pipeline stage, summed over one request", ('pipeline', 'stage'))
+        self.fallbacks = self.counter('fallback_total', "Mock/rule-based fallback activations", ('component', 'reason'))
+
+    def _register(self, cls, name, *args):
+        name = PREFIX + name
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args)
+            return self._metrics[name]
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def register_collector(self, name, collector):
+        """
+        collector() returns a list of exposition lines. Registering the same
+        name again replaces the collector.
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def expose_stats(self, name, stats_fn, help=''):
+        """
+        Publishes an existing stats() method (see stats_collector).
+        """
+        self.register_collector(name, stats_collector(name, stats_fn, help))
+
+    def stages(self, pipeline):
+        return StageTimer(self.stage_seconds, pipeline)
+
+    def fallback(self, component, reason='no_model'):
+        self.fallbacks.inc(component=component, reason=reason)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f'# collector error: {_escape(e)}')
+        return '\n'.join(lines) + '\n'
+
+
+def stats_collector(name, stats_fn, help=''):
+    """
+    Collector exposing every numeric value of a stats() dict as a gauge
+    named mitti_<name>_<key>; nested dicts are flattened with '_'.
+    """
+    def flatten(prefix, value):
+        if isinstance(value, bool):
+            yield prefix, int(value)
+        elif isinstance(value, (int, float)):
+            yield prefix, value
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                yield from flatten(f'{prefix}_{k}', v)
+
+    def collect():
+        lines = []
+        for metric, value in flatten(PREFIX + name, stats_fn()):
+            metric = ''.join(c if c.isalnum() or c == '_' else '_' for c in metric)
+            lines.append(f'# HELP {metric} {help or name} ({metric[len(PREFIX) + len(name) + 1:]})')
+            lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric} {_number(value)}')
+        return lines
+
+    return collect
+
+
+def http_collector(http):
+    """
+    Outbound call latency per host from HttpClient.stats(), as a histogram
+    (HttpClient buckets are in ms and already cumulative) plus counters.
+    """
+    def collect():
+        stats = http.stats()
+        name = PREFIX + 'outbound_request_duration_seconds'
+        lines = [f'# HELP {name} Outbound HTTP latency per host', f'# TYPE {name} histogram']
+        for host, s in sorted(stats.items()):
+            for bound, count in s['latency_ms_buckets'].items():
+                le = '+Inf' if bound == '+Inf' else _number(float(bound) / 1000)
+                lines.append(f'{name}_bucket{_labels(("host", "le"), (host, le))} {count}')
+            lines.append(f'{name}_sum{_labels(("host",), (host,))} {_number(s["latency_ms_sum"] / 1000)}')
+            lines.append(f'{name}_count{_labels(("host",), (host,))} {s["requests"]}')
+        for field in ('retries', 'errors', 'short_circuited'):
+            metric = f'{PREFIX}outbound_{field}_total'
+            lines += [f'# HELP {metric} Outbound HTTP {field.replace("_", " ")} per host', f'# TYPE {metric} counter']
+            lines += [f'{metric}{_labels(("host",), (host,))} {s[field]}' for host, s in sorted(stats.items())]
+        metric = PREFIX + 'outbound_circuit_open'
+        lines += [f'# HELP {metric} 1 while the host circuit breaker is open', f'# TYPE {metric} gauge']
+        lines += [f'{metric}{_labels(("host",), (host,))} {int(s["circuit"] == "open")}' for host, s in sorted(stats.items())]
+        return lines
+
+    return collect
+
+
+def init_metrics(app):
+    """
+    Times every request by route and serves GET /metrics.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            metrics.requests.observe(
+                time.perf_counter() - start,
+                endpoint=request.endpoint or 'unmatched', method=request.method, status=response.status_code
+            )
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    return app
+
+
+# Create a global instance. ml/ imports this module as backend.utils.metrics
+# and the rest of the app as utils.metrics; both share one registry.
+_twin = sys.modules.get('backend.utils.metrics' if __name__ == 'utils.metrics' else 'utils.metrics')
+metrics = getattr(_twin, 'metrics', None) or MetricsRegistry()
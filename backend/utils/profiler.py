@@ -0,0 +1,220 @@
+"""
+Opt-in, per-request sampling profiler.
+
+Enabled only when PROFILE_TOKEN is set; otherwise init_profiler() installs
+nothing and requests pay no cost. A caller that sends the token in
+X-Profile-Token and asks for a profile (X-Profile: 1 header or ?profile=1)
+gets that single request sampled: a background thread reads the request
+thread's stack every PROFILE_INTERVAL_MS and counts identical stacks.
+
+The result is stored in collapsed-stack format (one "root;...;leaf count"
+line per stack, readable by flamegraph.pl, speedscope, inferno) under
+PROFILE_DIR/<endpoint>/, and its id returned in X-Profile-Id.
+With profile=return the response body is replaced by the collapsed stacks.
+
+Aggregate stored profiles by endpoint:
+    python -m utils.profiler summary [--endpoint predict.recommend] [--top 20]
+    python -m utils.profiler merge --endpoint predict.recommend -o recommend.folded
+"""
+import argparse
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+PROFILE_DIR = os.getenv(
+    'PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'profiles')
+)
+INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 2))
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed interval.
+    """
+
+    def __init__(self, thread_id, interval=INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="request-profiler")
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.stacks
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _endpoint_dir(endpoint):
+    return os.path.join(PROFILE_DIR, (endpoint or 'unmatched').replace('/', '_'))
+
+
+def save_profile(endpoint, profiler):
+    """
+    Writes the collapsed stacks; returns the profile id.
+    """
+    profile_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}-{profiler.duration * 1000:.0f}ms"
+    directory = _endpoint_dir(endpoint)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, profile_id + '.folded'), 'w', encoding='utf-8') as f:
+        f.write(profiler.collapsed())
+    return profile_id
+
+
+def init_profiler(app):
+    """
+    Installs the request hooks when PROFILE_TOKEN is configured.
+    """
+    if not PROFILE_TOKEN:
+        return app
+
+    from flask import g, request
+
+    @app.before_request
+    def start_profile():
+        mode = request.headers.get('X-Profile') or request.args.get('profile')
+        if not mode or mode == '0':
+            return
+        token = request.headers.get('X-Profile-Token', '')
+        if not hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode()):
+            return
+        g.profile_mode = mode
+        g.profiler = SamplingProfiler(threading.get_ident()).start()
+
+    @app.after_request
+    def finish_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.stop()
+        try:
+            profile_id = save_profile(request.endpoint, profiler)
+            response.headers['X-Profile-Id'] = profile_id
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+        response.headers['X-Profile-Samples'] = str(profiler.samples)
+        if g.pop('profile_mode', None) == 'return':
+            response.set_data(profiler.collapsed())
+            response.mimetype = 'text/plain'
+        return response
+
+    return app
+
+
+# --- aggregation CLI ---
+
+def load_profiles(endpoint=None, directory=PROFILE_DIR):
+    """
+    {endpoint: (profile_count, Counter of collapsed stacks)}
+    """
+    result = {}
+    if not os.path.isdir(directory):
+        return result
+    for name in sorted(os.listdir(directory)):
+        if endpoint and name != endpoint:
+            continue
+        path = os.path.join(directory, name)
+        if not os.path.isdir(path):
+            continue
+        stacks, count = Counter(), 0
+        for filename in os.listdir(path):
+            if not filename.endswith('.folded'):
+                continue
+            count += 1
+            with open(os.path.join(path, filename), encoding='utf-8') as f:
+                for line in f:
+                    stack, _, n = line.rstrip('\n').rpartition(' ')
+                    if stack and n.isdigit():
+                        stacks[stack] += int(n)
+        if count:
+            result[name] = (count, stacks)
+    return result
+
+
+def summarize(stacks, top=20):
+    """
+    (frame, self_samples, inclusive_samples) for the frames with the most self time.
+    """
+    self_counts, inclusive = Counter(), Counter()
+    for stack, n in stacks.items():
+        frames = stack.split(';')
+        self_counts[frames[-1]] += n
+        for frame in set(frames):
+            inclusive[frame] += n
+    return [(frame, n, inclusive[frame]) for frame, n in self_counts.most_common(top)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate stored request profiles by endpoint.")
+    parser.add_argument('command', choices=['summary', 'merge'])
+    parser.add_argument('--dir', default=PROFILE_DIR)
+    parser.add_argument('--endpoint', help="Flask endpoint, e.g. predict.recommend")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('-o', '--output', help="merge: write collapsed stacks here instead of stdout")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.endpoint, args.dir)
+    if not profiles:
+        print(f"No profiles found in {args.dir}")
+        return
+
+    if args.command == 'merge':
+        merged = Counter()
+        for _, stacks in profiles.values():
+            merged.update(stacks)
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        for stack, n in merged.most_common():
+            out.write(f"{stack} {n}\n")
+        if args.output:
+            out.close()
+            print(f"{sum(c for c, _ in profiles.values())} profiles, {sum(merged.values())} samples -> {args.output}")
+        return
+
+    for endpoint, (count, stacks) in profiles.items():
+        total = sum(stacks.values())
+        print(f"\n{endpoint}: {count} profiles, {total} samples")
+        if not total:
+            continue
+        print(f"{'self %':>7} {'total %':>8}  frame")
+        for frame, self_n, incl_n in summarize(stacks, args.top):
+            print(f"{100 * self_n / total:>6.1f}% {100 * incl_n / total:>7.1f}%  {frame}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+from backend.utils.translator import TRANSLATIONS, translate_text
+
+# Explanation sentences used by the ML explainers (ml/predictor.py,
+# ml/fertilizer_recommender.py). Placeholders are filled after translation;
+# the translations live in utils/translator.PHRASES.
+TEMPLATES = {
+    # Crop recommendation
+    'crop.high_rain': "High rainfall is suitable for this crop.",
+    'crop.low_rain': "Suitable for low rainfall conditions.",
+    'crop.warm': "Thrives in warm temperatures.",
+    'crop.ph_optimal': "Soil pH is optimal.",
+    'crop.profile_match': "Matches your soil nutrient profile best.",
+
+    # Fertilizer reasoning
+    'fert.crop_rice': "{crop} requires high nitrogen for vegetative growth and tillering",
+    'fert.crop_cereal': "{crop} benefits from balanced NPK nutrition for grain development",
+    'fert.crop_cotton': "{crop} requires adequate potassium for fiber quality and disease resistance",
+    'fert.crop_pulses': "{crop} requires phosphorus for root development and nitrogen fixation",
+    'fert.crop_other': "Fertilizer optimized for {crop} nutrient requirements",
+    'fert.n_low': "Low nitrogen level ({n} mg/kg) detected - nitrogen-rich fertilizer recommended",
+    'fert.n_ok': "Adequate nitrogen level ({n} mg/kg) - balanced fertilizer recommended",
+    'fert.p_low': "Low phosphorus level ({p} mg/kg) - phosphorus supplementation needed",
+    'fert.p_ok': "Sufficient phosphorus level ({p} mg/kg)",
+    'fert.k_low': "Low potassium level ({k} mg/kg) - potassium supplementation recommended",
+    'fert.k_ok': "Adequate potassium level ({k} mg/kg)",
+    'fert.moisture_low': "Low soil moisture - consider water-soluble fertilizers for better uptake",
+    'fert.moisture_high': "High soil moisture - slow-release fertilizers recommended",
+    'fert.soil_sandy': "Sandy soil - frequent, smaller fertilizer applications recommended",
+    'fert.soil_clayey': "Clayey soil - ensure good drainage for optimal nutrient uptake",
+    'fert.general': "Fertilizer recommendation based on soil nutrient analysis and crop requirements",
+
+    # Application tips
+    'tip.urea_moist': "Apply urea when soil is moist, preferably just before irrigation.",
+    'tip.urea_incorporate': "Incorporate into soil within 24 hours to minimize nitrogen loss to atmosphere.",
+    'tip.dap_sowing': "Apply DAP at the time of sowing for better root development.",
+    'tip.dap_distance': "Avoid contact between DAP and seeds; keep a 2-3 inch distance.",
+    'tip.mop_split': "MOP (Potash) should be applied in split doses for better efficacy.",
+    'tip.mop_quality': "Effective for improving fruit quality and stress tolerance.",
+    'tip.npk_root_zone': "NPK fertilizers work best when applied in the root zone.",
+    'tip.npk_split': "Standard application: half during sowing, remaining after 30-40 days.",
+    'tip.paddy_water': "For Paddy, apply fertilizers in standing water (shallow depth).",
+    'tip.timing': "Apply during early morning or late evening.",
+    'tip.uniform': "Ensure uniform distribution across the field.",
+}
+
+LANGUAGES = ['en'] + list(TRANSLATIONS)
+
+
+def _compile(text, lang):
+    """
+    Translates a whole template. Placeholders are single tokens to the
+    phrase trie, so translated sentences may move them; a template with no
+    full translation stays English.
+    """
+    return translate_text(text, lang)
+
+
+# Every template pre-translated for every supported language at import
+COMPILED = {lang: {key: _compile(text, lang) for key, text in TEMPLATES.items()} for lang in LANGUAGES}
+
+
+def render(key, lang='en', **values):
+    """
+    The template `key` in `lang` with `values` filled in last.
+    Unknown languages use the English template.
+    """
+    template = COMPILED.get(lang, COMPILED['en'])[key]
+    return template.format(**values) if values else template
+
+
+def translate_cached(text, lang='en'):
+    """
+    translate_text for dynamic strings (crop and fertilizer names) that are
+    not templates; translate_text memoizes per (text, lang).
+    """
+    return translate_text(text, lang)
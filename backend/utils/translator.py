@@ -1,3 +1,8 @@
+import re
+from functools import lru_cache
+
+from backend.utils.metrics import metrics
+
 
 TRANSLATIONS = {
     'hi': {
@@ -65,29 +70,281 @@ TRANSLATIONS = {
     }
 }
 
-def translate_text(text, lang='en'):
-    if not text or lang == 'en':
+
+# Sentence and phrase tables. Entries may contain {placeholders}, which are
+# matched as single tokens, so a translation can reorder them. Matching is
+# case-insensitive and ignores whitespace differences.
+PHRASES = {
+    'hi': {
+        'nitrogen': 'नाइट्रोजन', 'phosphorus': 'फॉस्फोरस', 'potassium': 'पोटैशियम',
+        'soil': 'मिट्टी', 'rainfall': 'वर्षा', 'temperature': 'तापमान', 'humidity': 'आर्द्रता',
+        # Crop reasoning
+        'High rainfall is suitable for this crop.': 'अधिक वर्षा इस फसल के लिए उपयुक्त है।',
+        'Suitable for low rainfall conditions.': 'कम वर्षा वाली परिस्थितियों के लिए उपयुक्त।',
+        'Thrives in warm temperatures.': 'गर्म तापमान में अच्छी तरह पनपती है।',
+        'Soil pH is optimal.': 'मिट्टी का pH उपयुक्त है।',
+        'Matches your soil nutrient profile best.': 'आपकी मिट्टी के पोषक तत्वों से सबसे अच्छा मेल खाती है।',
+        # Fertilizer reasoning
+        '{crop} requires high nitrogen for vegetative growth and tillering':
+            '{crop} को वानस्पतिक वृद्धि और कल्ले निकलने के लिए अधिक नाइट्रोजन की आवश्यकता होती है',
+        '{crop} benefits from balanced NPK nutrition for grain development':
+            'दाने के विकास के लिए {crop} को संतुलित NPK पोषण से लाभ होता है',
+        '{crop} requires adequate potassium for fiber quality and disease resistance':
+            'रेशे की गुणवत्ता और रोग प्रतिरोधक क्षमता के लिए {crop} को पर्याप्त पोटैशियम की आवश्यकता होती है',
+        '{crop} requires phosphorus for root development and nitrogen fixation':
+            'जड़ों के विकास और नाइट्रोजन स्थिरीकरण के लिए {crop} को फॉस्फोरस की आवश्यकता होती है',
+        'Fertilizer optimized for {crop} nutrient requirements': '{crop} की पोषक आवश्यकताओं के अनुसार उर्वरक',
+        'Low nitrogen level ({n} mg/kg) detected - nitrogen-rich fertilizer recommended':
+            'नाइट्रोजन का स्तर कम ({n} mg/kg) पाया गया - नाइट्रोजन युक्त उर्वरक की सिफारिश',
+        'Adequate nitrogen level ({n} mg/kg) - balanced fertilizer recommended':
+            'नाइट्रोजन का स्तर पर्याप्त ({n} mg/kg) - संतुलित उर्वरक की सिफारिश',
+        'Low phosphorus level ({p} mg/kg) - phosphorus supplementation needed':
+            'फॉस्फोरस का स्तर कम ({p} mg/kg) - फॉस्फोरस की पूर्ति आवश्यक',
+        'Sufficient phosphorus level ({p} mg/kg)': 'फॉस्फोरस का स्तर पर्याप्त ({p} mg/kg)',
+        'Low potassium level ({k} mg/kg) - potassium supplementation recommended':
+            'पोटैशियम का स्तर कम ({k} mg/kg) - पोटैशियम की पूर्ति की सिफारिश',
+        'Adequate potassium level ({k} mg/kg)': 'पोटैशियम का स्तर पर्याप्त ({k} mg/kg)',
+        'Low soil moisture - consider water-soluble fertilizers for better uptake':
+            'मिट्टी में नमी कम - बेहतर अवशोषण के लिए पानी में घुलनशील उर्वरकों का उपयोग करें',
+        'High soil moisture - slow-release fertilizers recommended':
+            'मिट्टी में नमी अधिक - धीमी गति से घुलने वाले उर्वरकों की सिफारिश',
+        'Sandy soil - frequent, smaller fertilizer applications recommended':
+            'रेतीली मिट्टी - कम मात्रा में बार-बार उर्वरक डालने की सिफारिश',
+        'Clayey soil - ensure good drainage for optimal nutrient uptake':
+            'चिकनी मिट्टी - पोषक तत्वों के अच्छे अवशोषण के लिए उचित जल निकासी सुनिश्चित करें',
+        'Fertilizer recommendation based on soil nutrient analysis and crop requirements':
+            'मिट्टी के पोषक तत्वों के विश्लेषण और फसल की आवश्यकताओं पर आधारित उर्वरक सिफारिश',
+        # Application tips
+        'Apply urea when soil is moist, preferably just before irrigation.':
+            'यूरिया तब डालें जब मिट्टी नम हो, बेहतर है सिंचाई से ठीक पहले।',
+        'Incorporate into soil within 24 hours to minimize nitrogen loss to atmosphere.':
+            'वातावरण में नाइट्रोजन की हानि कम करने के लिए 24 घंटे के भीतर इसे मिट्टी में मिला दें।',
+        'Apply DAP at the time of sowing for better root development.':
+            'जड़ों के बेहतर विकास के लिए बुवाई के समय DAP डालें।',
+        'Avoid contact between DAP and seeds; keep a 2-3 inch distance.':
+            'DAP और बीजों का सीधा संपर्क न होने दें; 2-3 इंच की दूरी रखें।',
+        'MOP (Potash) should be applied in split doses for better efficacy.':
+            'बेहतर प्रभाव के लिए MOP (पोटाश) को कई हिस्सों में डालना चाहिए।',
+        'Effective for improving fruit quality and stress tolerance.':
+            'फलों की गुणवत्ता और तनाव सहनशीलता बढ़ाने में प्रभावी।',
+        'NPK fertilizers work best when applied in the root zone.':
+            'NPK उर्वरक जड़ क्षेत्र में डालने पर सबसे अच्छा काम करते हैं।',
+        'Standard application: half during sowing, remaining after 30-40 days.':
+            'सामान्य विधि: आधी मात्रा बुवाई के समय, शेष 30-40 दिनों के बाद।',
+        'For Paddy, apply fertilizers in standing water (shallow depth).':
+            'धान में उर्वरक खड़े पानी (कम गहराई) में डालें।',
+        'Apply during early morning or late evening.': 'सुबह जल्दी या शाम को देर से डालें।',
+        'Ensure uniform distribution across the field.': 'पूरे खेत में समान रूप से फैलाना सुनिश्चित करें।',
+    },
+    'te': {
+        'nitrogen': 'నత్రజని', 'phosphorus': 'భాస్వరం', 'potassium': 'పొటాషియం',
+        'soil': 'నేల', 'rainfall': 'వర్షపాతం', 'temperature': 'ఉష్ణోగ్రత', 'humidity': 'తేమ',
+        # Crop reasoning
+        'High rainfall is suitable for this crop.': 'అధిక వర్షపాతం ఈ పంటకు అనుకూలం.',
+        'Suitable for low rainfall conditions.': 'తక్కువ వర్షపాత పరిస్థితులకు అనుకూలం.',
+        'Thrives in warm temperatures.': 'వెచ్చని ఉష్ణోగ్రతలలో బాగా పెరుగుతుంది.',
+        'Soil pH is optimal.': 'నేల pH సరైన స్థాయిలో ఉంది.',
+        'Matches your soil nutrient profile best.': 'మీ నేల పోషకాల స్థితికి బాగా సరిపోతుంది.',
+        # Fertilizer reasoning
+        '{crop} requires high nitrogen for vegetative growth and tillering':
+            '{crop} కు ఆకుల పెరుగుదల మరియు పిలకల కోసం అధిక నత్రజని అవసరం',
+        '{crop} benefits from balanced NPK nutrition for grain development':
+            'గింజ అభివృద్ధికి {crop} కు సమతుల్య NPK పోషణ ఉపయోగకరం',
+        '{crop} requires adequate potassium for fiber quality and disease resistance':
+            'పీచు నాణ్యత మరియు వ్యాధి నిరోధకత కోసం {crop} కు తగినంత పొటాషియం అవసరం',
+        '{crop} requires phosphorus for root development and nitrogen fixation':
+            'వేర్ల అభివృద్ధి మరియు నత్రజని స్థిరీకరణ కోసం {crop} కు భాస్వరం అవసరం',
+        'Fertilizer optimized for {crop} nutrient requirements': '{crop} పోషక అవసరాలకు అనుగుణమైన ఎరువు',
+        'Low nitrogen level ({n} mg/kg) detected - nitrogen-rich fertilizer recommended':
+            'నత్రజని స్థాయి తక్కువగా ఉంది ({n} mg/kg) - నత్రజని అధికంగా ఉన్న ఎరువు సిఫార్సు',
+        'Adequate nitrogen level ({n} mg/kg) - balanced fertilizer recommended':
+            'నత్రజని స్థాయి తగినంతగా ఉంది ({n} mg/kg) - సమతుల్య ఎరువు సిఫార్సు',
+        'Low phosphorus level ({p} mg/kg) - phosphorus supplementation needed':
+            'భాస్వరం స్థాయి తక్కువగా ఉంది ({p} mg/kg) - భాస్వరం అందించడం అవసరం',
+        'Sufficient phosphorus level ({p} mg/kg)': 'భాస్వరం స్థాయి సరిపడా ఉంది ({p} mg/kg)',
+        'Low potassium level ({k} mg/kg) - potassium supplementation recommended':
+            'పొటాషియం స్థాయి తక్కువగా ఉంది ({k} mg/kg) - పొటాషియం అందించడం సిఫార్సు',
+        'Adequate potassium level ({k} mg/kg)': 'పొటాషియం స్థాయి తగినంతగా ఉంది ({k} mg/kg)',
+        'Low soil moisture - consider water-soluble fertilizers for better uptake':
+            'నేలలో తేమ తక్కువ - మెరుగైన శోషణ కోసం నీటిలో కరిగే ఎరువులను పరిగణించండి',
+        'High soil moisture - slow-release fertilizers recommended':
+            'నేలలో తేమ ఎక్కువ - నెమ్మదిగా విడుదలయ్యే ఎరువులు సిఫార్సు',
+        'Sandy soil - frequent, smaller fertilizer applications recommended':
+            'ఇసుక నేల - తరచుగా, తక్కువ మోతాదులో ఎరువులు వేయడం సిఫార్సు',
+        'Clayey soil - ensure good drainage for optimal nutrient uptake':
+            'బంకమట్టి నేల - పోషకాల శోషణ కోసం మంచి నీటి పారుదల ఉండేలా చూడండి',
+        'Fertilizer recommendation based on soil nutrient analysis and crop requirements':
+            'నేల పోషక విశ్లేషణ మరియు పంట అవసరాల ఆధారంగా ఎరువు సిఫార్సు',
+        # Application tips
+        'Apply urea when soil is moist, preferably just before irrigation.':
+            'నేల తేమగా ఉన్నప్పుడు, వీలైతే నీరు పెట్టే ముందు యూరియా వేయండి.',
+        'Incorporate into soil within 24 hours to minimize nitrogen loss to atmosphere.':
+            'వాతావరణంలోకి నత్రజని నష్టాన్ని తగ్గించడానికి 24 గంటల లోపు నేలలో కలపండి.',
+        'Apply DAP at the time of sowing for better root development.':
+            'మెరుగైన వేర్ల అభివృద్ధికి విత్తే సమయంలో DAP వేయండి.',
+        'Avoid contact between DAP and seeds; keep a 2-3 inch distance.':
+            'DAP విత్తనాలకు తగలకుండా చూడండి; 2-3 అంగుళాల దూరం ఉంచండి.',
+        'MOP (Potash) should be applied in split doses for better efficacy.':
+            'మెరుగైన ఫలితం కోసం MOP (పొటాష్) ను విడతలుగా వేయాలి.',
+        'Effective for improving fruit quality and stress tolerance.':
+            'పండ్ల నాణ్యత మరియు ఒత్తిడి తట్టుకునే శక్తిని మెరుగుపరచడంలో ప్రభావవంతం.',
+        'NPK fertilizers work best when applied in the root zone.':
+            'NPK ఎరువులు వేరు ప్రాంతంలో వేసినప్పుడు ఉత్తమంగా పనిచేస్తాయి.',
+        'Standard application: half during sowing, remaining after 30-40 days.':
+            'సాధారణ పద్ధతి: సగం విత్తే సమయంలో, మిగతా 30-40 రోజుల తర్వాత.',
+        'For Paddy, apply fertilizers in standing water (shallow depth).':
+            'వరికి, నిలిచిన నీటిలో (తక్కువ లోతు) ఎరువులు వేయండి.',
+        'Apply during early morning or late evening.': 'ఉదయం పూట లేదా సాయంత్రం ఆలస్యంగా వేయండి.',
+        'Ensure uniform distribution across the field.': 'పొలం అంతటా సమానంగా చల్లేలా చూడండి.',
+    },
+}
+
+# Placeholders, words (letters/digits), single punctuation marks; whitespace
+# is kept separately so untranslated text is reproduced exactly.
+_TOKEN_RE = re.compile(r"\{[^{}]*\}|[^\W_]+|[^\w\s]|_")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+_END = None  # trie key holding a phrase's translation
+
+
+def _tokenize(text):
+    """
+    [(leading_whitespace, token), ...] plus the trailing whitespace.
+    """
+    tokens, pos = [], 0
+    for m in _TOKEN_RE.finditer(text):
+        tokens.append((text[pos:m.start()], m.group()))
+        pos = m.end()
+    return tokens, text[pos:]
+
+
+def _phrase_key(phrase):
+    return tuple(tok.lower() for _, tok in _tokenize(phrase.replace('_', ' '))[0])
+
+
+def _compile_trie(*tables):
+    """
+    Token trie over all phrase tables for one language; later tables win on
+    identical keys.
+    """
+    root = {}
+    for table in tables:
+        for phrase, translation in table.items():
+            node = root
+            for tok in _phrase_key(phrase):
+                node = node.setdefault(tok, {})
+            node[_END] = translation
+    return root
+
+
+# One longest-match trie per language, built once at import
+TRIES = {
+    lang: _compile_trie(TRANSLATIONS.get(lang, {}), PHRASES.get(lang, {}))
+    for lang in set(TRANSLATIONS) | set(PHRASES)
+}
+
+
+def _translate_tokens(text, trie):
+    """
+    Single left-to-right pass taking the longest phrase at each position.
+    Returns (translation, untranslated_word_count).
+    """
+    tokens, trailing = _tokenize(text)
+    out, missed, i, n = [], 0, 0, len(tokens)
+    while i < n:
+        node, match, j = trie, None, i
+        while j < n:
+            node = node.get(tokens[j][1].lower())
+            if node is None:
+                break
+            j += 1
+            if _END in node:
+                match = (j, node[_END])
+
+        space, tok = tokens[i]
+        if match:
+            i, translation = match
+            out.append(space + translation)
+        else:
+            out.append(space + tok)
+            if _LATIN_RE.search(tok):
+                missed += 1
+            i += 1
+    out.append(trailing)
+    return ''.join(out), missed
+
+
+@lru_cache(maxsize=8192)
+def _translate(text, lang):
+    trie = TRIES.get(lang)
+    if trie is None:
         return text
-    
-    # Handle phrases by translating parts if they contain underscores/dashes or spaces
-    text_lower = str(text).lower().strip()
-    
+
+    text_lower = text.lower().strip()
+
     # 1. Direct match
-    if lang in TRANSLATIONS and text_lower in TRANSLATIONS[lang]:
-        return TRANSLATIONS[lang][text_lower]
-    
+    table = TRANSLATIONS.get(lang, {})
+    if text_lower in table:
+        return table[text_lower]
+
     # 2. Heuristic for disease names like "Tomato_Bacterial_spot"
     # Try to translate individual components
     if '_' in text_lower:
         parts = text_lower.split('_')
-        trans_parts = [translate_text(p, lang) for p in parts]
+        trans_parts = [_translate(p, lang) for p in parts]
         return " ".join(trans_parts).capitalize()
 
-    return text
+    # 3. Phrase trie; only fully covered text is returned translated so a
+    # sentence never comes back half English
+    translated, missed = _translate_tokens(text, trie)
+    return text if missed else translated
+
 
-def translate_response(response_dict, lang='en'):
+metrics.expose_stats('translation_cache', lambda: _translate.cache_info()._asdict(), "Memoized translate_text calls")
+
+
+def translate_text(text, lang='en'):
+    if not text or lang == 'en':
+        return text
+    if not isinstance(text, str):
+        translated = _translate(str(text), lang)
+        return text if translated == str(text) else translated
+    return _translate(text, lang)
+
+
+def translate_batch(texts, lang='en'):
+    """
+    translate_text over a list of strings; repeated strings are translated once.
+    """
+    if lang == 'en':
+        return list(texts)
+    seen = {}
+    return [seen[t] if t in seen else seen.setdefault(t, translate_text(t, lang)) for t in texts]
+
+
+# Response fields holding identifiers or values the client matches on;
+# translations of these go in separate translated_* fields instead
+SKIP_KEYS = frozenset({
+    'crop', 'name', 'fertilizer', 'status', 'unit', 'season', 'state', 'district',
+    'soil_type', 'crop_type', 'lang', 'id', 'device_id', 'created_at', 'timestamp', 'date', 'source',
+})
+
+
+def translate_response(response, lang='en', skip_keys=SKIP_KEYS):
     """
-    Placeholder for deep translation if needed. For now we translate
-    specific fields in the ML output generators directly.
+    Returns a copy of a JSON-like response (dicts, lists, tuples, strings)
+    with every string value translated in a single walk of the tree. Dict
+    keys and string values under `skip_keys` are left as they are.
     """
-    return response_dict
+    if lang == 'en' or lang not in TRIES:
+        return response
+
+    def walk(value, key=None):
+        if isinstance(value, str):
+            return value if key in skip_keys else translate_text(value, lang)
+        if isinstance(value, dict):
+            return {k: walk(v, k) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v, key) for v in value]
+        return value
+
+    return walk(response)
@@ -0,0 +1,23 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py sets preload_app, so this module is imported once in the
+master: create_app() imports every blueprint, which loads the sklearn/TF
+models, the yield lookup and the translation tables. Workers are then
+forked from the master and share those pages copy-on-write instead of each
+loading its own copy. ThingSpeak ingestion is not started here; the master
+runs it as one separate process (see gunicorn.conf.py).
+"""
+import gc
+
+from app import create_app
+
+app = create_app()
+
+# Move everything loaded so far out of the collector's generations. Otherwise
+# the first GC pass in each worker touches every object header and un-shares
+# the pages holding the models.
+gc.collect()
+gc.freeze()
@@ -15,14 +15,17 @@ CREATE TABLE IF NOT EXISTS sensor_readings (
     rainfall NUMERIC(6, 2),    -- mm
     
     -- Soil Data
-    ph NUMERIC(4, 2),          -- 0.0 to 14.0
+    ph NUMERIC(4, 2),          -- 0.0 to 14.0 (legacy name)
+    soil_ph NUMERIC(4, 2),     -- 0.0 to 14.0
+    moisture NUMERIC(5, 2),    -- Percentage
     nitrogen NUMERIC(6, 2),    -- mg/kg
     phosphorus NUMERIC(6, 2),  -- mg/kg
     potassium NUMERIC(6, 2)    -- mg/kg
 );
 
--- Index for faster time-based queries (e.g., getting latest reading)
-CREATE INDEX IF NOT EXISTS idx_sensor_readings_timestamp ON sensor_readings (timestamp DESC);
+-- Indexes for device/time lookups (see schema_indexes.sql for existing deployments)
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_device_created ON sensor_readings (device_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_created ON sensor_readings (created_at DESC);
 
 -- Optional: Create a view for daily averages (if not handled by code)
 CREATE OR REPLACE VIEW daily_averages AS
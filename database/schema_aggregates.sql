@@ -0,0 +1,62 @@
+-- Server-side window statistics for sensor_readings
+-- Replaces pulling raw rows into pandas (AggregationService, services/aggregator.py):
+-- the response is one row per field no matter how large the window is.
+--
+-- Called through PostgREST as:
+--   supabase.rpc('sensor_window_stats', {'p_device_id': 'MM-POLE-001', 'p_limit': 30}).execute()
+--   supabase.rpc('sensor_window_stats', {'p_device_id': 'MM-POLE-001', 'p_since': '2026-01-01T00:00:00Z'}).execute()
+-- Uses idx_sensor_readings_device_created from schema_indexes.sql.
+
+CREATE OR REPLACE FUNCTION sensor_window_stats(
+    p_device_id TEXT,
+    p_limit INTEGER DEFAULT NULL,     -- last N readings (NULL = no limit)
+    p_since TIMESTAMPTZ DEFAULT NULL  -- readings since this time (NULL = all)
+)
+RETURNS TABLE (
+    field TEXT,
+    total_count BIGINT,   -- readings in the window
+    sample_count BIGINT,  -- non-null values of this field
+    mean DOUBLE PRECISION,
+    min DOUBLE PRECISION,
+    max DOUBLE PRECISION,
+    stddev DOUBLE PRECISION,
+    latest_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH win AS (
+        SELECT created_at, temperature, humidity, moisture, COALESCE(soil_ph, ph) AS soil_ph,
+               nitrogen, phosphorus, potassium, rainfall
+        FROM sensor_readings
+        WHERE device_id = p_device_id
+          AND (p_since IS NULL OR created_at >= p_since)
+        ORDER BY created_at DESC
+        LIMIT p_limit
+    ),
+    totals AS (
+        SELECT COUNT(*) AS n, MAX(created_at) AS latest_at FROM win
+    )
+    SELECT
+        v.field,
+        totals.n,
+        COUNT(v.val),
+        AVG(v.val)::DOUBLE PRECISION,
+        MIN(v.val)::DOUBLE PRECISION,
+        MAX(v.val)::DOUBLE PRECISION,
+        STDDEV_SAMP(v.val)::DOUBLE PRECISION,
+        totals.latest_at
+    FROM win
+    CROSS JOIN totals
+    CROSS JOIN LATERAL (VALUES
+        ('temperature', win.temperature),
+        ('humidity', win.humidity),
+        ('moisture', win.moisture),
+        ('soil_ph', win.soil_ph),
+        ('nitrogen', win.nitrogen),
+        ('phosphorus', win.phosphorus),
+        ('potassium', win.potassium),
+        ('rainfall', win.rainfall)
+    ) AS v(field, val)
+    GROUP BY v.field, totals.n, totals.latest_at;
+$$;
@@ -0,0 +1,28 @@
+-- Index migration for device/time lookups on sensor_readings
+-- Every hot query filters by device_id and/or orders by created_at
+-- (api/sensor_data.py, services/aggregation_service.py, services/thingspeak_service.py),
+-- but the original schema only indexed `timestamp`, which none of them use.
+-- Run once against existing deployments; schema.sql already contains these for new ones.
+-- Benchmark: backend/benchmarks/bench_sensor_queries.py
+
+-- Columns written by the application (also added by schema_rollups.sql)
+ALTER TABLE sensor_readings ADD COLUMN IF NOT EXISTS soil_ph NUMERIC(4, 2);
+ALTER TABLE sensor_readings ADD COLUMN IF NOT EXISTS moisture NUMERIC(5, 2);
+
+-- 1. Per-device windows: get_last_n_average, get_30_day_average, history by device
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_device_created
+    ON sensor_readings (device_id, created_at DESC);
+
+-- 2. Latest-reading lookups (get_latest, get_last_supabase_timestamp).
+-- A plain index: the newest row is one index probe plus one heap fetch, and
+-- get_latest selects every column anyway. Replaces the earlier
+-- idx_sensor_readings_latest, whose INCLUDE list only added write cost.
+DROP INDEX IF EXISTS idx_sensor_readings_latest;
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_created
+    ON sensor_readings (created_at DESC);
+
+-- 3. The old timestamp index is never used by the application; drop it to
+-- save a write per insert.
+DROP INDEX IF EXISTS idx_sensor_readings_timestamp;
+
+ANALYZE sensor_readings;
@@ -0,0 +1,209 @@
+-- Time-bucketed rollups for Mitti Mitra sensor telemetry
+-- Run after schema.sql. Keeps hourly and daily aggregates per device so that
+-- dashboards and reports never have to scan the raw sensor_readings table.
+--
+-- Tiers:
+--   sensor_readings         raw rows, kept for raw_days (default 30)
+--   sensor_readings_hourly  one row per device per hour, kept for hourly_days (default 365)
+--   sensor_readings_daily   one row per device per day, kept forever
+
+-- Columns written by the ingestion paths (api/sensor_data.py, thingspeak_service.py).
+-- Older deployments used `ph`, newer ones `soil_ph`; the rollups read both.
+ALTER TABLE sensor_readings ADD COLUMN IF NOT EXISTS ph NUMERIC(4, 2);
+ALTER TABLE sensor_readings ADD COLUMN IF NOT EXISTS soil_ph NUMERIC(4, 2);
+ALTER TABLE sensor_readings ADD COLUMN IF NOT EXISTS moisture NUMERIC(5, 2);
+
+-- 1. Hourly rollup
+CREATE TABLE IF NOT EXISTS sensor_readings_hourly (
+    device_id TEXT NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    sample_count INTEGER NOT NULL DEFAULT 0,
+
+    avg_temperature NUMERIC(5, 2),
+    min_temperature NUMERIC(5, 2),
+    max_temperature NUMERIC(5, 2),
+    avg_humidity NUMERIC(5, 2),
+    min_humidity NUMERIC(5, 2),
+    max_humidity NUMERIC(5, 2),
+    avg_moisture NUMERIC(5, 2),
+    min_moisture NUMERIC(5, 2),
+    max_moisture NUMERIC(5, 2),
+    avg_soil_ph NUMERIC(4, 2),
+    min_soil_ph NUMERIC(4, 2),
+    max_soil_ph NUMERIC(4, 2),
+    avg_nitrogen NUMERIC(6, 2),
+    min_nitrogen NUMERIC(6, 2),
+    max_nitrogen NUMERIC(6, 2),
+    avg_phosphorus NUMERIC(6, 2),
+    min_phosphorus NUMERIC(6, 2),
+    max_phosphorus NUMERIC(6, 2),
+    avg_potassium NUMERIC(6, 2),
+    min_potassium NUMERIC(6, 2),
+    max_potassium NUMERIC(6, 2),
+    total_rainfall NUMERIC(8, 2),
+
+    PRIMARY KEY (device_id, bucket)
+);
+
+-- 2. Daily rollup (same shape, built from the hourly tier)
+CREATE TABLE IF NOT EXISTS sensor_readings_daily (
+    LIKE sensor_readings_hourly INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING INDEXES
+);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_hourly_bucket ON sensor_readings_hourly (bucket DESC);
+CREATE INDEX IF NOT EXISTS idx_sensor_daily_bucket ON sensor_readings_daily (bucket DESC);
+
+-- 3. Compaction: rebuild every bucket touched since p_since.
+-- Hourly buckets are recomputed from raw rows, daily buckets from hourly rows
+-- (weighted by sample_count), so the job is idempotent and safe to re-run.
+CREATE OR REPLACE FUNCTION compact_sensor_rollups(p_since TIMESTAMPTZ DEFAULT NOW() - INTERVAL '2 hours')
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO sensor_readings_hourly (
+        device_id, bucket, sample_count,
+        avg_temperature, min_temperature, max_temperature,
+        avg_humidity, min_humidity, max_humidity,
+        avg_moisture, min_moisture, max_moisture,
+        avg_soil_ph, min_soil_ph, max_soil_ph,
+        avg_nitrogen, min_nitrogen, max_nitrogen,
+        avg_phosphorus, min_phosphorus, max_phosphorus,
+        avg_potassium, min_potassium, max_potassium,
+        total_rainfall
+    )
+    SELECT
+        device_id, date_trunc('hour', created_at), COUNT(*),
+        AVG(temperature), MIN(temperature), MAX(temperature),
+        AVG(humidity), MIN(humidity), MAX(humidity),
+        AVG(moisture), MIN(moisture), MAX(moisture),
+        AVG(COALESCE(soil_ph, ph)), MIN(COALESCE(soil_ph, ph)), MAX(COALESCE(soil_ph, ph)),
+        AVG(nitrogen), MIN(nitrogen), MAX(nitrogen),
+        AVG(phosphorus), MIN(phosphorus), MAX(phosphorus),
+        AVG(potassium), MIN(potassium), MAX(potassium),
+        SUM(rainfall)
+    FROM sensor_readings
+    WHERE created_at >= date_trunc('hour', p_since)
+    GROUP BY 1, 2
+    ON CONFLICT (device_id, bucket) DO UPDATE SET
+        sample_count = EXCLUDED.sample_count,
+        avg_temperature = EXCLUDED.avg_temperature,
+        min_temperature = EXCLUDED.min_temperature,
+        max_temperature = EXCLUDED.max_temperature,
+        avg_humidity = EXCLUDED.avg_humidity,
+        min_humidity = EXCLUDED.min_humidity,
+        max_humidity = EXCLUDED.max_humidity,
+        avg_moisture = EXCLUDED.avg_moisture,
+        min_moisture = EXCLUDED.min_moisture,
+        max_moisture = EXCLUDED.max_moisture,
+        avg_soil_ph = EXCLUDED.avg_soil_ph,
+        min_soil_ph = EXCLUDED.min_soil_ph,
+        max_soil_ph = EXCLUDED.max_soil_ph,
+        avg_nitrogen = EXCLUDED.avg_nitrogen,
+        min_nitrogen = EXCLUDED.min_nitrogen,
+        max_nitrogen = EXCLUDED.max_nitrogen,
+        avg_phosphorus = EXCLUDED.avg_phosphorus,
+        min_phosphorus = EXCLUDED.min_phosphorus,
+        max_phosphorus = EXCLUDED.max_phosphorus,
+        avg_potassium = EXCLUDED.avg_potassium,
+        min_potassium = EXCLUDED.min_potassium,
+        max_potassium = EXCLUDED.max_potassium,
+        total_rainfall = EXCLUDED.total_rainfall;
+
+    INSERT INTO sensor_readings_daily (
+        device_id, bucket, sample_count,
+        avg_temperature, min_temperature, max_temperature,
+        avg_humidity, min_humidity, max_humidity,
+        avg_moisture, min_moisture, max_moisture,
+        avg_soil_ph, min_soil_ph, max_soil_ph,
+        avg_nitrogen, min_nitrogen, max_nitrogen,
+        avg_phosphorus, min_phosphorus, max_phosphorus,
+        avg_potassium, min_potassium, max_potassium,
+        total_rainfall
+    )
+    SELECT
+        device_id, date_trunc('day', bucket), SUM(sample_count),
+        SUM(avg_temperature * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_temperature), MAX(max_temperature),
+        SUM(avg_humidity * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_humidity), MAX(max_humidity),
+        SUM(avg_moisture * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_moisture), MAX(max_moisture),
+        SUM(avg_soil_ph * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_soil_ph), MAX(max_soil_ph),
+        SUM(avg_nitrogen * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_nitrogen), MAX(max_nitrogen),
+        SUM(avg_phosphorus * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_phosphorus), MAX(max_phosphorus),
+        SUM(avg_potassium * sample_count) / NULLIF(SUM(sample_count), 0), MIN(min_potassium), MAX(max_potassium),
+        SUM(total_rainfall)
+    FROM sensor_readings_hourly
+    WHERE bucket >= date_trunc('day', p_since)
+    GROUP BY 1, 2
+    ON CONFLICT (device_id, bucket) DO UPDATE SET
+        sample_count = EXCLUDED.sample_count,
+        avg_temperature = EXCLUDED.avg_temperature,
+        min_temperature = EXCLUDED.min_temperature,
+        max_temperature = EXCLUDED.max_temperature,
+        avg_humidity = EXCLUDED.avg_humidity,
+        min_humidity = EXCLUDED.min_humidity,
+        max_humidity = EXCLUDED.max_humidity,
+        avg_moisture = EXCLUDED.avg_moisture,
+        min_moisture = EXCLUDED.min_moisture,
+        max_moisture = EXCLUDED.max_moisture,
+        avg_soil_ph = EXCLUDED.avg_soil_ph,
+        min_soil_ph = EXCLUDED.min_soil_ph,
+        max_soil_ph = EXCLUDED.max_soil_ph,
+        avg_nitrogen = EXCLUDED.avg_nitrogen,
+        min_nitrogen = EXCLUDED.min_nitrogen,
+        max_nitrogen = EXCLUDED.max_nitrogen,
+        avg_phosphorus = EXCLUDED.avg_phosphorus,
+        min_phosphorus = EXCLUDED.min_phosphorus,
+        max_phosphorus = EXCLUDED.max_phosphorus,
+        avg_potassium = EXCLUDED.avg_potassium,
+        min_potassium = EXCLUDED.min_potassium,
+        max_potassium = EXCLUDED.max_potassium,
+        total_rainfall = EXCLUDED.total_rainfall;
+END;
+$$;
+
+-- 4. Retention: downsample raw rows older than p_raw_days into the rollups,
+-- then drop them. Hourly rows older than p_hourly_days are dropped as well;
+-- the daily tier keeps the long-term history.
+CREATE OR REPLACE FUNCTION downsample_sensor_readings(p_raw_days INTEGER DEFAULT 30, p_hourly_days INTEGER DEFAULT 365)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    raw_cutoff TIMESTAMPTZ := date_trunc('hour', NOW() - make_interval(days => p_raw_days));
+    hourly_cutoff TIMESTAMPTZ := date_trunc('day', NOW() - make_interval(days => p_hourly_days));
+    oldest_raw TIMESTAMPTZ;
+BEGIN
+    SELECT MIN(created_at) INTO oldest_raw FROM sensor_readings WHERE created_at < raw_cutoff;
+
+    IF oldest_raw IS NOT NULL THEN
+        -- Make sure every bucket we are about to drop has been rolled up
+        PERFORM compact_sensor_rollups(oldest_raw);
+        DELETE FROM sensor_readings WHERE created_at < raw_cutoff;
+    END IF;
+
+    DELETE FROM sensor_readings_hourly WHERE bucket < hourly_cutoff;
+END;
+$$;
+
+-- 5. Scheduling (Supabase: enable the pg_cron extension first)
+DO $outer$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('sensor-rollups', '5 * * * *', $$SELECT compact_sensor_rollups()$$);
+        PERFORM cron.schedule('sensor-retention', '30 3 * * *', $$SELECT downsample_sensor_readings(30, 365)$$);
+    END IF;
+END
+$outer$;
+
+-- 6. daily_averages now reads the daily tier instead of re-aggregating raw rows
+DROP VIEW IF EXISTS daily_averages;
+CREATE VIEW daily_averages AS
+SELECT
+    device_id,
+    bucket AS day,
+    avg_temperature AS avg_temp,
+    avg_humidity,
+    avg_soil_ph AS avg_ph,
+    total_rainfall AS total_rain
+FROM sensor_readings_daily
+ORDER BY 2 DESC;